@@ -9,6 +9,7 @@ from semver import VersionInfo
 
 from lisa.executable import Tool
 from lisa.util import LisaException, parse_version
+from lisa.util.query_cache import cached_query
 
 if TYPE_CHECKING:
     from lisa.node import Node
@@ -56,6 +57,9 @@ class Uname(Tool):
     def _check_exists(self) -> bool:
         return True
 
+    # the kernel is changed by installation and reboot only, and both of them
+    # invalidate the query cache.
+    @cached_query(ttl=3600)
     def get_linux_information(
         self, force_run: bool = False, no_error_log: bool = False
     ) -> UnameResult:
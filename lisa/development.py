@@ -5,6 +5,7 @@
 from typing import List, Optional
 
 from lisa import schema
+from lisa.util import constants
 
 _development_settings: Optional[schema.Development] = None
 
@@ -28,3 +29,19 @@ def get_jump_boxes() -> List[schema.ProxyConnectionInfo]:
         return _development_settings.jump_boxes
     else:
         return []
+
+
+def get_ssh_channel_pool_size() -> int:
+    if _development_settings:
+        return _development_settings.ssh_channel_pool_size
+    else:
+        return constants.DEFAULT_SSH_CHANNEL_POOL_SIZE
+
+
+def get_process_output_memory_limit() -> int:
+    if _development_settings:
+        size_mb = _development_settings.process_output_memory_limit
+    else:
+        size_mb = constants.DEFAULT_PROCESS_OUTPUT_MEMORY_LIMIT
+    # the output is counted in characters.
+    return size_mb * 1024 * 1024
@@ -203,6 +203,9 @@ class Environment(ContextMixin, InitializableMixin):
             f"environments/{get_datetime_path()}-{self.name}"
         )
 
+        # it's increased on each status change, so the cached requirement
+        # checks of this environment can be invalidated.
+        self.status_version: int = 0
         self._status: Optional[EnvironmentStatus] = None
         self.status = EnvironmentStatus.New
 
@@ -221,6 +224,7 @@ class Environment(ContextMixin, InitializableMixin):
             if value == EnvironmentStatus.New:
                 self._reset()
             self._status = value
+            self.status_version += 1
             environment_message = EnvironmentMessage(
                 name=self.name,
                 status=self._status,
@@ -4,6 +4,7 @@
 from __future__ import annotations
 
 import pathlib
+import shlex
 from hashlib import sha256
 from typing import (
     TYPE_CHECKING,
@@ -11,6 +12,7 @@ from typing import (
     Dict,
     List,
     Optional,
+    Sequence,
     Tuple,
     Type,
     TypeVar,
@@ -19,7 +21,7 @@ from typing import (
 )
 
 from lisa.util import InitializableMixin, LisaException, constants
-from lisa.util.logger import get_logger
+from lisa.util.logger import Logger, get_logger
 from lisa.util.perf_timer import create_timer
 from lisa.util.process import ExecutableResult, Process
 
@@ -124,6 +126,15 @@ class Tool(InitializableMixin):
         """
         return self.command
 
+    @property
+    def packages(self) -> List[str]:
+        """
+        The packages to install the tool by the package manager. If a tool is
+        installed by packages only, return them here, so the tool can be
+        installed with other tools in one transaction by Tools.prefetch.
+        """
+        return []
+
     @property
     def dependencies(self) -> List[Type[Tool]]:
         """
@@ -248,7 +259,8 @@ class Tool(InitializableMixin):
         # If the command exists in sbin, use the root permission, even the sudo
         # is not specified.
         sudo = sudo or self._use_sudo
-        command_key = f"{command}|{shell}|{sudo}|{cwd}"
+        envs = sorted(update_envs.items()) if update_envs else []
+        command_key = f"{command}|{shell}|{sudo}|{cwd}|{envs}"
         process = self.__cached_results.get(command_key, None)
         if force_run or not process:
             process = self.node.execute_async(
@@ -301,6 +313,13 @@ class Tool(InitializableMixin):
             expected_exit_code_failure_message=expected_exit_code_failure_message,
         )
 
+    def clear_cached_results(self) -> None:
+        """
+        Drop cached processes, so commands run again, when the node state may
+        be changed.
+        """
+        self.__cached_results.clear()
+
     def get_tool_path(self, use_global: bool = False) -> pathlib.PurePath:
         """
         compose a path, if the tool need to be installed
@@ -594,30 +613,151 @@ class Tools:
                 tool = cast_tool_type.create(self._node, *args, **kwargs)
 
             tool.initialize()
+            self._install_tool(tool, tool_log)
+            self._cache[tool_key] = tool
+        return cast(T, tool)
+
+    def prefetch(self, tool_types: Sequence[Type[Tool]]) -> None:
+        """
+        Get many tools and their dependencies at once. On posix nodes, the
+        commands of all tools are checked in one remote call, and the missing
+        tools, which declare packages, are installed in one package manager
+        transaction. Other tools are checked and installed one by one, like
+        the get method.
 
-            if not tool.exists:
-                tool_log.debug(f"'{tool.name}' not installed")
-                if tool.can_install:
-                    tool_log.debug(f"{tool.name} is installing")
-                    timer = create_timer()
-                    is_success = tool.install()
-                    if not is_success:
-                        raise LisaException(
-                            f"install '{tool.name}' failed. After installed, "
-                            f"it cannot be detected."
-                        )
-                    tool_log.debug(f"installed in {timer}")
-                else:
+        for example,
+        node.tools.prefetch([Git, Make, Gcc])
+        """
+        timer = create_timer()
+        tools = self._create_tools(tool_types)
+        if not tools:
+            return
+        if not self._node.is_posix:
+            for tool in tools:
+                self.get(type(tool))
+            return
+
+        self._check_tools_exist(tools)
+        probe_elapsed = timer.elapsed_text(stop=False)
+
+        missing_tools = [x for x in tools if not x.exists and x.can_install]
+        packages: List[str] = []
+        for tool in missing_tools:
+            for package in tool.packages:
+                if package not in packages:
+                    packages.append(package)
+        install_timer = create_timer()
+        if packages:
+            self._node.log.debug(f"installing packages for tools: {packages}")
+            try:
+                self._node.os.install_packages(packages)  # type: ignore
+            except Exception as e:
+                # the tools are installed one by one below.
+                self._node.log.debug(f"failed to install packages together: {e}")
+            self._check_tools_exist([x for x in missing_tools if x.packages])
+
+        # dependencies are before the tools, which depend on them. So they are
+        # in the cache, when the tools are installed.
+        for tool in tools:
+            tool_key = self._get_tool_key(type(tool))
+            tool_log = get_logger("tool", tool_key, self._node.log)
+            self._install_tool(tool, tool_log)
+            self._cache[tool_key] = tool
+
+        self._node.log.debug(
+            f"prefetched {len(tools)} tools in {timer.elapsed_text(stop=False)}, "
+            f"checked in {probe_elapsed}, installed {len(missing_tools)} tools "
+            f"({len(packages)} packages) in {install_timer}"
+        )
+
+    def clear_cached_results(self) -> None:
+        for tool in list(self._cache.values()):
+            tool.clear_cached_results()
+
+    def _create_tools(self, tool_types: Sequence[Type[Tool]]) -> List[Tool]:
+        # returns not cached tools, and dependencies are before the tools,
+        # which depend on them.
+        tools: Dict[str, Tool] = {}
+
+        def _add(tool_type: Type[Tool]) -> None:
+            tool_key = self._get_tool_key(tool_type)
+            if tool_key in self._cache or tool_key in tools:
+                return
+            tool = tool_type.create(self._node)
+            tool.initialize()
+            for dependency in tool.dependencies:
+                _add(dependency)
+            tools[tool_key] = tool
+
+        for tool_type in tool_types:
+            _add(tool_type)
+        return list(tools.values())
+
+    def _check_tools_exist(self, tools: List[Tool]) -> None:
+        # Only tools with the default check are batched. Other tools are
+        # checked by their own logic, when the exists property is called.
+        commands: List[str] = []
+        batched_tools: List[Tool] = []
+        for tool in tools:
+            if (
+                type(tool)._check_exists is not Tool._check_exists
+                or type(tool).exists is not Tool.exists
+            ):
+                continue
+            command = tool.command
+            if not command or any(x.isspace() for x in command):
+                continue
+            batched_tools.append(tool)
+            commands.append(command)
+        if not batched_tools:
+            return
+
+        found = self._find_commands(commands, sudo=False)
+        missing = [i for i in range(len(commands)) if i not in found]
+        found_in_sudo = self._find_commands([commands[i] for i in missing], sudo=True)
+        for index, tool in enumerate(batched_tools):
+            tool._exists = index in found
+            tool._use_sudo = False
+        for index in found_in_sudo:
+            tool = batched_tools[missing[index]]
+            tool._exists = True
+            tool._use_sudo = True
+
+    def _find_commands(self, commands: List[str], sudo: bool) -> List[int]:
+        # returns indexes of found commands.
+        if not commands:
+            return []
+        script = "; ".join(
+            f"command -v {shlex.quote(command)} >/dev/null 2>&1 && echo {index}"
+            for index, command in enumerate(commands)
+        )
+        result = self._node.execute(
+            f"{script}; true", shell=True, sudo=sudo, no_info_log=True
+        )
+        return [int(x) for x in result.stdout.split() if x.isdigit()]
+
+    def _install_tool(self, tool: Tool, tool_log: Logger) -> None:
+        if not tool.exists:
+            tool_log.debug(f"'{tool.name}' not installed")
+            if tool.can_install:
+                tool_log.debug(f"{tool.name} is installing")
+                timer = create_timer()
+                is_success = tool.install()
+                if not is_success:
                     raise LisaException(
-                        f"cannot find [{tool.name}] on [{self._node.name}], "
-                        f"{self._node.os.__class__.__name__}, "
-                        f"Remote({self._node.is_remote}) "
-                        f"and installation of [{tool.name}] isn't enabled in lisa."
+                        f"install '{tool.name}' failed. After installed, "
+                        f"it cannot be detected."
                     )
+                tool_log.debug(f"installed in {timer}")
             else:
-                tool_log.debug("installed already")
-            self._cache[tool_key] = tool
-        return cast(T, tool)
+                raise LisaException(
+                    f"cannot find [{tool.name}] on [{self._node.name}], "
+                    f"{self._node.os.__class__.__name__}, "
+                    f"Remote({self._node.is_remote}) "
+                    f"and installation of [{tool.name}] isn't enabled in lisa."
+                )
+        else:
+            tool_log.debug("installed already")
 
     def _get_tool_key(self, tool_type: Union[type, CustomScriptBuilder, str]) -> str:
         if isinstance(tool_type, CustomScriptBuilder):
@@ -68,6 +68,10 @@ class SerialConsole(Feature):
 
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         self._cached_console_log: Optional[bytes] = None
+        # The complete lines, which are checked for panics, and panics found in
+        # them. So only new lines are checked next time.
+        self._panic_checked_log = b""
+        self._panic_checked_lines: List[str] = []
 
     def enabled(self) -> bool:
         # most platform support shutdown
@@ -102,7 +106,10 @@ class SerialConsole(Feature):
         return result
 
     def get_console_log(
-        self, saved_path: Optional[Path] = None, force_run: bool = False
+        self,
+        saved_path: Optional[Path] = None,
+        force_run: bool = False,
+        save_screenshot: bool = False,
     ) -> str:
         if saved_path:
             saved_path = saved_path.joinpath(get_datetime_path())
@@ -113,7 +120,10 @@ class SerialConsole(Feature):
             log_path = self._node.local_log_path / get_datetime_path()
             log_path.mkdir(parents=True, exist_ok=True)
 
-            self._cached_console_log = self._get_console_log(saved_path=log_path)
+            # the screenshot is saved to the path, so skip it, if it's not asked.
+            self._cached_console_log = self._get_console_log(
+                saved_path=log_path if save_screenshot else None
+            )
             self._node.log.debug(
                 f"downloaded serial log size: {len(self._cached_console_log)}"
             )
@@ -136,25 +146,45 @@ class SerialConsole(Feature):
         self, saved_path: Optional[Path], stage: str = "", force_run: bool = False
     ) -> None:
         self._node.log.debug("checking panic in serial log...")
-        content: str = self.get_console_log(saved_path=saved_path, force_run=force_run)
+        self.get_console_log(saved_path=saved_path, force_run=force_run)
+        assert self._cached_console_log is not None
+        content = self._cached_console_log
+        if not content.startswith(self._panic_checked_log):
+            # the log is replaced, check it from the beginning.
+            self._panic_checked_log = b""
+            self._panic_checked_lines = []
+
+        # check new complete lines, and save the result. The last line may be
+        # incomplete, so it's checked every time.
+        checked_size = len(self._panic_checked_log)
+        lines_end = content.rfind(b"\n", checked_size) + 1
+        if lines_end > checked_size:
+            self._panic_checked_lines += self._find_panics(
+                content[checked_size:lines_end]
+            )
+            self._panic_checked_log = content[:lines_end]
+        panics = self._panic_checked_lines + self._find_panics(
+            content[len(self._panic_checked_log) :]
+        )
+
+        if panics:
+            raise KernelPanicException(stage, panics)
+
+    def _find_panics(self, content: bytes) -> List[str]:
+        text = content.decode("utf-8", errors="ignore")
         ignored_candidates = [
             x
-            for sublist in find_patterns_in_lines(
-                content, self.panic_ignorable_patterns
-            )
+            for sublist in find_patterns_in_lines(text, self.panic_ignorable_patterns)
             for x in sublist
             if x
         ]
-        panics = [
+        return [
             x
-            for sublist in find_patterns_in_lines(content, self.panic_patterns)
+            for sublist in find_patterns_in_lines(text, self.panic_patterns)
             for x in sublist
             if x and x not in ignored_candidates
         ]
 
-        if panics:
-            raise KernelPanicException(stage, panics)
-
     def check_initramfs(
         self, saved_path: Optional[Path], stage: str = "", force_run: bool = False
     ) -> None:
@@ -12,8 +12,7 @@ from typing import Optional
 
 from retry import retry
 
-# force to import all modules for reflection use
-import lisa.mixin_modules  # noqa: F401
+from lisa.mixin_modules import import_modules_lazily
 from lisa.parameter_parser.argparser import parse_args
 from lisa.util import constants, get_datetime_path
 from lisa.util.logger import (
@@ -113,6 +112,8 @@ def main() -> int:
         args = parse_args()
 
         initialize_runtime_folder(args.log_path, args.working_path, args.run_id)
+        # import modules of mix-in types, when they are used for reflection.
+        import_modules_lazily(constants.CACHE_PATH)
 
         log_level = DEBUG if (args.debug) else INFO
         set_level(log_level)
@@ -3,54 +3,123 @@
 
 # The file imports all the mix-in types that can be initialized
 # using reflection.
+#
+# Importing all of them is slow, because some modules import heavy SDKs, like
+# Azure, AWS and libvirt. So type names and modules of all mix-in types are
+# saved in a manifest on first run, or after the code is changed. In other runs,
+# a module is imported when its type name is used first.
 
+import hashlib
+import importlib
+import json
 import platform
+from pathlib import Path
+from typing import Dict, List, Tuple
 
-import lisa.combinators.batch_combinator  # noqa: F401
-import lisa.combinators.csv_combinator  # noqa: F401
-import lisa.combinators.grid_combinator  # noqa: F401
-import lisa.notifiers.console  # noqa: F401
-import lisa.notifiers.env_stats  # noqa: F401
-import lisa.notifiers.file  # noqa: F401
-import lisa.notifiers.html  # noqa: F401
-import lisa.notifiers.junit  # noqa: F401
-import lisa.notifiers.text_result  # noqa: F401
-import lisa.runners.lisa_runner  # noqa: F401
-import lisa.sut_orchestrator.ready  # noqa: F401
-
-try:
-    import lisa.runners.legacy_runner  # noqa: F401
-except ModuleNotFoundError as e:
-    print(f"win32 package is not installed, legacy runner is not supported. [{e}]")
-
-# Azure modules
-try:
-    import lisa.sut_orchestrator.azure.hooks  # noqa: F401
-    import lisa.sut_orchestrator.azure.transformers  # noqa: F401
-except ModuleNotFoundError as e:
-    print(f"azure package is not installed. [{e}]")
-
-# Aws modules
-try:
-    import lisa.sut_orchestrator.aws.platform_  # noqa: F401
-except ModuleNotFoundError as e:
-    print(f"aws package is not installed. [{e}]")
+from lisa.util import subclasses, write_file_atomically
+
+_MANIFEST_FILE_NAME = "lisa_mixin_modules.json"
+
+_modules: List[str] = [
+    "lisa.combinators.batch_combinator",
+    "lisa.combinators.csv_combinator",
+    "lisa.combinators.grid_combinator",
+    "lisa.notifiers.console",
+    "lisa.notifiers.env_stats",
+    "lisa.notifiers.file",
+    "lisa.notifiers.html",
+    "lisa.notifiers.junit",
+    "lisa.notifiers.text_result",
+    "lisa.runners.lisa_runner",
+    "lisa.sut_orchestrator.ready",
+    "lisa.transformers.dom0_kernel_installer",
+    "lisa.transformers.dump_variables",
+    "lisa.transformers.kernel_source_installer",
+    "lisa.transformers.script_transformer",
+    "lisa.transformers.to_list",
+    "lisa.transformers.upgrade_packages",
+]
+
+# the modules, which depend on optional packages, and the message on failure.
+_optional_modules: List[Tuple[List[str], str]] = [
+    (
+        ["lisa.runners.legacy_runner"],
+        "win32 package is not installed, legacy runner is not supported.",
+    ),
+    (
+        [
+            "lisa.sut_orchestrator.azure.hooks",
+            "lisa.sut_orchestrator.azure.transformers",
+        ],
+        "azure package is not installed.",
+    ),
+    (["lisa.sut_orchestrator.aws.platform_"], "aws package is not installed."),
+]
 
 if platform.system() == "Linux":
-    # libvirt modules
-    try:
-        import lisa.sut_orchestrator.libvirt.ch_platform  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.context  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.platform  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.qemu_platform  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.schema  # noqa: F401
-        import lisa.sut_orchestrator.libvirt.transformers  # noqa: F401
-    except ModuleNotFoundError as e:
-        print(f"libvirt package is not installed. [{e}]")
-
-import lisa.transformers.dom0_kernel_installer  # noqa: F401
-import lisa.transformers.dump_variables  # noqa: F401
-import lisa.transformers.kernel_source_installer  # noqa: F401
-import lisa.transformers.script_transformer  # noqa: F401
-import lisa.transformers.to_list  # noqa: F401
-import lisa.transformers.upgrade_packages  # noqa: F401
+    _optional_modules.append(
+        (
+            [
+                "lisa.sut_orchestrator.libvirt.ch_platform",
+                "lisa.sut_orchestrator.libvirt.context",
+                "lisa.sut_orchestrator.libvirt.platform",
+                "lisa.sut_orchestrator.libvirt.qemu_platform",
+                "lisa.sut_orchestrator.libvirt.schema",
+                "lisa.sut_orchestrator.libvirt.transformers",
+            ],
+            "libvirt package is not installed.",
+        )
+    )
+
+
+def import_modules() -> None:
+    """
+    Import all modules of mix-in types.
+    """
+    for module_name in _modules:
+        importlib.import_module(module_name)
+    for module_names, message in _optional_modules:
+        try:
+            for module_name in module_names:
+                importlib.import_module(module_name)
+        except ModuleNotFoundError as e:
+            print(f"{message} [{e}]")
+
+
+def import_modules_lazily(cache_path: Path) -> None:
+    """
+    Load the manifest of mix-in types, so modules are imported when they are
+    used. If the manifest doesn't exist or is outdated, import all modules,
+    and save the manifest.
+    """
+    manifest_path = cache_path / _MANIFEST_FILE_NAME
+    fingerprint = _get_fingerprint()
+    if manifest_path.exists():
+        try:
+            with open(manifest_path, "r") as f:
+                manifest = json.load(f)
+            if manifest["fingerprint"] == fingerprint:
+                subclasses.set_lazy_modules(manifest["types"], import_modules)
+                return
+        except Exception as e:
+            print(f"failed to load mix-in modules manifest, rebuild it. [{e}]")
+
+    import_modules()
+    manifest = {
+        "fingerprint": fingerprint,
+        "types": subclasses.get_subclass_modules("lisa"),
+    }
+    write_file_atomically(manifest_path, json.dumps(manifest).encode("utf-8"))
+
+
+def _get_fingerprint() -> str:
+    # the manifest is rebuilt, if any source file is changed.
+    root_path = Path(__file__).parent
+    files: Dict[str, Tuple[int, int]] = {}
+    for file in sorted(root_path.glob("**/*.py")):
+        stat = file.stat()
+        files[file.relative_to(root_path).as_posix()] = (
+            stat.st_mtime_ns,
+            stat.st_size,
+        )
+    return hashlib.sha256(json.dumps(files).encode("utf-8")).hexdigest()
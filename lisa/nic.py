@@ -282,6 +282,7 @@ class Nics(InitializableMixin):
 
     def reload(self) -> None:
         self.nics.clear()
+        self._node.invalidate_query_cache("nic reload")
         self._initialize()
 
     @retry(tries=15, delay=3, backoff=1.15)
@@ -31,6 +31,7 @@ from lisa.util.constants import PATH_REMOTE_ROOT
 from lisa.util.logger import Logger, create_file_handler, get_logger, remove_handler
 from lisa.util.parallel import run_in_parallel
 from lisa.util.process import ExecutableResult, Process
+from lisa.util.query_cache import QueryCache
 from lisa.util.shell import LocalShell, Shell, SshShell
 
 T = TypeVar("T")
@@ -69,6 +70,8 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
         # will be initialized by platform
         self.features: Features
         self.tools = Tools(self)
+        # results of read-only queries, which are shared by tools.
+        self.query_cache = QueryCache()
         # the path uses remotely
         node_id = str(self.index) if self.index >= 0 else ""
         self.log = get_logger(logger_name, node_id, parent=parent_logger)
@@ -270,7 +273,41 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
         update_envs: Optional[Dict[str, str]] = None,
         expected_exit_code: Optional[int] = None,
         expected_exit_code_failure_message: str = "",
+        cache_ttl: float = 0,
     ) -> ExecutableResult:
+        """
+        cache_ttl: if it's positive, the command is a read-only query. The
+            succeeded result is cached in the query cache, and reused in the
+            cache_ttl seconds.
+        """
+        if cache_ttl > 0:
+            envs = sorted(update_envs.items()) if update_envs else []
+            key = f"execute|{cmd}|{shell}|{sudo}|{cwd}|{envs}"
+            found, cached_result = self.query_cache.get(key)
+            if found:
+                result = cast(ExecutableResult, cached_result)
+            else:
+                result = self.execute(
+                    cmd,
+                    shell=shell,
+                    sudo=sudo,
+                    nohup=nohup,
+                    no_error_log=no_error_log,
+                    no_info_log=no_info_log,
+                    no_debug_log=no_debug_log,
+                    cwd=cwd,
+                    timeout=timeout,
+                    update_envs=update_envs,
+                )
+                if result.exit_code == 0:
+                    self.query_cache.set(key, result, cache_ttl)
+            if expected_exit_code is not None:
+                result.assert_exit_code(
+                    expected_exit_code=expected_exit_code,
+                    message=expected_exit_code_failure_message,
+                )
+            return result
+
         process = self.execute_async(
             cmd,
             shell=shell,
@@ -440,6 +477,16 @@ class Node(subclasses.BaseClassWithRunbookMixin, ContextMixin, InitializableMixi
     def mark_dirty(self) -> None:
         self.log.debug("mark node to dirty")
         self._is_dirty = True
+        self.invalidate_query_cache("marked dirty")
+
+    def invalidate_query_cache(self, reason: str) -> None:
+        """
+        Drop cached results of queries and tools, when the node state may be
+        changed. For example, reboot, kernel installation or nic reload.
+        """
+        self.log.debug(f"invalidating query cache, reason: {reason}")
+        self.query_cache.invalidate()
+        self.tools.clear_cached_results()
 
     def test_connection(self) -> bool:
         try:
@@ -831,6 +878,12 @@ class NodeHookImpl:
                     information.update(information_dict)
                     information["distro_version"] = node.os.information.full_version
                     information["kernel_version"] = linux_information.kernel_version_raw
+                for key, value in node.query_cache.get_statistics().items():
+                    information[f"query_cache_{key}"] = str(value)
+                if isinstance(node._shell, SshShell):
+                    pool_statistics = node._shell.get_channel_pool_statistics()
+                    for key, value in pool_statistics.items():
+                        information[f"ssh_channel_{key}"] = str(value)
             except Exception as identifier:
                 node.log.exception(
                     "failed to get node information", exc_info=identifier
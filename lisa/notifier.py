@@ -3,15 +3,15 @@
 
 import copy
 import threading
+from collections import deque
 from datetime import datetime
 from functools import partial
-from typing import Any, Dict, List, Optional, Type
+from typing import Any, Deque, Dict, List, Optional, Type, cast
 
 from lisa import schema
 from lisa.messages import MessageBase
 from lisa.util import InitializableMixin, constants, subclasses
 from lisa.util.logger import get_logger
-from lisa.util.parallel import run_in_parallel
 
 _get_init_logger = partial(get_logger, "init", "notifier")
 
@@ -39,10 +39,28 @@ class Notifier(subclasses.BaseClassWithRunbookMixin, InitializableMixin):
 
     def _received_message(self, message: MessageBase) -> None:
         """
-        Called by notifier, when a subscribed message happens.
+        Called by notifier, when a subscribed message happens. The message is
+        shared with other notifiers, so copy it before changing.
         """
         raise NotImplementedError
 
+    def _received_messages(self, batch: List[MessageBase]) -> None:
+        """
+        Called by notifier with subscribed messages in the order they happen.
+        Override it to handle messages in bulk, for example, write a file once
+        per batch.
+        """
+        for message in batch:
+            self._received_message(message)
+
+    def _is_synchronous(self) -> bool:
+        """
+        Synchronous notifiers receive messages in the thread, which sends them.
+        It's for notifiers, which are read immediately, like runner results.
+        """
+        runbook = cast(schema.Notifier, self.runbook)
+        return runbook.queue_size == 0
+
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         """
         initialize is optional
@@ -50,11 +68,95 @@ class Notifier(subclasses.BaseClassWithRunbookMixin, InitializableMixin):
         pass
 
 
+class _NotifierWorker:
+    """
+    Holds messages of a notifier in a bounded queue, and delivers them in
+    batches in its own thread. So a slow notifier doesn't block the sender
+    and other notifiers.
+    """
+
+    def __init__(self, notifier: Notifier) -> None:
+        runbook = cast(schema.Notifier, notifier.runbook)
+        self._notifier = notifier
+        self._queue_size = runbook.queue_size
+        self._overflow_policy = runbook.overflow_policy
+        self._batch_size = runbook.batch_size
+
+        self._queue: Deque[MessageBase] = deque()
+        self._condition = threading.Condition()
+        self._is_delivering = False
+
+        self.max_depth = 0
+        self.dropped_count = 0
+        self.delivered_count = 0
+
+        self._thread = threading.Thread(
+            target=self._run, name=f"notifier[{notifier.type_name()}]"
+        )
+        self._thread.daemon = True
+        self._thread.start()
+
+    @property
+    def depth(self) -> int:
+        return len(self._queue)
+
+    def put(self, message: MessageBase) -> None:
+        with self._condition:
+            if len(self._queue) >= self._queue_size:
+                if self._overflow_policy == constants.NOTIFIER_OVERFLOW_DROP_NEWEST:
+                    self.dropped_count += 1
+                    return
+                elif self._overflow_policy == constants.NOTIFIER_OVERFLOW_DROP_OLDEST:
+                    self._queue.popleft()
+                    self.dropped_count += 1
+                else:
+                    # back pressure, wait until the notifier catches up.
+                    self._condition.wait_for(
+                        lambda: len(self._queue) < self._queue_size
+                    )
+            self._queue.append(message)
+            self.max_depth = max(self.max_depth, len(self._queue))
+            self._condition.notify_all()
+
+    def flush(self, timeout: Optional[float] = None) -> bool:
+        """
+        Wait until all queued messages are delivered. Return False on timeout.
+        """
+        with self._condition:
+            return self._condition.wait_for(
+                lambda: not self._queue and not self._is_delivering, timeout=timeout
+            )
+
+    def _run(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(lambda: len(self._queue) > 0)
+                batch: List[MessageBase] = []
+                while self._queue and len(batch) < self._batch_size:
+                    batch.append(self._queue.popleft())
+                self._is_delivering = True
+                # wake up blocked senders.
+                self._condition.notify_all()
+
+            try:
+                self._notifier._received_messages(batch)
+            except Exception as identifier:
+                self._notifier._log.exception(identifier)
+            finally:
+                with self._condition:
+                    self.delivered_count += len(batch)
+                    self._is_delivering = False
+                    self._condition.notify_all()
+
+
 _notifiers: List[Notifier] = []
 _messages: Dict[type, List[Notifier]] = {}
-# prevent concurrent message conflict.
-_message_queue: List[MessageBase] = []
-_message_queue_lock = threading.Lock()
+# message type -> notifiers of all types in its MRO. It's reset on registering,
+# and filled once per message type.
+_subscribers: Dict[type, List[Notifier]] = {}
+_workers: Dict[int, _NotifierWorker] = {}
+_registering_lock = threading.Lock()
+# the synchronous notifiers are called one by one.
 _notifying_lock = threading.Lock()
 _system_notifiers = [constants.NOTIFIER_CONSOLE, constants.NOTIFIER_FILE]
 
@@ -84,15 +186,19 @@ def register_notifier(notifier: Notifier) -> None:
     """
     notifier.initialize()
 
-    _notifiers.append(notifier)
     subscribed_message_types: List[
         Type[MessageBase]
     ] = notifier._subscribed_message_type()
 
-    for message_type in subscribed_message_types:
-        registered_notifiers = _messages.get(message_type, [])
-        registered_notifiers.append(notifier)
-        _messages[message_type] = registered_notifiers
+    with _registering_lock:
+        _notifiers.append(notifier)
+        if not notifier._is_synchronous():
+            _workers[id(notifier)] = _NotifierWorker(notifier)
+        for message_type in subscribed_message_types:
+            registered_notifiers = _messages.get(message_type, [])
+            registered_notifiers.append(notifier)
+            _messages[message_type] = registered_notifiers
+        _subscribers.clear()
 
     log = _get_init_logger()
     log.debug(
@@ -104,38 +210,72 @@ def register_notifier(notifier: Notifier) -> None:
 def notify(message: MessageBase) -> None:
     message.time = datetime.utcnow()
 
-    # to make sure message get order as possible, use a queue to hold messages.
-    with _message_queue_lock:
-        _message_queue.append(message)
-    while len(_message_queue) > 0:
-        # send message one by one
+    subscribers = _get_subscribers(type(message))
+    if not subscribers:
+        return
+
+    # The sender may change the message after sent, so take a snapshot once,
+    # and share it with all notifiers.
+    snapshot = copy.deepcopy(message)
+    synchronous_notifiers: List[Notifier] = []
+    for notifier in subscribers:
+        worker = _workers.get(id(notifier))
+        if worker:
+            worker.put(snapshot)
+        else:
+            synchronous_notifiers.append(notifier)
+
+    if synchronous_notifiers:
         with _notifying_lock:
-            with _message_queue_lock:
-                current_message: Optional[MessageBase] = None
-                if len(_message_queue) > 0:
-                    current_message = _message_queue.pop()
-            if current_message:
-                message_types = type(current_message).__mro__
-                for message_type in message_types:
-                    notifiers = _messages.get(message_type, [])
-                    if notifiers:
-                        run_in_parallel(
-                            [
-                                partial(
-                                    x._received_message,
-                                    message=copy.deepcopy(current_message),
-                                )
-                                for x in notifiers
-                            ]
-                        )
-                    if message_type == MessageBase:
-                        # skip the object type
-                        break
+            for notifier in synchronous_notifiers:
+                notifier._received_messages([snapshot])
+
+
+def flush(timeout: Optional[float] = None) -> None:
+    """
+    Wait until all queued messages are delivered to notifiers.
+    """
+    for worker in list(_workers.values()):
+        worker.flush(timeout=timeout)
+
+
+def get_queue_statistics() -> Dict[str, Dict[str, int]]:
+    """
+    Returns queue metrics of asynchronous notifiers, like the current depth.
+    """
+    statistics: Dict[str, Dict[str, int]] = {}
+    for notifier in _notifiers:
+        worker = _workers.get(id(notifier))
+        if worker:
+            statistics[notifier.type_name()] = {
+                "depth": worker.depth,
+                "max_depth": worker.max_depth,
+                "dropped": worker.dropped_count,
+                "delivered": worker.delivered_count,
+            }
+    return statistics
 
 
 def finalize() -> None:
+    flush()
+    log = _get_init_logger()
+    log.debug(f"notifier queue statistics: {get_queue_statistics()}")
     for notifier in _notifiers:
         try:
             notifier.finalize()
         except Exception as identifier:
             notifier._log.exception(identifier)
+
+
+def _get_subscribers(message_type: type) -> List[Notifier]:
+    subscribers = _subscribers.get(message_type)
+    if subscribers is None:
+        subscribers = []
+        with _registering_lock:
+            for current_type in message_type.__mro__:
+                subscribers.extend(_messages.get(current_type, []))
+                if current_type == MessageBase:
+                    # skip the object type
+                    break
+            _subscribers[message_type] = subscribers
+    return subscribers
@@ -1,14 +1,20 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
+import dataclasses
+
 from lisa.messages import MessageBase, TestResultMessage
 
 
-def simplify_message(message: MessageBase) -> None:
+def simplify_message(message: MessageBase) -> MessageBase:
     """
-    This method is to reduce message length for display purpose.
+    This method is to reduce message length for display purpose. The message is
+    shared by notifiers, so it returns a simplified copy, if it needs change.
     """
     if isinstance(message, TestResultMessage):
         # The description of test result is too long to display. Hide it for
         # log readability.
         description = message.information.get("description", "")
-        message.information["description"] = f"<{len(description)} bytes>"
+        information = message.information.copy()
+        information["description"] = f"<{len(description)} bytes>"
+        message = dataclasses.replace(message, information=information)
+    return message
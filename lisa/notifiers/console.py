@@ -34,7 +34,7 @@ class Console(notifier.Notifier):
         return ConsoleSchema
 
     def _received_message(self, message: messages.MessageBase) -> None:
-        simplify_message(message)
+        message = simplify_message(message)
         self._log.log(
             getattr(logging, self._log_level),
             f"received message [{message.type}]: {message}",
@@ -1,14 +1,16 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import threading
 from dataclasses import dataclass, field
 from datetime import datetime
+from io import StringIO
 from typing import Any, Dict, List, Optional, TextIO, Type
 
 from lisa import messages, notifier, schema
 from lisa.environment import EnvironmentMessage, EnvironmentStatus
 from lisa.messages import TestResultMessage
-from lisa.util import LisaException, constants
+from lisa.util import LisaException, constants, write_file_atomically
 from lisa.util.perf_timer import create_timer
 
 
@@ -57,12 +59,14 @@ class EnvironmentStats(notifier.Notifier):
         self._update_information(True)
 
     def _received_message(self, message: messages.MessageBase) -> None:
-        if isinstance(message, TestResultMessage):
-            self._process_test_result_message(message)
-        elif isinstance(message, EnvironmentMessage):
-            self._process_environment_message(message)
-        else:
-            raise LisaException(f"unsupported message received, {type(message)}")
+        # the delayed update runs in another thread.
+        with self._update_lock:
+            if isinstance(message, TestResultMessage):
+                self._process_test_result_message(message)
+            elif isinstance(message, EnvironmentMessage):
+                self._process_environment_message(message)
+            else:
+                raise LisaException(f"unsupported message received, {type(message)}")
 
     def _subscribed_message_type(self) -> List[Type[messages.MessageBase]]:
         return [TestResultMessage, EnvironmentMessage]
@@ -75,6 +79,10 @@ class EnvironmentStats(notifier.Notifier):
         self._last_updated_time = create_timer()
         # result update at most 1 time per second
         self._update_frequency = 1
+        self._update_lock = threading.RLock()
+        # the delayed update, so the latest information is written, even if
+        # there is no more message.
+        self._pending_update: Optional[threading.Timer] = None
         self._test_results: Dict[str, TestResultInformation] = {}
         self._environments: Dict[str, EnvironmentInformation] = {}
 
@@ -116,13 +124,29 @@ class EnvironmentStats(notifier.Notifier):
         elif environment.status == EnvironmentStatus.Deleted:
             env_info.deleted_time = datetime.now()
 
-        self._update_information(force=True)
+        self._update_information()
 
     def _update_information(self, force: bool = False) -> None:
-        if self._last_updated_time.elapsed(False) > self._update_frequency or force:
-            with open(self._file_path, "w") as f:
-                self._dump_environments(f)
-            self._last_updated_time = create_timer()
+        with self._update_lock:
+            elapsed = self._last_updated_time.elapsed(False)
+            if elapsed > self._update_frequency or force:
+                if self._pending_update:
+                    self._pending_update.cancel()
+                    self._pending_update = None
+                content = StringIO()
+                self._dump_environments(content)
+                write_file_atomically(
+                    self._file_path, content.getvalue().encode("utf-8")
+                )
+                self._last_updated_time = create_timer()
+            elif not self._pending_update:
+                self._pending_update = threading.Timer(
+                    self._update_frequency - elapsed,
+                    self._update_information,
+                    kwargs={"force": True},
+                )
+                self._pending_update.daemon = True
+                self._pending_update.start()
 
     def _dump_environments(self, f: TextIO) -> None:
         f.write(
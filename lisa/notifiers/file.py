@@ -1,22 +1,49 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from datetime import datetime
 from typing import Any, List, Type, cast
 
 from dataclasses_json import dataclass_json
+from marshmallow import validate
 
 from lisa import messages, notifier, schema
-from lisa.util import constants
+from lisa.util import constants, field_metadata
+from lisa.util.event_log import (
+    COMPRESSION_GZIP,
+    COMPRESSION_ZSTD,
+    EventLogWriter,
+    to_json_line,
+)
 
 from .common import simplify_message
 
+FORMAT_JSONL = "jsonl"
+FORMAT_TEXT = "text"
+
 
 @dataclass_json()
 @dataclass
 class ConsoleSchema(schema.Notifier):
     file_name: str = "messages.log"
+    # jsonl writes a compact json object per line, it can be read by
+    # lisa.util.event_log. text writes the str of messages.
+    format: str = field(
+        default=FORMAT_JSONL,
+        metadata=field_metadata(validate=validate.OneOf([FORMAT_JSONL, FORMAT_TEXT])),
+    )
+    # compress the file by gzip or zstd, the suffix is appended to the file name.
+    compression: str = field(
+        default="",
+        metadata=field_metadata(
+            validate=validate.OneOf(["", COMPRESSION_GZIP, COMPRESSION_ZSTD])
+        ),
+    )
+    # messages are buffered, and written when the buffer is over the size in
+    # bytes, or when they are buffered longer than the interval in seconds.
+    flush_size: int = 64 * 1024
+    flush_interval: float = 1
 
 
 class Console(notifier.Notifier):
@@ -34,17 +61,27 @@ class Console(notifier.Notifier):
         return ConsoleSchema
 
     def finalize(self) -> None:
+        self._writer.close()
         return super().finalize()
 
     def _received_message(self, message: messages.MessageBase) -> None:
-        simplify_message(message)
-        # write every time to refresh the content immediately.
-        with open(self._file_path, "a") as f:
-            f.write(f"{datetime.now():%Y-%m-%d %H:%M:%S.%ff}: {message}\n")
+        message = simplify_message(message)
+        now = datetime.now()
+        if self._format == FORMAT_JSONL:
+            line = to_json_line(message, logged_time=now)
+        else:
+            line = f"{now:%Y-%m-%d %H:%M:%S.%ff}: {message}\n"
+        self._writer.write(line)
 
     def _subscribed_message_type(self) -> List[Type[messages.MessageBase]]:
         return [messages.MessageBase]
 
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         runbook = cast(ConsoleSchema, self.runbook)
-        self._file_path = constants.RUN_LOCAL_LOG_PATH / runbook.file_name
+        self._format = runbook.format
+        self._writer = EventLogWriter(
+            constants.RUN_LOCAL_LOG_PATH / runbook.file_name,
+            compression=runbook.compression,
+            flush_size=runbook.flush_size,
+            flush_interval=runbook.flush_interval,
+        )
@@ -1,10 +1,11 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import threading
 import xml.etree.ElementTree as ET  # noqa: N817
 from dataclasses import dataclass
 from pathlib import Path
-from typing import IO, Any, Dict, List, Optional, Type, cast
+from typing import Any, Dict, List, Optional, Type, cast
 
 from dataclasses_json import dataclass_json
 
@@ -19,18 +20,24 @@ from lisa.messages import (
     TestStatus,
 )
 from lisa.notifier import Notifier
-from lisa.util import LisaException, constants
+from lisa.util import LisaException, constants, write_file_atomically
+from lisa.util.perf_timer import create_timer
 
 
 @dataclass_json()
 @dataclass
 class JUnitSchema(schema.Notifier):
     path: str = "lisa.junit.xml"
+    # seconds between writing the report. The report is written when the run
+    # is completed also. 0 means write it on every result.
+    checkpoint_interval: float = 10
 
 
 class _TestSuiteInfo:
     def __init__(self) -> None:
+        # the element has attributes only, the test cases are serialized.
         self.xml: ET.Element
+        self.testcases: List[bytes] = []
         self.test_count: int = 0
         self.failed_count: int = 0
 
@@ -59,42 +66,82 @@ class JUnit(Notifier):
         super().__init__(runbook=runbook)
 
         self._report_path: Path
-        self._report_file: IO[Any]
         self._testsuites: ET.Element
         self._testsuites_info: Dict[str, _TestSuiteInfo]
         self._testcases_info: Dict[str, _TestCaseInfo]
-        self._xml_tree: ET.ElementTree
 
     # Test runner is initializing.
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         runbook: JUnitSchema = cast(JUnitSchema, self.runbook)
 
         self._report_path = constants.RUN_LOCAL_LOG_PATH / runbook.path
-
-        # Open file now, to avoid errors occuring after all the tests have completed.
-        self._report_file = open(self._report_path, "wb")
+        self._checkpoint_interval = runbook.checkpoint_interval
+        self._checkpoint_timer = create_timer()
+        # the delayed write, so results are written in the interval, even if
+        # there is no more message.
+        self._pending_write: Optional[threading.Timer] = None
+        # the report is written by the timer thread also.
+        self._lock = threading.RLock()
 
         self._testsuites = ET.Element("testsuites")
-        self._xml_tree = ET.ElementTree(self._testsuites)
 
         self._testsuites_info = {}
         self._testcases_info = {}
 
+        # Write file now, to avoid errors occuring after all the tests have
+        # completed.
+        self._write_results()
+
     # Test runner is closing.
     def finalize(self) -> None:
-        try:
-            self._write_results()
-
-        finally:
-            self._report_file.close()
+        self._write_results()
 
         self._log.info(f"JUnit: {self._report_path}")
 
+    def _checkpoint(self) -> None:
+        # Writing the whole report on each result is O(n^2) in a long run, so
+        # it's written at intervals.
+        elapsed = self._checkpoint_timer.elapsed(False)
+        if elapsed >= self._checkpoint_interval:
+            self._write_results()
+        elif not self._pending_write:
+            self._pending_write = threading.Timer(
+                self._checkpoint_interval - elapsed, self._write_results
+            )
+            self._pending_write.daemon = True
+            self._pending_write.start()
+
     def _write_results(self) -> None:
-        self._report_file.truncate(0)
-        self._report_file.seek(0)
-        self._xml_tree.write(self._report_file, xml_declaration=True, encoding="utf-8")
-        self._report_file.flush()
+        with self._lock:
+            if self._pending_write:
+                self._pending_write.cancel()
+                self._pending_write = None
+
+            # Assemble the report from serialized test cases, so finished test
+            # cases are not serialized again.
+            parts: List[bytes] = [
+                b"<?xml version='1.0' encoding='utf-8'?>\n",
+                self._get_start_tag(self._testsuites),
+            ]
+            for testsuite_info in self._testsuites_info.values():
+                if testsuite_info.testcases:
+                    parts.append(self._get_start_tag(testsuite_info.xml))
+                    parts.extend(testsuite_info.testcases)
+                    parts.append(b"</testsuite>")
+                else:
+                    parts.append(self._get_start_tag(testsuite_info.xml, is_empty=True))
+            parts.append(b"</testsuites>")
+
+            write_file_atomically(self._report_path, b"".join(parts))
+            self._checkpoint_timer.reset()
+
+    def _get_start_tag(self, element: ET.Element, is_empty: bool = False) -> bytes:
+        # The element has no child, so it's serialized as an empty element by
+        # ElementTree, which escapes attributes in the same way as test cases.
+        tag = ET.tostring(element, encoding="unicode")
+        if not is_empty:
+            tag = tag[: -len(" />")] + ">"
+        return tag.encode("utf-8")
 
     # The types of messages that this class supports.
     def _subscribed_message_type(self) -> List[Type[MessageBase]]:
@@ -102,14 +149,15 @@ class JUnit(Notifier):
 
     # Handle a message.
     def _received_message(self, message: MessageBase) -> None:
-        if isinstance(message, TestRunMessage):
-            self._received_test_run(message)
+        with self._lock:
+            if isinstance(message, TestRunMessage):
+                self._received_test_run(message)
 
-        elif isinstance(message, TestResultMessage):
-            self._received_test_result(message)
+            elif isinstance(message, TestResultMessage):
+                self._received_test_result(message)
 
-        elif isinstance(message, SubTestMessage):
-            self._received_sub_test(message)
+            elif isinstance(message, SubTestMessage):
+                self._received_sub_test(message)
 
     # Handle a test run message.
     def _received_test_run(self, message: TestRunMessage) -> None:
@@ -144,7 +192,7 @@ class JUnit(Notifier):
             # Add test suite.
             testsuite_info = _TestSuiteInfo()
 
-            testsuite_info.xml = ET.SubElement(self._testsuites, "testsuite")
+            testsuite_info.xml = ET.Element("testsuite")
             testsuite_info.xml.attrib["name"] = message.suite_full_name
 
             # Timestamp must not contain timezone information.
@@ -154,7 +202,7 @@ class JUnit(Notifier):
             self._testsuites_info[message.suite_full_name] = testsuite_info
 
             # Write out current results to file.
-            self._write_results()
+            self._checkpoint()
 
     def _set_test_case_info(self, message: TestResultMessage) -> None:
         testcase_info = _TestCaseInfo()
@@ -287,7 +335,7 @@ class JUnit(Notifier):
         if not testsuite_info:
             raise LisaException("Test suite not started.")
 
-        testcase = ET.SubElement(testsuite_info.xml, "testcase")
+        testcase = ET.Element("testcase")
         testcase.attrib["name"] = message.name
         testcase.attrib["classname"] = class_name
         testcase.attrib["time"] = self._get_elapsed_str(elapsed)
@@ -307,9 +355,12 @@ class JUnit(Notifier):
             skipped.attrib["message"] = message.message
 
         testsuite_info.test_count += 1
+        testsuite_info.testcases.append(
+            ET.tostring(testcase, encoding="unicode").encode("utf-8")
+        )
 
         # Write out current results to file.
-        self._write_results()
+        self._checkpoint()
 
     def _get_elapsed_str(self, elapsed: float) -> str:
         return f"{elapsed:.3f}"
@@ -16,8 +16,10 @@ from typing import (
     Optional,
     Pattern,
     Sequence,
+    Tuple,
     Type,
     Union,
+    cast,
 )
 
 from assertpy import assert_that
@@ -42,6 +44,7 @@ from lisa.util import (
     MissingPackagesException,
     ReleaseEndOfLifeException,
     RepoNotExistException,
+    constants,
     filter_ansi_escape,
     get_matched_str,
     parse_version,
@@ -52,11 +55,33 @@ from lisa.util.process import ExecutableResult
 from lisa.util.subclasses import Factory
 
 if TYPE_CHECKING:
-    from lisa.node import Node
+    from lisa.node import Node, RemoteNode
 
 
 _get_init_logger = partial(get_logger, name="os")
 
+# The commands to detect distros. They run in one shell, and the outputs are
+# split by the markers.
+_FINGERPRINT_MARKER = "----lisa-os-fingerprint:{name}----"
+_FINGERPRINT_PATTERN = re.compile(r"^----lisa-os-fingerprint:(?P<name>.+)----\r?$")
+_FINGERPRINT_BOOT_ID = "boot_id"
+_FINGERPRINT_COMMANDS = {
+    "lsb_release": "lsb_release -d",
+    "os-release": "cat /etc/os-release",
+    "redhat-release": "cat /etc/redhat-release",
+    "uname": "uname",
+    "issue": "cat /etc/issue",
+    "release": "cat /etc/release",
+    "lsb-release": "cat /etc/lsb-release",
+    "SuSE-release": "cat /etc/SuSE-release",
+}
+
+
+def _get_fingerprint_marker_command(name: str) -> str:
+    # the output may not end with a new line, like a file without a new line
+    # at the end, so the marker starts with a new line.
+    return f"printf '\\n%s\\n' '{_FINGERPRINT_MARKER.format(name=name)}'"
+
 
 class CpuArchitecture(str, Enum):
     X64 = "x86_64"
@@ -122,6 +147,9 @@ class OperatingSystem:
     __suse_release_pattern = re.compile(r"^(SUSE).*$", re.M)
 
     __posix_factory: Optional[Factory[Any]] = None
+    # node address -> (boot id, outputs of fingerprint commands). If a node is
+    # connected again without reboot, the outputs are reused.
+    __fingerprint_cache: Dict[str, Tuple[str, Dict[str, str]]] = {}
 
     def __init__(self, node: "Node", is_posix: bool) -> None:
         super().__init__()
@@ -147,7 +175,8 @@ class OperatingSystem:
 
             matched = False
             os_infos: List[str] = []
-            for os_info_item in cls._get_detect_string(node):
+            fingerprint = cls._get_fingerprint(node)
+            for os_info_item in cls._get_detect_string(fingerprint):
                 if os_info_item:
                     os_infos.append(os_info_item)
                     for sub_type in posix_factory.values():
@@ -200,49 +229,96 @@ class OperatingSystem:
         ...
 
     @classmethod
-    def _get_detect_string(cls, node: Any) -> Iterable[str]:
+    def _get_fingerprint(cls, node: Any) -> Dict[str, str]:
+        """
+        Collects outputs of all detecting commands in one round trip. The outputs
+        are cached by the node address and boot id.
+        """
         typed_node: Node = node
-        cmd_result = typed_node.execute(cmd="lsb_release -d", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__lsb_release_pattern)
+        if typed_node.is_remote:
+            connection_info = cast("RemoteNode", typed_node).connection_info
+            key = (
+                f"{connection_info[constants.ENVIRONMENTS_NODES_REMOTE_ADDRESS]}:"
+                f"{connection_info[constants.ENVIRONMENTS_NODES_REMOTE_PORT]}"
+            )
+        else:
+            key = "localhost"
+        cached_boot_id, cached_fingerprint = cls.__fingerprint_cache.get(key, ("", {}))
+
+        commands = [
+            "boot_id=$(cat /proc/sys/kernel/random/boot_id 2>/dev/null "
+            "|| sysctl -n kern.boottime 2>/dev/null)",
+            _get_fingerprint_marker_command(_FINGERPRINT_BOOT_ID),
+            'echo "$boot_id"',
+        ]
+        if cached_boot_id:
+            # skip other commands, if it's not rebooted.
+            commands.append(f'[ "$boot_id" = "{cached_boot_id}" ] && exit 0')
+        for name, command in _FINGERPRINT_COMMANDS.items():
+            commands.append(_get_fingerprint_marker_command(name))
+            commands.append(f"{command} 2>/dev/null")
+        cmd_result = typed_node.execute(
+            cmd="; ".join(commands), shell=True, no_error_log=True
+        )
 
-        cmd_result = typed_node.execute(cmd="cat /etc/os-release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__os_release_pattern_name)
-        yield get_matched_str(cmd_result.stdout, cls.__os_release_pattern_id)
-        cmd_result_os_release = cmd_result
+        fingerprint: Dict[str, List[str]] = {}
+        lines: List[str] = []
+        for line in cmd_result.stdout.splitlines():
+            if not line.strip():
+                # the markers add blank lines.
+                continue
+            matched = _FINGERPRINT_PATTERN.match(line)
+            if matched:
+                lines = fingerprint.setdefault(matched.group("name"), [])
+            else:
+                lines.append(line)
+        result = {
+            name: "\n".join(values).strip() for name, values in fingerprint.items()
+        }
+
+        boot_id = result.pop(_FINGERPRINT_BOOT_ID, "")
+        if cached_boot_id and boot_id == cached_boot_id and not result:
+            return cached_fingerprint
+        if boot_id and result:
+            cls.__fingerprint_cache[key] = (boot_id, result)
+        return result
 
-        # for RedHat, CentOS 6.x
-        cmd_result = typed_node.execute(
-            cmd="cat /etc/redhat-release", no_error_log=True
+    @classmethod
+    def _get_detect_string(cls, fingerprint: Dict[str, str]) -> Iterable[str]:
+        yield get_matched_str(
+            fingerprint.get("lsb_release", ""), cls.__lsb_release_pattern
         )
-        yield get_matched_str(cmd_result.stdout, cls.__redhat_release_pattern_header)
-        yield get_matched_str(cmd_result.stdout, cls.__redhat_release_pattern_bracket)
+
+        os_release = fingerprint.get("os-release", "")
+        yield get_matched_str(os_release, cls.__os_release_pattern_name)
+        yield get_matched_str(os_release, cls.__os_release_pattern_id)
+
+        # for RedHat, CentOS 6.x
+        redhat_release = fingerprint.get("redhat-release", "")
+        yield get_matched_str(redhat_release, cls.__redhat_release_pattern_header)
+        yield get_matched_str(redhat_release, cls.__redhat_release_pattern_bracket)
 
         # for FreeBSD
-        cmd_result = typed_node.execute(cmd="uname", no_error_log=True)
-        yield cmd_result.stdout
+        yield fingerprint.get("uname", "")
 
         # for Debian
-        cmd_result = typed_node.execute(cmd="cat /etc/issue", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__debian_issue_pattern)
+        yield get_matched_str(fingerprint.get("issue", ""), cls.__debian_issue_pattern)
 
         # note, cat /etc/*release doesn't work in some images, so try them one by one
         # try best for other distros, like Sapphire
-        cmd_result = typed_node.execute(cmd="cat /etc/release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__release_pattern)
+        yield get_matched_str(fingerprint.get("release", ""), cls.__release_pattern)
 
         # try best for other distros, like VeloCloud
-        cmd_result = typed_node.execute(cmd="cat /etc/lsb-release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__release_pattern)
+        yield get_matched_str(fingerprint.get("lsb-release", ""), cls.__release_pattern)
 
         # try best for some suse derives, like netiq
-        cmd_result = typed_node.execute(cmd="cat /etc/SuSE-release", no_error_log=True)
-        yield get_matched_str(cmd_result.stdout, cls.__suse_release_pattern)
-
-        # try best from distros'family through ID_LIKE
         yield get_matched_str(
-            cmd_result_os_release.stdout, cls.__os_release_pattern_idlike
+            fingerprint.get("SuSE-release", ""), cls.__suse_release_pattern
         )
 
+        # try best from distros'family through ID_LIKE
+        yield get_matched_str(os_release, cls.__os_release_pattern_idlike)
+
     def _get_information(self) -> OsInformation:
         raise NotImplementedError()
 
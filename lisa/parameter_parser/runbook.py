@@ -9,10 +9,9 @@ from typing import Any, Dict, List, Optional, Set, Union, cast
 import yaml
 from marshmallow import Schema
 
-from lisa import schema
+from lisa import schema, testsuite_index
 from lisa.util import LisaException, constants
 from lisa.util.logger import get_logger
-from lisa.util.package import import_package
 from lisa.variable import VariableEntry, load_variables, replace_variables
 
 _schema: Optional[Schema] = None
@@ -159,7 +158,7 @@ class RunbookBuilder:
             for index, extension in enumerate(extensions):
                 if not extension.name:
                     extension.name = f"lisa_ext_{index}"
-                import_package(Path(extension.path), extension.name)
+                testsuite_index.add_package(Path(extension.path), extension.name)
 
             del self._raw_data[constants.EXTENSION]
 
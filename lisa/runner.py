@@ -83,6 +83,10 @@ class RunnerResult(notifier.Notifier):
     def _subscribed_message_type(self) -> List[Type[messages.MessageBase]]:
         return [TestResultMessage]
 
+    def _is_synchronous(self) -> bool:
+        # the runner reads results immediately after they are sent.
+        return True
+
     def _initialize(self, *args: Any, **kwargs: Any) -> None:
         self.results: Dict[str, TestResultMessage] = {}
 
@@ -3,7 +3,7 @@
 
 import copy
 from functools import partial
-from typing import Any, Callable, Dict, List, Optional, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, cast
 
 from lisa import (
     ResourceAwaitableException,
@@ -17,6 +17,7 @@ from lisa.action import ActionStatus
 from lisa.environment import (
     Environment,
     Environments,
+    EnvironmentSpace,
     EnvironmentStatus,
     load_environments,
 )
@@ -36,6 +37,103 @@ from lisa.util import (
 from lisa.util.parallel import Task, check_cancelled
 from lisa.variable import VariableEntry
 
+# the test results are sorted by the status descending, it makes sure Deployed
+# is before Connected.
+_environment_status_order: Dict[EnvironmentStatus, int] = {
+    status: index
+    for index, status in enumerate(sorted(EnvironmentStatus, key=str, reverse=True))
+}
+
+
+class _ScheduleIndex:
+    """
+    Keeps the test results in the scheduling order and bucketed by priority, so
+    they are not sorted on every fetching. It also caches the requirement
+    checks, which are the most expensive part of scheduling. The checks of an
+    environment are cached until its status is changed.
+    """
+
+    def __init__(self) -> None:
+        self._sort_keys: Dict[str, Tuple[int, bool, int, str]] = {}
+        self._buckets: Dict[int, List[TestResult]] = {}
+        # environment id -> (status version, capability, requirement id ->
+        # check result). The requirements are in test case metadata, so their
+        # ids don't change during the run.
+        self._checks: Dict[
+            int,
+            Tuple[int, EnvironmentSpace, Dict[int, search_space.ResultReason]],
+        ] = {}
+        self.hit_count = 0
+        self.miss_count = 0
+
+    def update(self, test_results: List[TestResult]) -> None:
+        buckets: Dict[int, List[TestResult]] = {}
+        for test_result in self.sort(test_results):
+            buckets.setdefault(test_result.runtime_data.metadata.priority, []).append(
+                test_result
+            )
+        self._buckets = buckets
+
+    def remove_completed(self) -> None:
+        for priority, test_results in self._buckets.items():
+            self._buckets[priority] = [x for x in test_results if not x.is_completed]
+
+    def get_can_run_results(self, priority: Optional[int] = None) -> List[TestResult]:
+        if priority is None:
+            return [
+                x
+                for key in sorted(self._buckets)
+                for x in self._buckets[key]
+                if x.can_run
+            ]
+        return [x for x in self._buckets.get(priority, []) if x.can_run]
+
+    def sort(self, test_results: List[TestResult]) -> List[TestResult]:
+        # sort by priority, use new environment, environment status and suite
+        # name. The order of input is kept for the same key.
+        return sorted(test_results, key=self._get_sort_key)
+
+    def check(
+        self, test_result: TestResult, environment: Environment
+    ) -> search_space.ResultReason:
+        requirement = test_result.runtime_data.metadata.requirement.environment
+        assert requirement
+
+        environment_id = id(environment)
+        cached = self._checks.get(environment_id)
+        if cached is None or cached[0] != environment.status_version:
+            # read version before capability, so a status change in between
+            # invalidates it on next check.
+            cached = (environment.status_version, environment.capability, {})
+            self._checks[environment_id] = cached
+
+        _, capability, checks = cached
+        check_result = checks.get(id(requirement))
+        if check_result is None:
+            self.miss_count += 1
+            check_result = requirement.check(capability)
+            checks[id(requirement)] = check_result
+        else:
+            self.hit_count += 1
+        return check_result
+
+    def remove_environment(self, environment: Environment) -> None:
+        self._checks.pop(id(environment), None)
+
+    def _get_sort_key(self, test_result: TestResult) -> Tuple[int, bool, int, str]:
+        sort_key = self._sort_keys.get(test_result.id_)
+        if sort_key is None:
+            metadata = test_result.runtime_data.metadata
+            sort_key = (
+                metadata.priority,
+                # new environment first
+                not test_result.runtime_data.use_new_environment,
+                _environment_status_order[metadata.requirement.environment_status],
+                str(metadata.suite.name),
+            )
+            self._sort_keys[test_result.id_] = sort_key
+        return sort_key
+
 
 class LisaRunner(BaseRunner):
     @classmethod
@@ -53,6 +151,8 @@ class LisaRunner(BaseRunner):
             TestResult(f"{self.id}_{index}", runtime_data=case)
             for index, case in enumerate(selected_test_cases)
         ]
+        self._schedule_index = _ScheduleIndex()
+        self._schedule_index.update(self.test_results)
         # load predefined environments
         self.platform = load_platform(self._runbook.platform)
         self.platform.initialize()
@@ -97,9 +197,7 @@ class LisaRunner(BaseRunner):
 
         # sort environments by status
         available_environments = self._sort_environments(self.environments)
-        available_results = self._sort_test_results(
-            [x for x in self.test_results if x.can_run]
-        )
+        available_results = self._schedule_index.get_can_run_results()
 
         # check deletable environments
         delete_task = self._delete_unused_environments()
@@ -108,9 +206,7 @@ class LisaRunner(BaseRunner):
 
         if available_results and available_environments:
             for priority in range(6):
-                can_run_results = self._get_results_by_priority(
-                    available_results, priority
-                )
+                can_run_results = self._schedule_index.get_can_run_results(priority)
                 if not can_run_results:
                     continue
 
@@ -161,6 +257,11 @@ class LisaRunner(BaseRunner):
         if hasattr(self, "environments") and self.environments:
             for environment in self.environments:
                 self._delete_environment_task(environment, [])
+        if hasattr(self, "_schedule_index"):
+            self._log.debug(
+                f"requirement check cache hit: {self._schedule_index.hit_count}, "
+                f"miss: {self._schedule_index.miss_count}"
+            )
         self.platform.cleanup()
         super().close()
 
@@ -449,6 +550,8 @@ class LisaRunner(BaseRunner):
         for environment in self.environments[:]:
             if environment.status != EnvironmentStatus.Deleted:
                 new_environments.append(environment)
+            else:
+                self._schedule_index.remove_environment(environment)
         self.environments = new_environments
 
     def _cleanup_done_results(self) -> None:
@@ -458,18 +561,7 @@ class LisaRunner(BaseRunner):
             if not test_result.is_completed:
                 remaining_results.append(test_result)
         self.test_results = remaining_results
-
-    def _get_results_by_priority(
-        self, test_results: List[TestResult], priority: int
-    ) -> List[TestResult]:
-        if not test_results:
-            return []
-
-        test_results = [
-            x for x in test_results if x.runtime_data.metadata.priority == priority
-        ]
-
-        return test_results
+        self._schedule_index.remove_completed()
 
     def _generate_task(
         self,
@@ -588,8 +680,11 @@ class LisaRunner(BaseRunner):
             runnable_results: List[TestResult] = []
             for result in results:
                 try:
+                    check_result = self._schedule_index.check(result, environment)
                     if result.check_environment(
-                        environment=environment, save_reason=True
+                        environment=environment,
+                        save_reason=True,
+                        check_result=check_result,
                     ) and (
                         not result.runtime_data.use_new_environment
                         or environment.is_new
@@ -659,22 +754,7 @@ class LisaRunner(BaseRunner):
         return results
 
     def _sort_test_results(self, test_results: List[TestResult]) -> List[TestResult]:
-        results = test_results.copy()
-        # sort by priority, use new environment, environment status and suite name.
-        results.sort(
-            key=lambda r: str(r.runtime_data.metadata.suite.name),
-        )
-        # this step make sure Deployed is before Connected
-        results.sort(
-            reverse=True,
-            key=lambda r: str(r.runtime_data.metadata.requirement.environment_status),
-        )
-        results.sort(
-            reverse=True,
-            key=lambda r: str(r.runtime_data.use_new_environment),
-        )
-        results.sort(key=lambda r: r.runtime_data.metadata.priority)
-        return results
+        return self._schedule_index.sort(test_results)
 
     def _skip_test_results(
         self,
@@ -331,6 +331,35 @@ class Notifier(TypedSchema, ExtendableSchemaMixin):
     # A notifier is disabled, if it's false. It helps to disable notifier by
     # variables.
     enabled: bool = True
+    # Messages are delivered to each notifier in its own thread. The queue
+    # holds messages, which are not delivered yet. If it's 0, messages are
+    # delivered in the thread, which sends them.
+    queue_size: int = field(
+        default=1000,
+        metadata=field_metadata(
+            field_function=fields.Int, validate=validate.Range(min=0)
+        ),
+    )
+    # When the queue is full, block the sender, or drop messages.
+    overflow_policy: str = field(
+        default=constants.NOTIFIER_OVERFLOW_BLOCK,
+        metadata=field_metadata(
+            validate=validate.OneOf(
+                [
+                    constants.NOTIFIER_OVERFLOW_BLOCK,
+                    constants.NOTIFIER_OVERFLOW_DROP_OLDEST,
+                    constants.NOTIFIER_OVERFLOW_DROP_NEWEST,
+                ]
+            ),
+        ),
+    )
+    # the max count of messages, which are delivered in one batch.
+    batch_size: int = field(
+        default=100,
+        metadata=field_metadata(
+            field_function=fields.Int, validate=validate.Range(min=1)
+        ),
+    )
 
 
 @dataclass_json()
@@ -760,6 +789,9 @@ class FeaturesSpace(
 @dataclass_json()
 @dataclass()
 class NodeSpace(search_space.RequirementMixin, TypedSchema, ExtendableSchemaMixin):
+    # it's checked with many vm sizes and test cases, so cache the results.
+    _is_cached = True
+
     type: str = field(
         default=constants.ENVIRONMENTS_NODES_REQUIREMENT,
         metadata=field_metadata(
@@ -1485,6 +1517,22 @@ class Development:
     enable_trace: bool = False
     mock_tcp_ping: bool = False
     jump_boxes: List[ProxyConnectionInfo] = field(default_factory=list)
+    # how many SSH sessions are pre-opened per node. Set to 0 to open sessions
+    # on demand. The pre-opened sessions count in MaxSessions of sshd.
+    ssh_channel_pool_size: int = field(
+        default=constants.DEFAULT_SSH_CHANNEL_POOL_SIZE,
+        metadata=field_metadata(
+            field_function=fields.Int, validate=validate.Range(min=0)
+        ),
+    )
+    # in MB. The output of a command is kept in memory up to this size, and
+    # the rest is spilled to a temporary file.
+    process_output_memory_limit: int = field(
+        default=constants.DEFAULT_PROCESS_OUTPUT_MEMORY_LIMIT,
+        metadata=field_metadata(
+            field_function=fields.Int, validate=validate.Range(min=1)
+        ),
+    )
 
 
 @dataclass_json()
@@ -3,9 +3,24 @@
 
 import copy
 import sys
-from dataclasses import dataclass, field
+import threading
+from collections import OrderedDict
+from dataclasses import dataclass, field, fields, is_dataclass
 from enum import Enum
-from typing import Any, Iterable, List, Optional, Set, Type, TypeVar, Union
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Hashable,
+    Iterable,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+)
 
 from dataclasses_json import dataclass_json
 
@@ -55,16 +70,30 @@ class ResultReason:
 
 
 class RequirementMixin:
+    # If it's True, the results of generate_min_capability and intersect are
+    # cached by the canonical keys of requirement and capability. It's set on
+    # composite types only. For simple types, creating the keys costs more
+    # than the methods.
+    _is_cached = False
+
     def check(self, capability: Any) -> ResultReason:
         raise NotImplementedError()
 
     def generate_min_capability(self, capability: Any) -> Any:
-        self._validate_result(capability)
-        return self._generate_min_capability(capability)
+        return _call_with_cache(
+            method=RequirementMethod.generate_min_capability,
+            requirement=self,
+            capability=capability,
+            function=self._generate_min_capability,
+        )
 
     def intersect(self, capability: Any) -> Any:
-        self._validate_result(capability)
-        return self._intersect(capability)
+        return _call_with_cache(
+            method=RequirementMethod.intersect,
+            requirement=self,
+            capability=capability,
+            function=self._intersect,
+        )
 
     def _call_requirement_method(
         self, method: RequirementMethod, capability: Any
@@ -93,6 +122,181 @@ class RequirementMixin:
 T_SEARCH_SPACE = TypeVar("T_SEARCH_SPACE", bound=RequirementMixin)
 
 
+class _ResultCache:
+    """
+    A LRU cache of requirement method results. The results are copied on
+    saving and returning, so callers can change them.
+    """
+
+    def __init__(self, max_size: int) -> None:
+        self.max_size = max_size
+        self.hit_count = 0
+        self.miss_count = 0
+        self._results: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._results:
+                self.hit_count += 1
+                self._results.move_to_end(key)
+                return True, self._results[key]
+            self.miss_count += 1
+            return False, None
+
+    def set(self, key: Hashable, value: Any) -> None:
+        with self._lock:
+            self._results[key] = value
+            self._results.move_to_end(key)
+            while len(self._results) > self.max_size:
+                self._results.popitem(last=False)
+
+    def clear(self) -> None:
+        with self._lock:
+            self._results.clear()
+            self.hit_count = 0
+            self.miss_count = 0
+
+    def get_statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "size": len(self._results),
+                "hit_count": self.hit_count,
+                "miss_count": self.miss_count,
+            }
+
+
+_cache = _ResultCache(max_size=4096)
+
+
+class _UncacheableError(Exception):
+    pass
+
+
+class _CanonicalKey(tuple):  # type: ignore
+    """
+    The hash is cached, because the keys of NodeSpace are large, and they are
+    hashed on each lookup.
+    """
+
+    _hash: Optional[int] = None
+
+    def __hash__(self) -> int:
+        if self._hash is None:
+            self._hash = super().__hash__()
+        return self._hash
+
+
+_field_names: Dict[Type[Any], Tuple[str, ...]] = {}
+
+
+def get_canonical_key(value: Any) -> Optional[Hashable]:
+    """
+    Returns a hashable form of a search space, like CountSpace, SetSpace or
+    NodeSpace. Equal keys mean the values are the same, so the results of
+    requirement methods are the same too. It returns None, if the value
+    contains a type, which cannot be converted.
+
+    The key is a snapshot, it needs to be created again after the value is
+    changed.
+    """
+    try:
+        return _CanonicalKey(_get_key(value))
+    except _UncacheableError:
+        return None
+
+
+def _get_key(value: Any) -> Tuple[Any, ...]:
+    if value is None:
+        return ()
+    value_type = type(value)
+    if isinstance(value, (str, int, float, Enum, type)):
+        # keep the type, so 1, True and enums in str are not mixed.
+        return value_type, value
+    if isinstance(value, IntRange):
+        return value_type, value.min, value.max, value.max_inclusive
+    if isinstance(value, SetSpace):
+        # the order of items is kept, since some methods pick the first match.
+        return (
+            value_type,
+            value.is_allow_set,
+            tuple(_get_key(x) for x in value.items),
+        )
+    if isinstance(value, (list, tuple)):
+        return value_type, tuple(_get_key(x) for x in value)
+    if isinstance(value, dict):
+        return value_type, tuple(
+            (_get_key(key), _get_key(item)) for key, item in value.items()
+        )
+    if is_dataclass(value):
+        names = _field_names.get(value_type)
+        if names is None:
+            names = tuple(x.name for x in fields(value))
+            _field_names[value_type] = names
+        return value_type, tuple(_get_key(getattr(value, x)) for x in names)
+
+    raise _UncacheableError(f"unknown type: {value_type}")
+
+
+def get_cache_statistics() -> Dict[str, int]:
+    return _cache.get_statistics()
+
+
+def clear_cache() -> None:
+    _cache.clear()
+
+
+def _copy_result_reason(result: ResultReason) -> ResultReason:
+    return ResultReason(
+        result=result.result, reasons=result.reasons.copy(), _prefix=result._prefix
+    )
+
+
+def _check_with_cache(
+    requirement: Any,
+    capability: Any,
+    requirement_key: Optional[Hashable],
+    capability_key: Optional[Hashable],
+) -> ResultReason:
+    if requirement_key is None or capability_key is None:
+        result: ResultReason = requirement.check(capability)
+        return result
+
+    key = ("check", requirement_key, capability_key)
+    is_found, cached_result = _cache.get(key)
+    if is_found:
+        return _copy_result_reason(cached_result)
+
+    result = requirement.check(capability)
+    _cache.set(key, _copy_result_reason(result))
+    return result
+
+
+def _call_with_cache(
+    method: RequirementMethod,
+    requirement: RequirementMixin,
+    capability: Any,
+    function: Callable[[Any], Any],
+) -> Any:
+    key: Optional[Hashable] = None
+    if requirement._is_cached:
+        requirement_key = get_canonical_key(requirement)
+        capability_key = get_canonical_key(capability)
+        if requirement_key is not None and capability_key is not None:
+            key = (method.value, requirement_key, capability_key)
+
+    if key is not None:
+        is_found, cached_result = _cache.get(key)
+        if is_found:
+            return copy.deepcopy(cached_result)
+
+    requirement._validate_result(capability)
+    result = function(capability)
+    if key is not None:
+        _cache.set(key, copy.deepcopy(result))
+    return result
+
+
 @dataclass_json()
 @dataclass
 class IntRange(RequirementMixin):
@@ -597,7 +801,14 @@ def count_space_to_int_range(count_space: CountSpace) -> IntRange:
 def check(
     requirement: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
     capability: Union[T_SEARCH_SPACE, List[T_SEARCH_SPACE], None],
+    requirement_key: Optional[Hashable] = None,
+    capability_key: Optional[Hashable] = None,
 ) -> ResultReason:
+    """
+    If keys from get_canonical_key are provided, the result is cached. Creating
+    the keys costs more than a check, so callers should create them once for
+    many checks, and recreate them if the values are changed.
+    """
     result = ResultReason()
     if requirement is not None:
         if capability is None:
@@ -616,7 +827,11 @@ def check(
                     f"requirement: {requirement}, capability: {capability}"
                 )
         else:
-            result.merge(requirement.check(capability))
+            result.merge(
+                _check_with_cache(
+                    requirement, capability, requirement_key, capability_key
+                )
+            )
     return result
 
 
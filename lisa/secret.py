@@ -2,7 +2,14 @@
 # Licensed under the MIT license.
 
 import re
-from typing import Any, List, Optional, Pattern, Set, Tuple, Union
+import threading
+from bisect import bisect_right
+from typing import Any, Dict, List, Optional, Pattern, Tuple, Union
+
+try:
+    import ahocorasick as _ahocorasick  # type: ignore
+except ModuleNotFoundError:
+    _ahocorasick = None
 
 PATTERN_GUID = (
     re.compile(r"^([0-9a-f]{8})-(?:[0-9a-f]{4}-){3}[0-9a-f]{8}([0-9a-f]{4})$"),
@@ -46,13 +53,127 @@ def replace(
         return sub
 
 
-_secret_list: List[Tuple[str, str]] = []
-_secret_set: Set[str] = set()
+class _SecretMatcher:
+    """
+    Finds and masks all secrets in a text. If pyahocorasick is installed and
+    there are many secrets, secrets are compiled to an Aho-Corasick automaton,
+    so a text is scanned once for all secrets. For a few secrets, searching
+    them one by one with str is faster, so it's used as well as a fallback.
+    """
+
+    # Below this count, the str search is faster. It's measured by
+    # selftests/benchmarks/secret.py
+    automaton_threshold = 32
+
+    def __init__(self) -> None:
+        # deal with longer first, in case it's broken by shorter. The same
+        # length keeps the adding order.
+        self.secrets: List[Tuple[str, str]] = []
+        # origin -> (adding order, replacement)
+        self._replacements: Dict[str, Tuple[int, str]] = {}
+        self._automaton: Any = None
+        self._is_automaton_dirty = False
+        self._lock = threading.Lock()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.secrets = []
+            self._replacements = {}
+            self._automaton = None
+            self._is_automaton_dirty = False
+
+    def add(self, origin: str, replacement: str) -> None:
+        with self._lock:
+            existing = self._replacements.get(origin)
+            if existing:
+                order = existing[0]
+                secrets = [
+                    (x, replacement) if x == origin else (x, y) for x, y in self.secrets
+                ]
+            else:
+                order = len(self._replacements)
+                secrets = self.secrets.copy()
+                # insert after all longer or same length secrets.
+                keys = [-len(x[0]) for x in secrets]
+                secrets.insert(bisect_right(keys, -len(origin)), (origin, replacement))
+            self._replacements[origin] = (order, replacement)
+            # replace the list, so the masking threads are not affected.
+            self.secrets = secrets
+
+            if self._automaton is not None or (
+                _ahocorasick and len(secrets) >= self.automaton_threshold
+            ):
+                # it's compiled on next masking, so adding many secrets
+                # compiles once only.
+                self._is_automaton_dirty = True
+
+    def mask(self, text: str) -> str:
+        if self._is_automaton_dirty:
+            self._compile()
+        automaton = self._automaton
+        if automaton is not None:
+            return self.mask_by_automaton(text, automaton)
+        return self.mask_by_scan(text)
+
+    def mask_by_scan(self, text: str) -> str:
+        for secret in self.secrets:
+            if secret[0] in text:
+                text = text.replace(secret[0], secret[1])
+        return text
+
+    def mask_by_automaton(self, text: str, automaton: Any) -> str:
+        matches: List[Tuple[int, int, int, str]] = []
+        for end, origin in automaton.iter(text):
+            length = len(origin)
+            # sort as the scan order: longer first, then adding order.
+            matches.append(
+                (-length, self._replacements[origin][0], end - length + 1, origin)
+            )
+        if not matches:
+            return text
+
+        # pick matches in the scan order, and skip the overlapped ones, which
+        # are replaced by a previous secret already.
+        matches.sort()
+        starts: List[int] = []
+        selected: List[Tuple[int, int, str]] = []
+        for negative_length, _, start, origin in matches:
+            end = start - negative_length
+            index = bisect_right(starts, start)
+            if index > 0 and selected[index - 1][1] > start:
+                continue
+            if index < len(starts) and starts[index] < end:
+                continue
+            starts.insert(index, start)
+            selected.insert(index, (start, end, self._replacements[origin][1]))
+
+        result: List[str] = []
+        position = 0
+        for start, end, replacement in selected:
+            result.append(text[position:start])
+            result.append(replacement)
+            position = end
+        result.append(text[position:])
+        return "".join(result)
+
+    def _compile(self) -> None:
+        with self._lock:
+            if not self._is_automaton_dirty:
+                return
+            # build a new one, so the masking threads are not affected.
+            automaton = _ahocorasick.Automaton()
+            for secret, _ in self.secrets:
+                automaton.add_word(secret, secret)
+            automaton.make_automaton()
+            self._automaton = automaton
+            self._is_automaton_dirty = False
+
+
+_matcher = _SecretMatcher()
 
 
 def reset() -> None:
-    _secret_set.clear()
-    _secret_list.clear()
+    _matcher.reset()
 
 
 def add_secret(
@@ -60,24 +181,11 @@ def add_secret(
     mask: Optional[Union[Pattern[str], Tuple[Pattern[str], str]]] = None,
     sub: str = "******",
 ) -> None:
-    global _secret_list
     if origin:
         if not isinstance(origin, str):
             origin = str(origin)
-        if origin in _secret_set:
-            for index, secret in enumerate(_secret_list):
-                if origin == secret[0]:
-                    _secret_list[index] = (origin, replace(origin, sub=sub, mask=mask))
-                    break
-        else:
-            _secret_set.add(origin)
-            _secret_list.append((origin, replace(origin, sub=sub, mask=mask)))
-            # deal with longer first, in case it's broken by shorter
-            _secret_list = sorted(_secret_list, reverse=True, key=lambda x: len(x[0]))
+        _matcher.add(origin, replace(origin, sub=sub, mask=mask))
 
 
 def mask(text: str) -> str:
-    for secret in _secret_list:
-        if secret[0] in text:
-            text = text.replace(secret[0], secret[1])
-    return text
+    return _matcher.mask(text)
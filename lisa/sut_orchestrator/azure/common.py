@@ -10,11 +10,24 @@ from functools import lru_cache
 from pathlib import Path
 from threading import Lock
 from time import sleep
-from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple, Union
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    List,
+    Optional,
+    Tuple,
+    Type,
+    TypeVar,
+    Union,
+    cast,
+)
 
 import requests
+from azure.core.pipeline.transport import RequestsTransport
 from azure.mgmt.compute import ComputeManagementClient  # type: ignore
-from azure.mgmt.compute.models import VirtualMachine  # type: ignore
+from azure.mgmt.compute.models import DiskCreateOption, VirtualMachine  # type: ignore
 from azure.mgmt.marketplaceordering import MarketplaceOrderingAgreements  # type: ignore
 from azure.mgmt.network import NetworkManagementClient  # type: ignore
 from azure.mgmt.network.models import (  # type: ignore
@@ -44,7 +57,9 @@ from azure.storage.blob import (
     BlobClient,
     BlobSasPermissions,
     BlobServiceClient,
+    BlobType,
     ContainerClient,
+    ContentSettings,
     ResourceTypes,
     generate_account_sas,
     generate_blob_sas,
@@ -54,7 +69,10 @@ from dataclasses_json import dataclass_json
 from marshmallow import validate
 from msrestazure.azure_cloud import Cloud  # type: ignore
 from PIL import Image, UnidentifiedImageError
+from requests.adapters import DEFAULT_POOLSIZE
 from retry import retry
+from urllib3.connection import HTTPSConnection
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
 
 from lisa import schema
 from lisa.environment import Environment, load_environments
@@ -67,16 +85,19 @@ from lisa.util import (
     check_till_timeout,
     constants,
     field_metadata,
+    generate_random_chars,
     get_matched_str,
     strip_strs,
 )
 from lisa.util.logger import Logger
-from lisa.util.parallel import check_cancelled
-from lisa.util.perf_timer import create_timer
+from lisa.util.parallel import check_cancelled, run_in_parallel
+from lisa.util.perf_timer import Timer, create_timer
 
 if TYPE_CHECKING:
     from .platform_ import AzurePlatform
 
+T = TypeVar("T")
+
 AZURE_SHARED_RG_NAME = "lisa_shared_resource"
 AZURE_VIRTUAL_NETWORK_NAME = "lisa-virtualNetwork"
 AZURE_SUBNET_PREFIX = "lisa-subnet-"
@@ -113,7 +134,20 @@ SAS_COPIED_CONTAINER_NAME = "lisa-sas-copied"
 # The timeout hours of the blob with copy pending status
 # If the blob is still copy pending status after the timeout hours, it can be deleted
 BLOB_COPY_PENDING_TIMEOUT_HOURS = 6
-_global_sas_vhd_copy_lock = Lock()
+# lock per destination blob to prevent a vhd is copied in multi-thread. The
+# different vhds can be copied at the same time.
+_sas_vhd_copy_locks: Dict[str, Lock] = {}
+_sas_vhd_copy_locks_lock = Lock()
+
+# The metadata key marks the blob is copied by page ranges. It's "Pending"
+# until all pages are copied, so a failed copy can be resumed.
+PAGE_COPY_STATUS_KEY = "LisaPageCopyStatus"
+_PAGE_COPY_STATUS_PENDING = "Pending"
+_PAGE_COPY_STATUS_SUCCESS = "Success"
+# The page size of page blobs, and the max size of a page range, which can be
+# copied by one request.
+_PAGE_SIZE = 512
+_PAGE_COPY_MAX_SIZE = 4 * 1024 * 1024
 
 # when call sdk APIs, it's easy to have conflict on access auth files. Use lock
 # to prevent it happens.
@@ -122,6 +156,9 @@ global_credential_access_lock = Lock()
 # to create the same stroage account at the same time.
 # add a lock to prevent it happens.
 _global_storage_account_check_create_lock = Lock()
+# The connection pool size of each management client. The clients are shared
+# by all environments, so it should be enough for parallel deployments.
+_CONNECTION_POOL_SIZE = 64
 
 
 @dataclass
@@ -546,6 +583,108 @@ class AzureArmParameter:
         add_secret(self.admin_key_data)
 
 
+class _CountedHTTPSConnection(HTTPSConnection):
+    def connect(self) -> None:
+        super().connect()
+        _client_pool.add_handshake()
+
+
+class _CountedHTTPSConnectionPool(HTTPSConnectionPool):
+    ConnectionCls = _CountedHTTPSConnection
+
+
+class _PooledTransport(RequestsTransport):  # type: ignore
+    """
+    The transport of shared clients. It has a larger connection pool, and
+    counts new TLS connections.
+    """
+
+    def _init_session(self, session: requests.Session) -> None:
+        super()._init_session(session)
+        for adapter in set(session.adapters.values()):
+            adapter.init_poolmanager(DEFAULT_POOLSIZE, _CONNECTION_POOL_SIZE)
+            adapter.poolmanager.pool_classes_by_scheme = {
+                "http": HTTPConnectionPool,
+                "https": _CountedHTTPSConnectionPool,
+            }
+
+
+class _ClientPool:
+    """
+    Shares management clients by type, credential, subscription, api version
+    and cloud. A client keeps its connections and access tokens, so they are
+    not created again on each call. The clients are thread safe.
+    """
+
+    def __init__(self) -> None:
+        self._clients: Dict[Tuple[Any, ...], Any] = {}
+        self._lock = Lock()
+        self._created_count = 0
+        self._hit_count = 0
+        self._handshake_count = 0
+
+    def get(
+        self,
+        client_type: Type[T],
+        credential: Any,
+        subscription_id: str,
+        cloud: Cloud,
+        api_version: Optional[str] = None,
+    ) -> T:
+        resource_manager = cloud.endpoints.resource_manager
+        # the credential is referenced by the client, so the id is not reused.
+        key = (
+            client_type,
+            id(credential),
+            subscription_id,
+            api_version,
+            resource_manager,
+        )
+        with self._lock:
+            client = self._clients.get(key, None)
+            if client:
+                self._hit_count += 1
+            else:
+                kwargs: Dict[str, Any] = {}
+                if api_version:
+                    kwargs["api_version"] = api_version
+                # the clients of azure SDK have the same arguments.
+                client = cast(Any, client_type)(
+                    credential=credential,
+                    subscription_id=subscription_id,
+                    base_url=resource_manager,
+                    credential_scopes=[resource_manager + "/.default"],
+                    transport=_PooledTransport(),
+                    **kwargs,
+                )
+                self._clients[key] = client
+                self._created_count += 1
+        return cast(T, client)
+
+    def add_handshake(self) -> None:
+        with self._lock:
+            self._handshake_count += 1
+
+    def get_statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "clients": self._created_count,
+                "reused": self._hit_count,
+                "handshakes": self._handshake_count,
+            }
+
+
+_client_pool = _ClientPool()
+
+
+def get_client_statistics() -> Dict[str, int]:
+    """
+    Returns the count of created management clients, reused clients, and TLS
+    handshakes of them.
+    """
+    return _client_pool.get_statistics()
+
+
 def get_compute_client(
     platform: "AzurePlatform",
     api_version: Optional[str] = None,
@@ -553,12 +692,12 @@ def get_compute_client(
 ) -> ComputeManagementClient:
     if not subscription_id:
         subscription_id = platform.subscription_id
-    return ComputeManagementClient(
+    return _client_pool.get(
+        ComputeManagementClient,
         credential=platform.credential,
         subscription_id=subscription_id,
+        cloud=platform.cloud,
         api_version=api_version,
-        base_url=platform.cloud.endpoints.resource_manager,
-        credential_scopes=[platform.cloud.endpoints.resource_manager + "/.default"],
     )
 
 
@@ -625,11 +764,11 @@ def delete_private_endpoints(
 def get_private_dns_management_client(
     platform: "AzurePlatform",
 ) -> PrivateDnsManagementClient:
-    return PrivateDnsManagementClient(
+    return _client_pool.get(
+        PrivateDnsManagementClient,
         credential=platform.credential,
         subscription_id=platform.subscription_id,
-        base_url=platform.cloud.endpoints.resource_manager,
-        credential_scopes=[platform.cloud.endpoints.resource_manager + "/.default"],
+        cloud=platform.cloud,
     )
 
 
@@ -871,33 +1010,33 @@ def get_virtual_networks(
 
 
 def get_network_client(platform: "AzurePlatform") -> NetworkManagementClient:
-    return NetworkManagementClient(
+    return _client_pool.get(
+        NetworkManagementClient,
         credential=platform.credential,
         subscription_id=platform.subscription_id,
-        base_url=platform.cloud.endpoints.resource_manager,
-        credential_scopes=[platform.cloud.endpoints.resource_manager + "/.default"],
+        cloud=platform.cloud,
     )
 
 
 def get_storage_client(
     credential: Any, subscription_id: str, cloud: Cloud
 ) -> StorageManagementClient:
-    return StorageManagementClient(
+    return _client_pool.get(
+        StorageManagementClient,
         credential=credential,
         subscription_id=subscription_id,
-        base_url=cloud.endpoints.resource_manager,
-        credential_scopes=[cloud.endpoints.resource_manager + "/.default"],
+        cloud=cloud,
     )
 
 
 def get_resource_management_client(
     credential: Any, subscription_id: str, cloud: Cloud
 ) -> ResourceManagementClient:
-    return ResourceManagementClient(
+    return _client_pool.get(
+        ResourceManagementClient,
         credential=credential,
         subscription_id=subscription_id,
-        base_url=cloud.endpoints.resource_manager,
-        credential_scopes=[cloud.endpoints.resource_manager + "/.default"],
+        cloud=cloud,
     )
 
 
@@ -912,11 +1051,11 @@ def get_storage_account_name(
 def get_marketplace_ordering_client(
     platform: "AzurePlatform",
 ) -> MarketplaceOrderingAgreements:
-    return MarketplaceOrderingAgreements(
+    return _client_pool.get(
+        MarketplaceOrderingAgreements,
         credential=platform.credential,
         subscription_id=platform.subscription_id,
-        base_url=platform.cloud.endpoints.resource_manager,
-        credential_scopes=[platform.cloud.endpoints.resource_manager + "/.default"],
+        cloud=platform.cloud,
     )
 
 
@@ -955,6 +1094,151 @@ def wait_operation(
     return result
 
 
+def wait_operations(
+    names: List[str],
+    begin: Callable[[str], Any],
+    concurrency: int,
+    log: Logger,
+    operation_name: str,
+) -> List[Any]:
+    """
+    Begin long running operations by names, and wait for them. At most
+    concurrency operations are running at the same time, and the next one begins
+    when any of them is done. The elapsed time of each operation is logged, and
+    the results are returned in the order of names.
+    """
+    timer = create_timer()
+    results: List[Any] = [None] * len(names)
+    running: List[Tuple[int, Any, Timer]] = []
+    for index, name in enumerate(names):
+        while len(running) >= concurrency:
+            _wait_any_operation(names, running, results, log, operation_name)
+        running.append((index, begin(name), create_timer()))
+    while running:
+        _wait_any_operation(names, running, results, log, operation_name)
+    if names:
+        log.debug(f"{operation_name} {len(names)} resources in {timer}")
+    return results
+
+
+def _wait_any_operation(
+    names: List[str],
+    running: List[Tuple[int, Any, Timer]],
+    results: List[Any],
+    log: Logger,
+    operation_name: str,
+) -> None:
+    while True:
+        check_cancelled()
+        done = [x for x in running if x[1].done()]
+        if done:
+            break
+        running[0][1].wait(1)
+    for item in done:
+        index, operation, operation_timer = item
+        running.remove(item)
+        # raise the exception, if the operation failed.
+        results[index] = operation.result()
+        log.debug(f"{operation_name} '{names[index]}' in {operation_timer}")
+
+
+def begin_create_data_disk(
+    compute_client: Any,
+    resource_group_name: str,
+    name: str,
+    location: str,
+    sku: str,
+    size_in_gb: int,
+) -> Any:
+    return compute_client.disks.begin_create_or_update(
+        resource_group_name,
+        name,
+        {
+            "location": location,
+            "disk_size_gb": size_in_gb,
+            "sku": {"name": sku},
+            "creation_data": {"create_option": DiskCreateOption.empty},
+        },
+    )
+
+
+class DataDiskPool:
+    """
+    Keeps empty data disks, which are created in background, for each resource
+    group, location, sku and size. The disk feature takes disks from the pool,
+    instead of waiting for creation, and the pool is refilled in background.
+    Removed disks are deleted, instead of returned to the pool, so the disks in
+    the pool are always empty.
+    """
+
+    def __init__(self, size: int) -> None:
+        self._size = size
+        self._lock = Lock()
+        # the creating operations of disks by names.
+        self._disks: Dict[Tuple[str, str, str, int], Dict[str, Any]] = {}
+
+    def take(
+        self,
+        compute_client: Any,
+        resource_group_name: str,
+        location: str,
+        sku: str,
+        size_in_gb: int,
+        count: int,
+        log: Logger,
+    ) -> Dict[str, Any]:
+        """
+        Return creating operations of up to count disks by names, and begin to
+        create disks to refill the pool.
+        """
+        if not self._size:
+            return {}
+        key = (resource_group_name, location, sku, size_in_gb)
+        with self._lock:
+            disks = self._disks.setdefault(key, {})
+            taken = {name: disks.pop(name) for name in list(disks)[:count]}
+            refill_count = self._size - len(disks)
+            for _ in range(refill_count):
+                name = f"lisa_data_disk_{generate_random_chars(length=10)}"
+                disks[name] = begin_create_data_disk(
+                    compute_client,
+                    resource_group_name,
+                    name,
+                    location,
+                    sku,
+                    size_in_gb,
+                )
+        log.debug(
+            f"taken {len(taken)} data disks from pool, "
+            f"refilling {refill_count} disks."
+        )
+        return taken
+
+    def clear(
+        self,
+        compute_client: Any,
+        resource_group_name: str,
+        delete_disks: bool,
+        log: Logger,
+    ) -> None:
+        """
+        Remove disks of the resource group from the pool. If the resource group
+        is not deleted, the disks should be deleted.
+        """
+        with self._lock:
+            keys = [x for x in self._disks if x[0] == resource_group_name]
+            disks = [x for key in keys for x in self._disks.pop(key).items()]
+        if delete_disks and disks:
+            log.debug(f"deleting {len(disks)} pooled data disks")
+            for name, operation in disks:
+                try:
+                    # a disk cannot be deleted, when it's creating.
+                    operation.wait()
+                    compute_client.disks.begin_delete(resource_group_name, name)
+                except Exception as identifier:
+                    log.debug(f"failed to delete pooled disk {name}: {identifier}")
+
+
 def get_storage_credential(
     credential: Any,
     subscription_id: str,
@@ -1152,25 +1436,24 @@ def check_or_create_resource_group(
     location: str,
     log: Logger,
 ) -> None:
-    with get_resource_management_client(
-        credential, subscription_id, cloud
-    ) as rm_client:
-        with global_credential_access_lock:
-            az_shared_rg_exists = rm_client.resource_groups.check_existence(
-                resource_group_name
-            )
-        if not az_shared_rg_exists:
-            log.info(f"Creating Resource group: '{resource_group_name}'")
+    # the client is shared, so it's not closed here.
+    rm_client = get_resource_management_client(credential, subscription_id, cloud)
+    with global_credential_access_lock:
+        az_shared_rg_exists = rm_client.resource_groups.check_existence(
+            resource_group_name
+        )
+    if not az_shared_rg_exists:
+        log.info(f"Creating Resource group: '{resource_group_name}'")
 
-            with global_credential_access_lock:
-                rm_client.resource_groups.create_or_update(
-                    resource_group_name, {"location": location}
-                )
-            check_till_timeout(
-                lambda: rm_client.resource_groups.check_existence(resource_group_name)
-                is True,
-                timeout_message=f"wait for {resource_group_name} created",
+        with global_credential_access_lock:
+            rm_client.resource_groups.create_or_update(
+                resource_group_name, {"location": location}
             )
+        check_till_timeout(
+            lambda: rm_client.resource_groups.check_existence(resource_group_name)
+            is True,
+            timeout_message=f"wait for {resource_group_name} created",
+        )
 
 
 def copy_vhd_to_storage(
@@ -1201,7 +1484,7 @@ def copy_vhd_to_storage(
 
     # lock here to prevent a vhd is copied in multi-thread
     cached_key: Optional[bytearray] = None
-    with _global_sas_vhd_copy_lock:
+    with _get_sas_vhd_copy_lock(full_vhd_path):
         blobs = container_client.list_blobs(name_starts_with=dst_vhd_name)
         blob_client = container_client.get_blob_client(dst_vhd_name)
         vhd_exists = False
@@ -1215,6 +1498,8 @@ def copy_vhd_to_storage(
                 if is_stuck_copying(blob_client, log):
                     # Delete the stuck vhd.
                     blob_client.delete_blob(delete_snapshots="include")
+                elif is_page_copy_pending(blob_client):
+                    log.debug("found partially copied vhd, resume copying.")
                 elif original_key and cached_key:
                     if original_key == cached_key:
                         log.debug("the sas url is copied already, use it directly.")
@@ -1261,6 +1546,14 @@ def copy_vhd_to_storage(
                 # Set metadata to mark the blob copied by AzCopy successfully
                 metadata = {"AzCopyStatus": "Success"}
                 blob_client.set_blob_metadata(metadata)
+            elif platform._azure_runbook.vhd_copy_concurrency > 0:
+                copy_page_blob(
+                    src_blob_client=original_blob_client,
+                    dst_blob_client=blob_client,
+                    src_url=src_vhd_sas_url,
+                    concurrency=platform._azure_runbook.vhd_copy_concurrency,
+                    log=log,
+                )
             else:
                 blob_client.start_copy_from_url(
                     src_vhd_sas_url, metadata=None, incremental_copy=False
@@ -1278,6 +1571,7 @@ def wait_copy_blob(
     timeout: int = 60 * 60,
 ) -> None:
     log.info(f"copying vhd: {vhd_path}")
+    timer = create_timer()
     if blob_client.get_blob_properties().copy.status:
         check_till_timeout(
             lambda: blob_client.get_blob_properties().copy.status == "success",
@@ -1286,16 +1580,169 @@ def wait_copy_blob(
             interval=2,
         )
     else:
-        # If the blob is copied by AzCopy, the copy.status is None.
-        # Confirm the copy operation is success by checking the metadata.
+        # If the blob is copied by AzCopy or by page ranges, the copy.status is
+        # None. Confirm the copy operation is success by checking the metadata.
         check_till_timeout(
-            lambda: blob_client.get_blob_properties().metadata.get("AzCopyStatus", None)
-            == "Success",
+            lambda: _is_copied_by_client(blob_client.get_blob_properties().metadata),
             timeout_message=f"copying VHD: {vhd_path}",
             timeout=timeout,
             interval=2,
         )
-    log.info("vhd copied")
+    log.info(f"vhd copied, waited {timer}")
+
+
+def is_page_copy_pending(blob_client: Any) -> bool:
+    metadata = blob_client.get_blob_properties().metadata or {}
+    return bool(metadata.get(PAGE_COPY_STATUS_KEY) == _PAGE_COPY_STATUS_PENDING)
+
+
+def copy_page_blob(
+    src_blob_client: Any,
+    dst_blob_client: Any,
+    src_url: str,
+    concurrency: int,
+    log: Logger,
+) -> None:
+    """
+    Copy a blob to a page blob by page ranges with concurrent requests. The
+    empty ranges of the source page blob are skipped. If the destination blob is
+    copied partially, only the missing ranges are copied.
+    """
+    src_properties = src_blob_client.get_blob_properties()
+    size: int = src_properties.size
+    if size % _PAGE_SIZE:
+        raise LisaException(
+            f"the size of vhd {size} is not aligned to {_PAGE_SIZE} bytes, "
+            "it cannot be copied to a page blob."
+        )
+
+    copied_ranges: List[Tuple[int, int]] = []
+    if is_page_copy_pending(dst_blob_client) and (
+        dst_blob_client.get_blob_properties().size == size
+    ):
+        copied_ranges = _get_page_ranges(dst_blob_client)
+    else:
+        dst_blob_client.create_page_blob(
+            size, metadata={PAGE_COPY_STATUS_KEY: _PAGE_COPY_STATUS_PENDING}
+        )
+    if src_properties.blob_type == BlobType.PageBlob:
+        src_ranges = _get_page_ranges(src_blob_client)
+    else:
+        src_ranges = [(0, size)]
+    chunks = _split_ranges(_subtract_ranges(src_ranges, copied_ranges))
+
+    total_size = sum(end - start for start, end in chunks)
+    log.info(
+        f"copying {total_size} of {size} bytes by page ranges, "
+        f"{len(chunks)} requests, concurrency: {concurrency}"
+    )
+    timer = create_timer()
+    progress_lock = Lock()
+    progress = {"copied": 0, "logged_percent": 0, "failed": False}
+
+    def _copy_chunks() -> None:
+        while True:
+            check_cancelled()
+            with progress_lock:
+                if progress["failed"] or not chunks:
+                    return
+                start, end = chunks.pop()
+            try:
+                dst_blob_client.upload_pages_from_url(
+                    src_url, offset=start, length=end - start, source_offset=start
+                )
+            except Exception:
+                # stop other workers, and the copied pages can be resumed.
+                progress["failed"] = True
+                raise
+            with progress_lock:
+                progress["copied"] += end - start
+                percent = progress["copied"] * 100 // total_size
+                if percent >= progress["logged_percent"] + 10:
+                    progress["logged_percent"] = percent
+                    log.debug(
+                        f"copied {percent}%, "
+                        f"{_get_throughput(progress['copied'], timer.elapsed(False))}"
+                    )
+
+    if chunks:
+        # chunks are popped from the end, so copy from the beginning.
+        chunks.reverse()
+        run_in_parallel(
+            [_copy_chunks for _ in range(min(concurrency, len(chunks)))], log=log
+        )
+
+    elapsed = timer.elapsed()
+    log.info(
+        f"copied {total_size} bytes in {elapsed:.3f} sec, "
+        f"{_get_throughput(total_size, elapsed)}"
+    )
+    content_settings = src_properties.content_settings
+    dst_blob_client.set_http_headers(
+        content_settings=ContentSettings(  # type: ignore
+            content_type=content_settings.content_type,
+            content_md5=content_settings.content_md5,
+        )
+    )
+    dst_blob_client.set_blob_metadata({PAGE_COPY_STATUS_KEY: _PAGE_COPY_STATUS_SUCCESS})
+
+
+def _is_copied_by_client(metadata: Optional[Dict[str, str]]) -> bool:
+    metadata = metadata or {}
+    return (
+        metadata.get("AzCopyStatus", None) == "Success"
+        or metadata.get(PAGE_COPY_STATUS_KEY, None) == _PAGE_COPY_STATUS_SUCCESS
+    )
+
+
+def _get_sas_vhd_copy_lock(vhd_path: str) -> Lock:
+    with _sas_vhd_copy_locks_lock:
+        lock = _sas_vhd_copy_locks.get(vhd_path, None)
+        if not lock:
+            lock = Lock()
+            _sas_vhd_copy_locks[vhd_path] = lock
+    return lock
+
+
+def _get_page_ranges(blob_client: Any) -> List[Tuple[int, int]]:
+    # returns valid ranges, and the end is exclusive.
+    page_ranges, _ = blob_client.get_page_ranges()
+    return [(x["start"], x["end"] + 1) for x in page_ranges]
+
+
+def _subtract_ranges(
+    ranges: List[Tuple[int, int]], removing_ranges: List[Tuple[int, int]]
+) -> List[Tuple[int, int]]:
+    result: List[Tuple[int, int]] = []
+    for start, end in sorted(ranges):
+        for removing_start, removing_end in sorted(removing_ranges):
+            if removing_end <= start or removing_start >= end:
+                continue
+            if removing_start > start:
+                result.append((start, removing_start))
+            start = max(start, removing_end)
+            if start >= end:
+                break
+        if start < end:
+            result.append((start, end))
+    return result
+
+
+def _split_ranges(ranges: List[Tuple[int, int]]) -> List[Tuple[int, int]]:
+    # split ranges to chunks, which are aligned to the max size of a request.
+    result: List[Tuple[int, int]] = []
+    for start, end in ranges:
+        while start < end:
+            chunk_end = min(
+                end, (start // _PAGE_COPY_MAX_SIZE + 1) * _PAGE_COPY_MAX_SIZE
+            )
+            result.append((start, chunk_end))
+            start = chunk_end
+    return result
+
+
+def _get_throughput(size: int, elapsed: float) -> str:
+    return f"{size / 1024 / 1024 / max(elapsed, 0.001):.2f} MB/s"
 
 
 def get_share_service_client(
@@ -1369,6 +1816,86 @@ def delete_file_share(
     share_service_client.delete_share(file_share_name)
 
 
+class SerialConsoleLogReader:
+    """
+    Download the serial console log incrementally. The downloaded content is
+    kept, and only new bytes are downloaded by HTTP Range requests. If the blob
+    is shrunk, like the VM is redeployed, it's downloaded again.
+
+    An append blob is changed by appending only, so new bytes follow the
+    downloaded content. Other blobs may be rewritten, so the Range request
+    matches the ETag, and the blob is downloaded again, if it's changed.
+    """
+
+    def __init__(self) -> None:
+        self.content = b""
+        self._etag = ""
+        self._is_append_blob = False
+        # the url without SAS token, it's different in each query.
+        self._blob_path = ""
+
+    def read(self, url: str, log: Logger) -> bytes:
+        blob_path = url.split("?")[0]
+        if blob_path != self._blob_path:
+            self._reset()
+            self._blob_path = blob_path
+
+        headers: Dict[str, str] = {}
+        if self.content:
+            headers["Range"] = f"bytes={len(self.content)}-"
+            if self._etag and self._is_append_blob:
+                headers["If-None-Match"] = self._etag
+            elif self._etag:
+                headers["If-Match"] = self._etag
+        response = requests.get(url, headers=headers, timeout=60)
+        if response.status_code == 404:
+            log.debug(
+                "The serial console is not generated. "
+                "The reason may be the VM is not started."
+            )
+            self._reset()
+        elif response.status_code == 304:
+            log.debug("serial console log is not changed.")
+        elif response.status_code == 412:
+            log.debug("serial console log is rewritten, download it again.")
+            self._reset()
+            return self.read(url, log)
+        elif response.status_code == 416:
+            # no new bytes, the header is like "bytes */<size>"
+            size = int(response.headers.get("Content-Range", "*/0").split("/")[-1])
+            if size < len(self.content):
+                log.debug("serial console log is shrunk, download it again.")
+                self._reset()
+                return self.read(url, log)
+        elif response.status_code == 206:
+            # the header is like "bytes <start>-<end>/<size>"
+            content_range = response.headers.get("Content-Range", "")
+            start = int(content_range.split(" ")[-1].split("-")[0])
+            if start != len(self.content):
+                raise LisaException(
+                    f"unexpected range of serial console log: {content_range}"
+                )
+            log.debug(f"downloaded {len(response.content)} new bytes of serial log.")
+            self.content += response.content
+            self._save_blob_properties(response)
+        else:
+            response.raise_for_status()
+            self.content = response.content
+            self._save_blob_properties(response)
+        return self.content
+
+    def _save_blob_properties(self, response: requests.Response) -> None:
+        self._etag = response.headers.get("ETag", "")
+        self._is_append_blob = (
+            response.headers.get("x-ms-blob-type", "") == "AppendBlob"
+        )
+
+    def _reset(self) -> None:
+        self.content = b""
+        self._etag = ""
+        self._is_append_blob = False
+
+
 def save_console_log(
     resource_group_name: str,
     vm_name: str,
@@ -1376,7 +1903,13 @@ def save_console_log(
     log: Logger,
     saved_path: Optional[Path],
     screenshot_file_name: str = "serial_console",
+    reader: Optional[SerialConsoleLogReader] = None,
 ) -> bytes:
+    """
+    Download the serial console log. If saved_path is specified, the
+    screenshot is saved also. If reader is specified, the log is downloaded
+    incrementally.
+    """
     compute_client = get_compute_client(platform)
     with global_credential_access_lock:
         diagnostic_data = (
@@ -1402,13 +1935,9 @@ def save_console_log(
             )
         screenshot_raw_name.unlink()
 
-    log_response = requests.get(diagnostic_data.serial_console_log_blob_uri, timeout=60)
-    if log_response.status_code == 404:
-        log.debug(
-            "The serial console is not generated. "
-            "The reason may be the VM is not started."
-        )
-    return log_response.content
+    if not reader:
+        reader = SerialConsoleLogReader()
+    return reader.read(diagnostic_data.serial_console_log_blob_uri, log)
 
 
 def load_environment(
@@ -21,7 +21,6 @@ from azure.core.exceptions import (
     map_error,
 )
 from azure.mgmt.compute.models import (  # type: ignore
-    DiskCreateOption,
     DiskCreateOptionTypes,
     HardwareProfile,
     NetworkInterfaceReference,
@@ -71,6 +70,8 @@ from .. import AZURE
 from .common import (
     AzureArmParameter,
     AzureNodeSchema,
+    SerialConsoleLogReader,
+    begin_create_data_disk,
     check_or_create_storage_account,
     create_update_private_dns_zone_groups,
     create_update_private_endpoints,
@@ -95,6 +96,7 @@ from .common import (
     global_credential_access_lock,
     save_console_log,
     wait_operation,
+    wait_operations,
 )
 from .tools import Waagent
 
@@ -264,6 +266,7 @@ class SerialConsole(AzureFeatureMixin, features.SerialConsole):
         super()._initialize(*args, **kwargs)
         self._initialize_information(self._node)
         self._serial_console_initialized: bool = False
+        self._console_log_reader = SerialConsoleLogReader()
 
     @classmethod
     def create_setting(
@@ -363,6 +366,7 @@ class SerialConsole(AzureFeatureMixin, features.SerialConsole):
             platform=platform,
             log=self._log,
             saved_path=saved_path,
+            reader=self._console_log_reader,
         )
 
     def _get_connection_string(self) -> str:
@@ -1243,8 +1247,7 @@ class Disk(AzureFeatureMixin, features.Disk):
         disk_type: schema.DiskType = schema.DiskType.StandardHDDLRS,
         size_in_gb: int = 20,
     ) -> List[str]:
-        disk_sku = _disk_type_mapping.get(disk_type, None)
-        assert disk_sku
+        disk_sku = get_azure_disk_type(disk_type)
         assert self._node.capability.disk
         assert isinstance(self._node.capability.disk.data_disk_count, int)
         current_disk_count = self._node.capability.disk.data_disk_count
@@ -1252,21 +1255,41 @@ class Disk(AzureFeatureMixin, features.Disk):
         compute_client = get_compute_client(platform)
         node_context = self._node.capability.get_extended_runbook(AzureNodeSchema)
 
-        # create managed disk
-        managed_disks = []
-        for i in range(count):
-            name = f"lisa_data_disk_{i+current_disk_count}"
-            async_disk_update = compute_client.disks.begin_create_or_update(
+        # take empty disks from the pool, and create others concurrently.
+        pooled_disks = platform._data_disk_pool.take(
+            compute_client,
+            self._resource_group_name,
+            node_context.location,
+            disk_sku,
+            size_in_gb,
+            count,
+            self._log,
+        )
+        names = list(pooled_disks)
+        names += [
+            f"lisa_data_disk_{i+current_disk_count}"
+            for i in range(len(pooled_disks), count)
+        ]
+
+        def _begin_create(name: str) -> Any:
+            if name in pooled_disks:
+                return pooled_disks[name]
+            return begin_create_data_disk(
+                compute_client,
                 self._resource_group_name,
                 name,
-                {
-                    "location": node_context.location,
-                    "disk_size_gb": size_in_gb,
-                    "sku": {"name": disk_sku},
-                    "creation_data": {"create_option": DiskCreateOption.empty},
-                },
+                node_context.location,
+                disk_sku,
+                size_in_gb,
             )
-            managed_disks.append(async_disk_update.result())
+
+        managed_disks = wait_operations(
+            names,
+            _begin_create,
+            platform._azure_runbook.data_disk_concurrency,
+            self._log,
+            "created data disk",
+        )
 
         # attach managed disk
         azure_platform: AzurePlatform = self._platform  # type: ignore
@@ -1323,11 +1346,15 @@ class Disk(AzureFeatureMixin, features.Disk):
         async_vm_update.wait()
 
         # delete managed disk
-        for name in names:
-            async_disk_delete = compute_client.disks.begin_delete(
+        wait_operations(
+            names,
+            lambda name: compute_client.disks.begin_delete(
                 self._resource_group_name, name
-            )
-            async_disk_delete.wait()
+            ),
+            platform._azure_runbook.data_disk_concurrency,
+            self._log,
+            "deleted data disk",
+        )
 
         # update data disk count
         assert isinstance(self._node.capability.disk.data_disk_count, int)
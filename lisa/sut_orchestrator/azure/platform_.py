@@ -6,16 +6,20 @@ import json
 import logging
 import math
 import os
+import pickle
 import re
 import sys
+import threading
 from copy import deepcopy
 from dataclasses import InitVar, dataclass, field
+from dataclasses import fields as fields_of
+from dataclasses import is_dataclass
 from datetime import datetime
 from difflib import SequenceMatcher
 from functools import lru_cache, partial
 from pathlib import Path
 from types import SimpleNamespace
-from typing import Any, Dict, List, Optional, Set, Tuple, Type, Union, cast
+from typing import Any, Dict, Hashable, List, Optional, Set, Tuple, Type, Union, cast
 
 from azure.core.exceptions import HttpResponseError, ResourceNotFoundError
 from azure.identity import DefaultAzureCredential
@@ -36,7 +40,6 @@ from azure.mgmt.resource.resources.models import (  # type: ignore
     DeploymentMode,
     DeploymentProperties,
 )
-from cachetools import TTLCache, cached
 from dataclasses_json import dataclass_json
 from marshmallow import fields, validate
 from msrestazure.azure_cloud import (  # type: ignore
@@ -67,10 +70,12 @@ from lisa.util import (
     get_matched_str,
     get_public_key_data,
     is_unittest,
+    lock_file,
     plugin_manager,
     set_filtered_fields,
     strip_strs,
     truncate_keep_prefix,
+    write_file_atomically,
 )
 from lisa.util.logger import Logger, get_logger
 from lisa.util.parallel import run_in_parallel
@@ -78,7 +83,7 @@ from lisa.util.perf_timer import create_timer
 from lisa.util.shell import wait_tcp_port_ready
 
 from .. import AZURE
-from . import features
+from . import features, hooks  # noqa: F401
 from .common import (
     AZURE_SHARED_RG_NAME,
     AZURE_SUBNET_PREFIX,
@@ -89,10 +94,12 @@ from .common import (
     AzureVmMarketplaceSchema,
     AzureVmPurchasePlanSchema,
     DataDiskCreateOption,
+    DataDiskPool,
     DataDiskSchema,
     SharedImageGallerySchema,
     check_or_create_resource_group,
     check_or_create_storage_account,
+    get_client_statistics,
     get_compute_client,
     get_deployable_vhd_path,
     get_environment_context,
@@ -191,6 +198,19 @@ class AzureCapability:
         # reload features settings with platform specified types.
         _convert_to_azure_node_space(self.capability)
 
+    def get_capability_key(self) -> Optional[Hashable]:
+        # The capability isn't changed after loaded, so the key is created
+        # once, and it's not serialized.
+        if not hasattr(self, "_capability_key"):
+            self._capability_key = search_space.get_canonical_key(self.capability)
+        return self._capability_key
+
+    def __getstate__(self) -> Dict[str, Any]:
+        # the key caches hash values, which are different in other processes.
+        state = self.__dict__.copy()
+        state.pop("_capability_key", None)
+        return state
+
 
 @dataclass_json()
 @dataclass
@@ -311,8 +331,27 @@ class AzurePlatformSchema:
     deploy: bool = True
     # wait resource deleted or not
     wait_delete: bool = False
+    # seconds to reuse the queried quota of a location. The quota used by
+    # deployments of this run is counted locally in the meantime.
+    quota_cache_ttl: int = 60
     # the AzCopy path can be specified if use this tool to copy blob
     azcopy_path: str = field(default="")
+    # copy VHDs by page ranges with the count of concurrent requests, instead
+    # of the copy in storage service. It skips empty ranges, resumes a failed
+    # copy, and reports the throughput. 0 means disabled.
+    vhd_copy_concurrency: int = field(
+        default=0, metadata=field_metadata(validate=validate.Range(min=0))
+    )
+    # the count of concurrent operations to create or delete data disks.
+    data_disk_concurrency: int = field(
+        default=8, metadata=field_metadata(validate=validate.Range(min=1))
+    )
+    # the count of empty data disks, which are created in background for each
+    # resource group, disk type and size, after data disks are added. Later
+    # additions attach them, instead of waiting for creation. 0 means disabled.
+    data_disk_pool_size: int = field(
+        default=0, metadata=field_metadata(validate=validate.Range(min=0))
+    )
 
     def __post_init__(self, *args: Any, **kwargs: Any) -> None:
         strip_strs(
@@ -418,6 +457,9 @@ class AzurePlatform(Platform):
 
     _credentials: Dict[str, DefaultAzureCredential] = {}
     _locations_data_cache: Dict[str, AzureLocation] = {}
+    # the keys of locations, which are refreshing in background.
+    _locations_refreshing: Set[str] = set()
+    _locations_refreshing_lock = threading.Lock()
 
     def __init__(self, runbook: schema.Platform) -> None:
         super().__init__(runbook=runbook)
@@ -426,6 +468,12 @@ class AzurePlatform(Platform):
         self.credential: DefaultAzureCredential
         self.cloud: Cloud
 
+        # location -> the latest queried quota of the location
+        self._quota_snapshots: Dict[str, _QuotaSnapshot] = {}
+        # environment id -> the quota used by the environment
+        self._quota_reservations: Dict[str, _QuotaReservation] = {}
+        self._quota_lock = threading.Lock()
+
         # It has to be defined after the class definition is loaded. So it
         # cannot be a class level variable.
         self._environment_information_hooks = {
@@ -587,9 +635,11 @@ class AzurePlatform(Platform):
 
                 if self._azure_runbook.deploy:
                     self._validate_template(deployment_parameters, log)
+                    self._reserve_quota(environment, log)
                     time = create_timer()
                     self._deploy(location, deployment_parameters, log, environment)
                     environment_context.provision_time = time.elapsed()
+                    self._complete_quota_reservation(environment)
                 # Even skipped deploy, try best to initialize nodes
                 self.initialize_environment(environment, log)
             except Exception as identifier:
@@ -597,6 +647,7 @@ class AzurePlatform(Platform):
                 raise identifier
 
     def _delete_environment(self, environment: Environment, log: Logger) -> None:
+        self._release_quota(environment)
         environment_context = get_environment_context(environment=environment)
         resource_group_name = environment_context.resource_group_name
         # the resource group name is empty when it is not deployed for some reasons,
@@ -605,6 +656,16 @@ class AzurePlatform(Platform):
             return
         assert self._azure_runbook
 
+        # the pooled disks are deleted with the resource group, unless the
+        # resource group is specified in runbook and kept.
+        self._data_disk_pool.clear(
+            get_compute_client(self),
+            resource_group_name,
+            delete_disks=not environment_context.resource_group_is_specified
+            and not self._azure_runbook.dry_run,
+            log=log,
+        )
+
         if not environment_context.resource_group_is_specified:
             log.info(
                 f"skipped to delete resource group: {resource_group_name}, "
@@ -892,6 +953,7 @@ class AzurePlatform(Platform):
         )
         assert azure_runbook, "platform runbook cannot be empty"
         self._azure_runbook = azure_runbook
+        self._data_disk_pool = DataDiskPool(azure_runbook.data_disk_pool_size)
 
         self.subscription_id = azure_runbook.subscription_id
         self.cloud = azure_runbook.cloud
@@ -911,6 +973,9 @@ class AzurePlatform(Platform):
             self.credential, self.subscription_id, self.cloud
         )
 
+    def _cleanup(self) -> None:
+        self._log.debug(f"management clients: {get_client_statistics()}")
+
     def _initialize_credential(self) -> None:
         azure_runbook = self._azure_runbook
 
@@ -993,76 +1058,165 @@ class AzurePlatform(Platform):
                 raise identifier
         return loaded_obj
 
-    def get_location_info(self, location: str, log: Logger) -> AzureLocation:
-        cached_file_name = constants.CACHE_PATH.joinpath(
-            f"azure_locations_{location}.json"
+    def _load_location_info_from_binary_file(
+        self, cached_file_name: Path, log: Logger
+    ) -> Optional[AzureLocation]:
+        loaded_obj: Optional[AzureLocation] = None
+        try:
+            with open(cached_file_name, "rb") as f:
+                loaded_data = pickle.load(f)
+            if _get_class_fields(loaded_data["location"]) != loaded_data["fields"]:
+                # the classes are changed, so the objects may miss new fields.
+                log.debug(f"{cached_file_name.name}: schema changed, ignore cache")
+            else:
+                loaded_obj = loaded_data["location"]
+        except FileNotFoundError:
+            pass
+        except Exception as identifier:
+            # it may be written by an older version, query it again.
+            log.debug(f"error on loading cache {cached_file_name.name}: {identifier}")
+        return loaded_obj
+
+    def _load_location_info(
+        self, location: str, log: Logger
+    ) -> Optional[AzureLocation]:
+        location_data = self._load_location_info_from_binary_file(
+            cached_file_name=self._get_location_cache_path(location), log=log
         )
-        should_refresh: bool = True
-        key = self._get_location_key(location)
-        location_data = self._locations_data_cache.get(key, None)
         if not location_data:
+            # compatible with the json cache of previous versions.
             location_data = self._load_location_info_from_file(
-                cached_file_name=cached_file_name, log=log
+                cached_file_name=constants.CACHE_PATH.joinpath(
+                    f"azure_locations_{location}.json"
+                ),
+                log=log,
             )
+        return location_data
+
+    def _save_location_info(self, location_data: AzureLocation) -> None:
+        content = pickle.dumps(
+            {
+                "fields": _get_class_fields(location_data),
+                "location": location_data,
+            },
+            protocol=pickle.HIGHEST_PROTOCOL,
+        )
+        write_file_atomically(
+            self._get_location_cache_path(location_data.location), content
+        )
+
+    def _get_location_cache_path(self, location: str) -> Path:
+        # The location data is converted to objects, which is much slower to
+        # load from json, so it's cached in binary. The file is in the cache
+        # folder of the current user, so it's trusted.
+        return constants.CACHE_PATH.joinpath(f"azure_locations_{location}.pickle")
+
+    def _is_location_info_expired(self, location_data: AzureLocation) -> bool:
+        # refresh cached locations every 1 day.
+        delta = datetime.now() - location_data.updated_time
+        return delta.days >= 1
+
+    def get_location_info(self, location: str, log: Logger) -> AzureLocation:
+        key = self._get_location_key(location)
+        location_data = self._locations_data_cache.get(key, None)
+        if not location_data:
+            location_data = self._load_location_info(location, log)
 
         if location_data:
-            delta = datetime.now() - location_data.updated_time
-            # refresh cached locations every 1 day.
-            if delta.days < 1:
-                should_refresh = False
-            else:
+            if self._is_location_info_expired(location_data):
                 log.debug(
                     f"{key}: cache timeout: {location_data.updated_time},"
                     f"sku count: {len(location_data.capabilities)}"
                 )
+                # use the expired data, and refresh it in background. The vm
+                # sizes don't change often, so it's fine for this run.
+                self._start_refreshing_location_info(location, log)
         else:
             log.debug(f"{key}: no cache found")
-        if should_refresh:
-            compute_client = get_compute_client(self)
+            location_data = self._refresh_location_info(location, log)
 
-            log.debug(f"{key}: querying")
-            all_skus: Dict[str, AzureCapability] = dict()
-            paged_skus = compute_client.resource_skus.list(
-                f"location eq '{location}'"
-            ).by_page()
-            for skus in paged_skus:
-                for sku_obj in skus:
-                    try:
-                        if sku_obj.resource_type == "virtualMachines":
-                            if sku_obj.restrictions and any(
-                                restriction.type == "Location"
-                                for restriction in sku_obj.restrictions
-                            ):
-                                # restricted on this location
-                                continue
-                            resource_sku = sku_obj.as_dict()
-                            capability = self._resource_sku_to_capability(
-                                location, sku_obj
-                            )
-
-                            # estimate vm cost for priority
-                            assert isinstance(capability.core_count, int)
-                            assert isinstance(capability.gpu_count, int)
-                            azure_capability = AzureCapability(
-                                location=location,
-                                vm_size=sku_obj.name,
-                                capability=capability,
-                                resource_sku=resource_sku,
-                            )
-                            all_skus[azure_capability.vm_size] = azure_capability
-                    except Exception as identifier:
-                        log.error(f"unknown sku: {sku_obj}")
-                        raise identifier
-            location_data = AzureLocation(location=location, capabilities=all_skus)
-            log.debug(f"{location}: saving to disk")
-            with open(cached_file_name, "w") as f:
-                json.dump(location_data.to_dict(), f)  # type: ignore
-            log.debug(f"{key}: new data, " f"sku: {len(location_data.capabilities)}")
-
-        assert location_data
         self._locations_data_cache[key] = location_data
         return location_data
 
+    def _start_refreshing_location_info(self, location: str, log: Logger) -> None:
+        key = self._get_location_key(location)
+        with self._locations_refreshing_lock:
+            if key in self._locations_refreshing:
+                return
+            self._locations_refreshing.add(key)
+
+        def _refresh() -> None:
+            try:
+                self._locations_data_cache[key] = self._refresh_location_info(
+                    location, log
+                )
+            except Exception as identifier:
+                # keep using the expired data, and it's refreshed on next run.
+                log.debug(f"{key}: error on refreshing in background: {identifier}")
+            finally:
+                with self._locations_refreshing_lock:
+                    self._locations_refreshing.discard(key)
+
+        thread = threading.Thread(target=_refresh, name=f"azure_location[{location}]")
+        thread.daemon = True
+        thread.start()
+
+    def _refresh_location_info(self, location: str, log: Logger) -> AzureLocation:
+        key = self._get_location_key(location)
+        lock_path = constants.CACHE_PATH.joinpath(f"azure_locations_{location}.lock")
+        # Other runners on the same machine may be refreshing it. After got
+        # the lock, check whether it's refreshed already.
+        with lock_file(lock_path):
+            location_data = self._load_location_info_from_binary_file(
+                cached_file_name=self._get_location_cache_path(location), log=log
+            )
+            if location_data and not self._is_location_info_expired(location_data):
+                log.debug(f"{key}: refreshed by other process")
+                return location_data
+
+            location_data = self._query_location_info(location, log)
+            log.debug(f"{location}: saving to disk")
+            self._save_location_info(location_data)
+        log.debug(f"{key}: new data, " f"sku: {len(location_data.capabilities)}")
+        return location_data
+
+    def _query_location_info(self, location: str, log: Logger) -> AzureLocation:
+        key = self._get_location_key(location)
+        compute_client = get_compute_client(self)
+
+        log.debug(f"{key}: querying")
+        all_skus: Dict[str, AzureCapability] = dict()
+        paged_skus = compute_client.resource_skus.list(
+            f"location eq '{location}'"
+        ).by_page()
+        for skus in paged_skus:
+            for sku_obj in skus:
+                try:
+                    if sku_obj.resource_type == "virtualMachines":
+                        if sku_obj.restrictions and any(
+                            restriction.type == "Location"
+                            for restriction in sku_obj.restrictions
+                        ):
+                            # restricted on this location
+                            continue
+                        resource_sku = sku_obj.as_dict()
+                        capability = self._resource_sku_to_capability(location, sku_obj)
+
+                        # estimate vm cost for priority
+                        assert isinstance(capability.core_count, int)
+                        assert isinstance(capability.gpu_count, int)
+                        azure_capability = AzureCapability(
+                            location=location,
+                            vm_size=sku_obj.name,
+                            capability=capability,
+                            resource_sku=resource_sku,
+                        )
+                        all_skus[azure_capability.vm_size] = azure_capability
+                except Exception as identifier:
+                    log.error(f"unknown sku: {sku_obj}")
+                    raise identifier
+        return AzureLocation(location=location, capabilities=all_skus)
+
     def _create_deployment_parameters(
         self, resource_group_name: str, environment: Environment, log: Logger
     ) -> Tuple[str, Dict[str, Any]]:
@@ -2267,9 +2421,17 @@ class AzurePlatform(Platform):
     ) -> Optional[schema.NodeSpace]:
         matched_cap: Optional[schema.NodeSpace] = None
 
+        # The same requirement is checked with the same vm sizes for many test
+        # cases, so the check results are cached by the keys.
+        requirement_key = search_space.get_canonical_key(requirement)
         # filter allowed vm sizes
         for azure_cap in candidate_capabilities:
-            check_result = requirement.check(azure_cap.capability)
+            check_result = search_space.check(
+                requirement,
+                azure_cap.capability,
+                requirement_key=requirement_key,
+                capability_key=azure_cap.get_capability_key(),
+            )
             if check_result.result:
                 min_cap = self._generate_min_capability(
                     requirement, azure_cap, azure_cap.location
@@ -2421,20 +2583,16 @@ class AzurePlatform(Platform):
                 if remaining < 0 and limit > 0:
                     capabilities[index] = True
 
-    @cached(cache=TTLCache(maxsize=50, ttl=10))
     def _get_quotas(self, location: str) -> Dict[str, Tuple[int, int]]:
         """
         The Dict item is: vm size name, Tuple(remaining vm count, limited vm count)
         """
         result: Dict[str, Tuple[int, int]] = dict()
 
-        client = get_compute_client(self)
-        usages = client.usage.list(location=location)
-        # named map
-        quotas_map: Dict[str, Any] = {value.name.value: value for value in usages}
+        snapshot = self._get_quota_snapshot(location)
+        reserved_cores = self._get_reserved_cores(location, snapshot.updated_time)
 
-        # This method signature is used to generate cache. If pass in the log
-        # object, it makes the cache doesn't work. So create a logger in the
+        # This method is called without log object, so create a logger in the
         # method.
         log = get_logger("azure")
         location_info = self.get_location_info(location=location, log=log)
@@ -2443,19 +2601,104 @@ class AzurePlatform(Platform):
         for vm_size, capability in capabilities.items():
             # looking for quota for each vm size's family, and calculate
             # remaining and limit by core count of vm size.
-            quota = quotas_map.get(capability.resource_sku["family"], None)
-            if quota:
-                limit = math.floor(quota.limit / capability.capability.core_count)
-                remaining = math.floor(
-                    (quota.limit - quota.current_value)
-                    / capability.capability.core_count
-                )
+            family = capability.resource_sku["family"]
+            usage = snapshot.usages.get(family, None)
+            if usage:
+                current_value, limit_value = usage
+                current_value += reserved_cores.get(family, 0)
+                core_count = capability.capability.core_count
+                assert isinstance(core_count, int), f"actual: {type(core_count)}"
+                limit = math.floor(limit_value / core_count)
+                remaining = math.floor((limit_value - current_value) / core_count)
                 result[vm_size] = (remaining, limit)
 
-        log.debug(f"found {len(result)} vm sizes with quota in location '{location}'.")
+        return result
+
+    def _get_quota_snapshot(self, location: str) -> "_QuotaSnapshot":
+        with self._quota_lock:
+            snapshot = self._quota_snapshots.get(location, None)
+        if snapshot:
+            elapsed = (datetime.now() - snapshot.updated_time).total_seconds()
+            if elapsed < self._azure_runbook.quota_cache_ttl:
+                return snapshot
+
+        # The deployments, which are completed after this time, are not counted
+        # in the snapshot.
+        updated_time = datetime.now()
+        client = get_compute_client(self)
+        usages = {
+            value.name.value: (value.current_value, value.limit)
+            for value in client.usage.list(location=location)
+        }
+        snapshot = _QuotaSnapshot(updated_time=updated_time, usages=usages)
+        with self._quota_lock:
+            self._quota_snapshots[location] = snapshot
+        get_logger("azure").debug(
+            f"found {len(usages)} usages in location '{location}'."
+        )
+        return snapshot
 
+    def _get_reserved_cores(
+        self, location: str, updated_time: datetime
+    ) -> Dict[str, int]:
+        """
+        Returns the cores by vm family, which are used by deployments of this
+        run, but not counted in the quota queried at the updated_time.
+        """
+        result: Dict[str, int] = {}
+        with self._quota_lock:
+            for reservation in self._quota_reservations.values():
+                if (
+                    reservation.location != location
+                    or reservation.completed_time
+                    and reservation.completed_time < updated_time
+                ):
+                    continue
+                for family, cores in reservation.cores.items():
+                    result[family] = result.get(family, 0) + cores
         return result
 
+    def _reserve_quota(self, environment: Environment, log: Logger) -> None:
+        location = ""
+        cores: Dict[str, int] = {}
+        for node in environment.nodes.list():
+            assert node.capability
+            node_runbook = node.capability.get_extended_runbook(AzureNodeSchema, AZURE)
+            location = node_runbook.location
+            location_info = self.get_location_info(location=location, log=log)
+            capability = location_info.capabilities.get(node_runbook.vm_size, None)
+            if not capability:
+                # the vm size may not be listed, its quota is not tracked.
+                continue
+            family = capability.resource_sku["family"]
+            core_count = capability.capability.core_count
+            assert isinstance(core_count, int), f"actual: {type(core_count)}"
+            cores[family] = cores.get(family, 0) + core_count
+
+        if cores:
+            log.debug(f"reserved cores in location '{location}': {cores}")
+            with self._quota_lock:
+                self._quota_reservations[environment.id] = _QuotaReservation(
+                    location=location, cores=cores
+                )
+
+    def _complete_quota_reservation(self, environment: Environment) -> None:
+        with self._quota_lock:
+            reservation = self._quota_reservations.get(environment.id, None)
+            if reservation:
+                reservation.completed_time = datetime.now()
+
+    def _release_quota(self, environment: Environment) -> None:
+        with self._quota_lock:
+            reservation = self._quota_reservations.pop(environment.id, None)
+            if not reservation or not reservation.completed_time:
+                return
+            snapshot = self._quota_snapshots.get(reservation.location, None)
+            if snapshot and snapshot.updated_time > reservation.completed_time:
+                # the deleted resources are counted in the snapshot, so query
+                # it again on next time.
+                self._quota_snapshots.pop(reservation.location)
+
     def _get_usage(self, location: str, vm_size: str) -> Tuple[int, int]:
         """
         The format of return value refer to _get_usages
@@ -2555,6 +2798,44 @@ class AzurePlatform(Platform):
         self._add_image_features(node_space)
 
 
+@dataclass
+class _QuotaSnapshot:
+    updated_time: datetime
+    # vm family -> (current cores, limit cores)
+    usages: Dict[str, Tuple[int, int]]
+
+
+@dataclass
+class _QuotaReservation:
+    location: str
+    # vm family -> cores
+    cores: Dict[str, int]
+    # the completed deployments are counted by quotas queried after it.
+    completed_time: Optional[datetime] = None
+
+
+def _get_class_fields(value: Any) -> Dict[str, List[str]]:
+    """
+    Returns field names of all dataclasses in the value. It's saved with the
+    binary cache, and if any class is changed, the cache is dropped.
+    """
+    result: Dict[str, List[str]] = {}
+    pending: List[Any] = [value]
+    while pending:
+        current = pending.pop()
+        if isinstance(current, dict):
+            pending.extend(current.values())
+        elif isinstance(current, (list, tuple, set)):
+            pending.extend(current)
+        elif is_dataclass(current) and not isinstance(current, type):
+            current_type = type(current)
+            name = f"{current_type.__module__}.{current_type.__qualname__}"
+            if name not in result:
+                result[name] = [x.name for x in fields_of(current)]
+            pending.extend(getattr(current, x) for x in result[name])
+    return result
+
+
 def _convert_to_azure_node_space(node_space: schema.NodeSpace) -> None:
     if not node_space:
         return
@@ -12,7 +12,10 @@ from lisa.environment import Environment
 from lisa.feature import Feature
 from lisa.node import Node
 from lisa.sut_orchestrator.libvirt.context import NodeContext, get_node_context
-from lisa.sut_orchestrator.libvirt.platform import BaseLibvirtPlatform
+from lisa.sut_orchestrator.libvirt.platform import (
+    LIBVIRT_NETWORK_NAME,
+    BaseLibvirtPlatform,
+)
 from lisa.tools import QemuImg
 from lisa.util.logger import Logger, filter_ansi_escape
 
@@ -73,10 +76,13 @@ class CloudHypervisorPlatform(BaseLibvirtPlatform):
         log: Logger,
     ) -> None:
         if node_context.firmware_source_path:
-            self.host_node.shell.copy(
-                Path(node_context.firmware_source_path),
-                Path(node_context.firmware_path),
-            )
+            # nodes of an environment copy to the same path, so they may be
+            # created in parallel.
+            with self._disk_img_copy_lock:
+                self.host_node.shell.copy(
+                    Path(node_context.firmware_source_path),
+                    Path(node_context.firmware_path),
+                )
 
         super()._create_node(
             node,
@@ -130,7 +136,7 @@ class CloudHypervisorPlatform(BaseLibvirtPlatform):
         network_interface.attrib["type"] = "network"
 
         network_interface_source = ET.SubElement(network_interface, "source")
-        network_interface_source.attrib["network"] = "default"
+        network_interface_source.attrib["network"] = LIBVIRT_NETWORK_NAME
 
         network_model = ET.SubElement(network_interface, "model")
         network_model.attrib["type"] = "virtio"
@@ -171,6 +177,10 @@ class CloudHypervisorPlatform(BaseLibvirtPlatform):
             node_context.domain, node_context.console_log_file_path
         )
 
+    # cloud-hypervisor boots from raw disks.
+    def _get_os_disk_image_format(self, node_context: NodeContext) -> DiskImageFormat:
+        return DiskImageFormat.RAW
+
     # Create the OS disk.
     def _create_node_os_disk(
         self, environment: Environment, log: Logger, node: Node
@@ -184,6 +194,10 @@ class CloudHypervisorPlatform(BaseLibvirtPlatform):
                 "raw",
                 node_context.os_disk_file_path,
             )
+        elif self._image_cache:
+            self._image_cache.clone_image(
+                node_context.os_disk_base_file_path, node_context.os_disk_file_path
+            )
         else:
             self.host_node.execute(
                 f"cp {node_context.os_disk_base_file_path}"
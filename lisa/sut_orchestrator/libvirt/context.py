@@ -36,6 +36,8 @@ class NodeContext:
     os_disk_source_file_path: Optional[str] = None
     os_disk_base_file_path: str = ""
     os_disk_base_file_fmt: DiskImageFormat = DiskImageFormat.QCOW2
+    # it's set, if the base file is from the image cache.
+    os_disk_cached_file_path: str = ""
     os_disk_file_path: str = ""
     os_disk_img_resize_gib: Optional[int] = None
     console_log_file_path: str = ""
@@ -48,6 +50,8 @@ class NodeContext:
 
     console_logger: Optional[QemuConsoleLogger] = None
     domain: Optional[libvirt.virDomain] = None
+    # it's assigned by libvirt, when the domain is defined.
+    mac_address: str = ""
 
 
 def get_environment_context(environment: Environment) -> EnvironmentContext:
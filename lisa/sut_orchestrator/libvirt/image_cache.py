@@ -0,0 +1,262 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import hashlib
+import json
+import os
+import uuid
+from pathlib import Path, PurePosixPath
+from threading import Lock
+from typing import Any, Dict, List, Tuple
+
+from lisa.node import Node
+from lisa.tools import QemuImg
+from lisa.util import constants, lock_file, write_file_atomically
+from lisa.util.logger import Logger
+
+from .schema import DiskImageFormat
+
+# The file to save hashes of local images, so an image is hashed once only, if
+# it's not changed.
+_HASH_INDEX_FILE_NAME = "libvirt_image_hashes.json"
+_HASH_CHUNK_SIZE = 1024 * 1024
+
+
+class ImageCache:
+    """
+    Caches base images on the libvirt host by the content hash. An image is
+    copied to the host and converted to the needed format once, and then
+    nodes create their disks from it. When the cache is larger than the size
+    budget, the least recently used images are deleted, except the ones in use.
+
+    The cache may be shared by LISA processes on the same host, so each process
+    creates a marker file next to the image, when it uses the image. The
+    markers are checked and images are deleted in a flock of the cache folder.
+    If a process crashes, its markers are left, and the images are not evicted
+    until the markers are deleted.
+    """
+
+    def __init__(
+        self, host_node: Node, cache_dir: str, size_budget_gib: int, log: Logger
+    ) -> None:
+        self._host_node = host_node
+        self._cache_dir = PurePosixPath(cache_dir)
+        self._lock_path = self._cache_dir / "cache.lock"
+        # it identifies markers of this process.
+        self._user_name = f"{os.getpid()}_{uuid.uuid4().hex[:8]}"
+        self._size_budget_kib = size_budget_gib * 1024 * 1024
+        self._log = log
+
+        # cached image path -> count of nodes, which use it.
+        self._in_use: Dict[str, int] = {}
+        self._lock = Lock()
+        self._hit_count = 0
+        self._miss_count = 0
+        self._evicted_count = 0
+
+        # the local shell accepts Path only.
+        self._host_node.shell.mkdir(
+            self._cache_dir if self._host_node.is_remote else Path(cache_dir),
+            exist_ok=True,
+        )
+
+    def get_image(
+        self,
+        source_path: str,
+        source_format: DiskImageFormat,
+        target_format: DiskImageFormat,
+    ) -> str:
+        """
+        Returns the path of the cached image on the host. The source path is on
+        the local machine. The image is in use, until release_image is called.
+        """
+        image_hash = _get_file_hash(Path(source_path))
+        image_path = self._get_image_path(image_hash, target_format)
+        if self._use(image_path):
+            self._log.debug(f"image cache hit: {image_path}")
+            with self._lock:
+                self._hit_count += 1
+            return image_path
+
+        self._log.debug(f"image cache miss: {image_path}, source: {source_path}")
+        with self._lock:
+            self._miss_count += 1
+        try:
+            if source_format == target_format:
+                self._upload(source_path, image_path)
+            else:
+                cached_source_path = ""
+                if self._host_node.is_remote:
+                    # convert it on the host, so the converted image doesn't
+                    # need to be uploaded.
+                    cached_source_path = self.get_image(
+                        source_path, source_format, source_format
+                    )
+                    source_path = cached_source_path
+                temp_path = self._get_temp_path(image_path)
+                try:
+                    self._host_node.tools[QemuImg].convert(
+                        source_format.value,
+                        source_path,
+                        target_format.value,
+                        temp_path,
+                    )
+                finally:
+                    if cached_source_path:
+                        self.release_image(cached_source_path)
+                self._commit(temp_path, image_path)
+        except Exception:
+            self.release_image(image_path)
+            raise
+
+        self._evict()
+        return image_path
+
+    def release_image(self, image_path: str) -> None:
+        with self._lock:
+            count = self._in_use.get(image_path, 0) - 1
+            if count > 0:
+                self._in_use[image_path] = count
+                return
+            self._in_use.pop(image_path, None)
+            # delete it in the lock, so it doesn't delete the marker of a later
+            # use in this process.
+            self._host_node.execute(
+                f"rm -f {self._get_marker_path(image_path)}", shell=True
+            )
+
+    def clone_image(self, image_path: str, target_path: str) -> None:
+        """
+        Copy the image for a node. It shares blocks with the cached image, if
+        the file system supports reflink, and keeps holes of sparse images.
+        """
+        self._host_node.execute(
+            f"cp --reflink=auto --sparse=always {image_path} {target_path}",
+            shell=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message="Failed to clone cached image",
+        )
+
+    def get_statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hit": self._hit_count,
+                "miss": self._miss_count,
+                "evicted": self._evicted_count,
+            }
+
+    def _get_image_path(self, image_hash: str, image_format: DiskImageFormat) -> str:
+        return str(self._cache_dir / f"{image_hash}.{image_format.value}")
+
+    def _get_temp_path(self, image_path: str) -> str:
+        # the image is written to a temp file, and renamed when it's completed.
+        # So other processes don't use a partial image.
+        return f"{image_path}.{os.getpid()}.tmp"
+
+    def _get_marker_path(self, image_path: str) -> str:
+        return f"{image_path}.{self._user_name}.use"
+
+    def _use(self, image_path: str) -> bool:
+        """
+        Marks the image in use, and returns True, if it exists. It's in the
+        flock, so the image isn't evicted by other processes at the same time.
+        """
+        with self._lock:
+            self._in_use[image_path] = self._in_use.get(image_path, 0) + 1
+            script = (
+                f"touch {self._get_marker_path(image_path)} && "
+                f"test -f {image_path} && touch {image_path}"
+            )
+            result = self._host_node.execute(
+                f"flock {self._lock_path} sh -c '{script}'", shell=True
+            )
+        return result.exit_code == 0
+
+    def _upload(self, source_path: str, image_path: str) -> None:
+        temp_path = self._get_temp_path(image_path)
+        if self._host_node.is_remote:
+            self._host_node.shell.copy(Path(source_path), PurePosixPath(temp_path))
+        else:
+            self.clone_image(source_path, temp_path)
+        self._commit(temp_path, image_path)
+
+    def _commit(self, temp_path: str, image_path: str) -> None:
+        # libvirt runs VMs by another user, so it needs to read the image.
+        self._host_node.execute(
+            f"chmod a+r {temp_path} && mv -f {temp_path} {image_path}",
+            shell=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message="Failed to save cached image",
+        )
+
+    def _evict(self) -> None:
+        images = self._list_images()
+        total_kib = sum(size for _, size, _ in images)
+        # the least recently used first.
+        for _, size, image_path in sorted(images):
+            if total_kib <= self._size_budget_kib:
+                break
+            with self._lock:
+                if image_path in self._in_use:
+                    continue
+            # skip it, if it's used by other processes.
+            script = (
+                f"ls {image_path}.*.use > /dev/null 2>&1 && exit 1; "
+                f"rm -f {image_path}"
+            )
+            result = self._host_node.execute(
+                f"flock {self._lock_path} sh -c '{script}'", shell=True
+            )
+            if result.exit_code != 0:
+                self._log.debug(f"cached image is in use by others: {image_path}")
+                continue
+            self._log.debug(f"evicted cached image: {image_path}")
+            total_kib -= size
+            with self._lock:
+                self._evicted_count += 1
+
+    def _list_images(self) -> List[Tuple[float, int, str]]:
+        # the size is the used disk space, so sparse images are not overcounted.
+        output = self._host_node.execute(
+            f"find {self._cache_dir} -maxdepth 1 -type f "
+            f"\\( -name '*.{DiskImageFormat.QCOW2.value}' "
+            f"-o -name '*.{DiskImageFormat.RAW.value}' \\) "
+            "-printf '%T@ %k %p\\n'",
+            shell=True,
+        ).stdout
+        images: List[Tuple[float, int, str]] = []
+        for line in output.splitlines():
+            parts = line.strip().split(" ", maxsplit=2)
+            if len(parts) == 3:
+                images.append((float(parts[0]), int(parts[1]), parts[2]))
+        return images
+
+
+def _get_file_hash(file_path: Path) -> str:
+    file_path = file_path.resolve()
+    stat = file_path.stat()
+    index_path = constants.CACHE_PATH / _HASH_INDEX_FILE_NAME
+    with lock_file(index_path.with_suffix(".lock")):
+        index: Dict[str, Any] = {}
+        if index_path.exists():
+            with open(index_path, "r") as f:
+                index = json.load(f)
+        entry = index.get(str(file_path), None)
+        if (
+            entry
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            return str(entry["sha256"])
+
+        sha256 = hashlib.sha256()
+        with open(file_path, "rb") as f:
+            for chunk in iter(lambda: f.read(_HASH_CHUNK_SIZE), b""):
+                sha256.update(chunk)
+        index[str(file_path)] = {
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": sha256.hexdigest(),
+        }
+        write_file_atomically(index_path, json.dumps(index).encode())
+    return sha256.hexdigest()
@@ -12,9 +12,10 @@ import sys
 import tempfile
 import time
 import xml.etree.ElementTree as ET  # noqa: N817
+from functools import partial
 from pathlib import Path, PurePosixPath
 from threading import Lock, Timer
-from typing import Any, Dict, List, Optional, Tuple, Type, cast
+from typing import Any, Callable, Dict, List, Optional, Tuple, Type, cast
 
 import libvirt  # type: ignore
 import pycdlib  # type: ignore
@@ -43,6 +44,8 @@ from lisa.tools import (
 )
 from lisa.util import LisaException, constants, get_public_key_data
 from lisa.util.logger import Logger, filter_ansi_escape, get_logger
+from lisa.util.parallel import run_in_parallel
+from lisa.util.perf_timer import create_timer
 
 from . import libvirt_events_thread
 from .console_logger import QemuConsoleLogger
@@ -52,6 +55,7 @@ from .context import (
     get_environment_context,
     get_node_context,
 )
+from .image_cache import ImageCache
 from .platform_interface import IBaseLibvirtPlatform
 from .schema import (
     FIRMWARE_TYPE_BIOS,
@@ -68,6 +72,13 @@ KEY_HOST_DISTRO = "host_distro"
 KEY_HOST_KERNEL = "host_kernel_version"
 KEY_LIBVIRT_VERSION = "libvirt_version"
 KEY_VMM_VERSION = "vmm_version"
+KEY_IMAGE_CACHE = "image_cache"
+
+# The libvirt network of VMs.
+LIBVIRT_NETWORK_NAME = "default"
+# The range of seconds between queries of IP addresses.
+IP_ADDRESS_POLL_MIN_DELAY = 0.25
+IP_ADDRESS_POLL_MAX_DELAY = 2.0
 
 
 class _HostCapabilities:
@@ -103,6 +114,7 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
 
         # Lock used for scp-ing disk image to Remote host VM
         self._disk_img_copy_lock: Lock
+        self._image_cache: Optional[ImageCache] = None
 
         self._host_environment_information_hooks = {
             KEY_HOST_DISTRO: self._get_host_distro,
@@ -178,6 +190,14 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         self.__init_libvirt_conn_string()
         self.libvirt_conn = libvirt.open(self.libvirt_conn_str)
 
+        if self.platform_runbook.image_cache_size_gib > 0:
+            self._image_cache = ImageCache(
+                host_node=self.host_node,
+                cache_dir=os.path.join(host.lisa_working_dir, "lisa_image_cache"),
+                size_budget_gib=self.platform_runbook.image_cache_size_gib,
+                log=self._log,
+            )
+
     def _prepare_environment(self, environment: Environment, log: Logger) -> bool:
         # Ensure environment log directory is created before connecting to any nodes.
         _ = environment.log_path
@@ -536,13 +556,34 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
     ) -> None:
         self.host_node.shell.mkdir(Path(self.vm_disks_dir), exist_ok=True)
 
-        for node in environment.nodes.list():
-            node_context = get_node_context(node)
-            self._create_node(
+        timer = create_timer()
+        nodes = list(environment.nodes.list())
+        self._run_on_nodes(
+            nodes,
+            lambda node: self._create_node(
                 node,
-                node_context,
+                get_node_context(node),
                 environment,
                 log,
+            ),
+            log,
+        )
+        log.debug(f"created {len(nodes)} nodes in {timer}")
+
+    # Run the action on nodes, the count of concurrent actions is limited by
+    # node_parallelism.
+    def _run_on_nodes(
+        self, nodes: List[Node], action: Callable[[Node], None], log: Logger
+    ) -> None:
+        parallelism = self.platform_runbook.node_parallelism
+        if parallelism <= 1 or len(nodes) <= 1:
+            for node in nodes:
+                action(node)
+        else:
+            run_in_parallel(
+                [partial(action, node) for node in nodes],
+                log=log,
+                max_workers=parallelism,
             )
 
     def _create_node(
@@ -553,7 +594,22 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         log: Logger,
     ) -> None:
         # Create required directories and copy the required files to the host node.
-        if node_context.os_disk_source_file_path:
+        image_format = self._get_os_disk_image_format(node_context)
+        if self._image_cache and (
+            node_context.os_disk_source_file_path
+            or node_context.os_disk_base_file_fmt != image_format
+        ):
+            # use lock to avoid multiple nodes copy or convert the same image.
+            with self._disk_img_copy_lock:
+                node_context.os_disk_cached_file_path = self._image_cache.get_image(
+                    source_path=node_context.os_disk_source_file_path
+                    or node_context.os_disk_base_file_path,
+                    source_format=node_context.os_disk_base_file_fmt,
+                    target_format=image_format,
+                )
+            node_context.os_disk_base_file_path = node_context.os_disk_cached_file_path
+            node_context.os_disk_base_file_fmt = image_format
+        elif node_context.os_disk_source_file_path:
             # use lock to avoid multiple environments scp disk img to same
             # os_disk_base_file_path.
             with self._disk_img_copy_lock:
@@ -571,27 +627,46 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
                     )
 
         # Create cloud-init ISO file.
+        iso_timer = create_timer()
         self._create_node_cloud_init_iso(environment, log, node)
+        iso_timer.elapsed()
 
         # Create OS disk from the provided image.
+        disk_timer = create_timer()
         self._create_node_os_disk(environment, log, node)
 
         # Create data disks
         self._create_node_data_disks(node)
+        disk_timer.elapsed()
 
         # Create libvirt domain (i.e. VM).
+        define_timer = create_timer()
         xml = self._create_node_domain_xml(environment, log, node)
         node_context.domain = self.libvirt_conn.defineXML(xml)
+        define_timer.elapsed()
 
+        boot_timer = create_timer()
         self._create_domain_and_attach_logger(
             node_context,
         )
+        log.debug(
+            f"created VM {node_context.vm_name}, iso: {iso_timer}, "
+            f"disk: {disk_timer}, define: {define_timer}, boot: {boot_timer}"
+        )
+
+    # The format of base image, which the OS disk is created from. If the image
+    # cache is enabled, the image is converted to this format once.
+    def _get_os_disk_image_format(self, node_context: NodeContext) -> DiskImageFormat:
+        return node_context.os_disk_base_file_fmt
 
     # Delete all the VMs.
     def _delete_nodes(self, environment: Environment, log: Logger) -> None:
         # Delete nodes.
-        for node in environment.nodes.list():
-            self._delete_node(node, log)
+        self._run_on_nodes(
+            list(environment.nodes.list()),
+            lambda node: self._delete_node(node, log),
+            log,
+        )
 
         # Delete VM disks directory.
         try:
@@ -637,6 +712,10 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
 
             node_context.domain = None
 
+        if self._image_cache and node_context.os_disk_cached_file_path:
+            self._image_cache.release_image(node_context.os_disk_cached_file_path)
+            node_context.os_disk_cached_file_path = ""
+
         watchdog.cancel()
 
     def _get_domain_undefine_flags(self) -> int:
@@ -665,11 +744,13 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
             conn_info = remote_node.connection_info
             address = conn_info[constants.ENVIRONMENTS_NODES_REMOTE_ADDRESS]
 
-        for node in environment.nodes.list():
-            assert isinstance(node, RemoteNode)
+        # Get the VMs' IP addresses.
+        nodes = list(environment.nodes.list())
+        addresses = self._get_node_ip_addresses(environment, log, nodes, timeout)
 
-            # Get the VM's IP address.
-            local_address = self._get_node_ip_address(environment, log, node, timeout)
+        for node in nodes:
+            assert isinstance(node, RemoteNode)
+            local_address = addresses[get_node_context(node).vm_name]
 
             node_port = 22
             if self.host_node.is_remote:
@@ -924,7 +1005,7 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         network_interface.attrib["type"] = "network"
 
         network_interface_source = ET.SubElement(network_interface, "source")
-        network_interface_source.attrib["network"] = "default"
+        network_interface_source.attrib["network"] = LIBVIRT_NETWORK_NAME
 
         network_interface_model = ET.SubElement(network_interface, "model")
         network_interface_model.attrib["type"] = "virtio"
@@ -1033,23 +1114,67 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
         suffix = chr(ord("a") + disk_index)
         return f"{prefix}d{suffix}"
 
-    # Wait for the VM to boot and then get the IP address.
-    def _get_node_ip_address(
+    # Wait for the VMs to boot and then get the IP addresses. Returns the VM name
+    # to IP address.
+    def _get_node_ip_addresses(
         self,
         environment: Environment,
         log: Logger,
-        node: Node,
+        nodes: List[Node],
         timeout: float,
-    ) -> str:
-        node_context = get_node_context(node)
-
+    ) -> Dict[str, str]:
+        addresses: Dict[str, str] = {}
+        pending_nodes = {get_node_context(node).vm_name: node for node in nodes}
+        # libvirt doesn't raise events for DHCP leases, so poll leases of all
+        # VMs together, and back off to reduce the load of libvirtd.
+        delay = IP_ADDRESS_POLL_MIN_DELAY
         while True:
-            addr = self._try_get_node_ip_address(environment, log, node)
-            if addr:
-                return addr
+            leases = self._get_dhcp_leases(log)
+            for vm_name, node in list(pending_nodes.items()):
+                if leases is None:
+                    addr = self._try_get_node_ip_address(environment, log, node)
+                else:
+                    addr = leases.get(self._get_node_mac_address(node), None)
+                if addr:
+                    log.debug(f"got IP address of {vm_name}: {addr}")
+                    addresses[vm_name] = addr
+                    pending_nodes.pop(vm_name)
+
+            if not pending_nodes:
+                return addresses
+
+            remaining = timeout - time.time()
+            if remaining < 0:
+                raise LisaException(
+                    f"no IP addresses found for {', '.join(pending_nodes)}"
+                )
+            time.sleep(min(delay, remaining))
+            delay = min(delay * 2, IP_ADDRESS_POLL_MAX_DELAY)
 
-            if time.time() > timeout:
-                raise LisaException(f"no IP addresses found for {node_context.vm_name}")
+    # Get the DHCP leases of the VMs' network. Returns the MAC address to IP
+    # address, or None if the leases cannot be queried.
+    def _get_dhcp_leases(self, log: Logger) -> Optional[Dict[str, str]]:
+        try:
+            network = self.libvirt_conn.networkLookupByName(LIBVIRT_NETWORK_NAME)
+            leases = network.DHCPLeases()
+        except libvirt.libvirtError as ex:
+            log.debug(f"failed to get DHCP leases, query VMs one by one. {ex}")
+            return None
+
+        result: Dict[str, str] = {}
+        for lease in leases:
+            result.setdefault(lease["mac"].lower(), lease["ipaddr"])
+        return result
+
+    def _get_node_mac_address(self, node: Node) -> str:
+        node_context = get_node_context(node)
+        if not node_context.mac_address:
+            assert node_context.domain
+            domain_xml = ET.fromstring(node_context.domain.XMLDesc())
+            mac = domain_xml.find("./devices/interface/mac")
+            assert mac is not None, f"no MAC address found for {node_context.vm_name}"
+            node_context.mac_address = mac.attrib["address"].lower()
+        return node_context.mac_address
 
     # Try to get the IP address of the VM.
     def _try_get_node_ip_address(
@@ -1232,6 +1357,12 @@ class BaseLibvirtPlatform(Platform, IBaseLibvirtPlatform):
                 except Exception as identifier:
                     node.log.exception(f"error on get {key}.", exc_info=identifier)
 
+        if self._image_cache:
+            statistics = self._image_cache.get_statistics()
+            information[KEY_IMAGE_CACHE] = ", ".join(
+                f"{key}: {value}" for key, value in statistics.items()
+            )
+
         return information
 
     def _enable_libvirt_debug_log(self) -> None:
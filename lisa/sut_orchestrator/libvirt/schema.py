@@ -49,6 +49,16 @@ class BaseLibvirtPlatformSchema:
 
     capture_libvirt_debug_logs: bool = False
 
+    # The max count of nodes, which are created or deleted at the same time in
+    # an environment. 1 means nodes are created one by one.
+    node_parallelism: int = 1
+
+    # The size budget of base images cached on the host, in GiB. The images are
+    # cached by content, so they are copied and converted once only, and nodes
+    # use the cached image as the base of their disks. The cache is kept in the
+    # working folder of the host across runs. 0 means not to cache images.
+    image_cache_size_gib: int = 0
+
 
 # Possible disk image formats
 class DiskImageFormat(Enum):
@@ -5,7 +5,7 @@ import re
 from functools import partial
 from typing import Callable, Dict, List, Mapping, Optional, Pattern, Set, Union, cast
 
-from lisa import schema
+from lisa import schema, testsuite_index
 from lisa.testsuite import TestCaseMetadata, TestCaseRuntimeData, get_cases_metadata
 from lisa.util import LisaException, constants, set_filtered_fields
 from lisa.util.logger import get_logger
@@ -26,6 +26,8 @@ def select_testcases(
         for item in init_cases:
             full_list[item.full_name] = item
     else:
+        # import modules of extensions, which may have selected cases.
+        testsuite_index.import_cases(filters)
         full_list = get_cases_metadata()
     if filters:
         selected: Dict[str, TestCaseRuntimeData] = {}
@@ -51,7 +53,7 @@ def select_testcases(
     log.info(f"selected count: {len(results)}")
     for result in results:
         metadata = result.metadata
-        log.info(
+        log.debug(
             f"{metadata.full_name}, "
             f"area: {metadata.suite.area}, "
             f"category: {metadata.suite.category}, "
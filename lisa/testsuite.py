@@ -188,11 +188,19 @@ class TestResult:
             self._send_result_message(self.stacktrace)
 
     def check_environment(
-        self, environment: Environment, save_reason: bool = False
+        self,
+        environment: Environment,
+        save_reason: bool = False,
+        check_result: Optional[search_space.ResultReason] = None,
     ) -> bool:
+        """
+        The check_result is the result of the environment requirement, if it's
+        checked already. It's not changed, so it can be shared by test results.
+        """
         requirement = self.runtime_data.metadata.requirement
         assert requirement.environment
-        check_result = requirement.environment.check(environment.capability)
+        if check_result is None:
+            check_result = requirement.environment.check(environment.capability)
         if (
             check_result.result
             and requirement.os_type
@@ -222,7 +230,8 @@ class TestResult:
             if self.check_results:
                 self.check_results.merge(check_result)
             else:
-                self.check_results = check_result
+                # copy it, because the reasons are merged into it later.
+                self.check_results = copy.deepcopy(check_result)
         return check_result.result
 
     def get_elapsed(self) -> float:
@@ -670,7 +679,9 @@ class TestSuite:
                 serial_console = node.features[SerialConsole]
                 log_dir = log_path / Path(f"serial_console_{node.name}")
                 log_dir.mkdir(parents=True)
-                serial_console.get_console_log(log_dir, force_run=True)
+                serial_console.get_console_log(
+                    log_dir, force_run=True, save_screenshot=True
+                )
 
     def __create_case_log_path(self, case_name: str) -> Path:
         while True:
@@ -0,0 +1,319 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""
+Importing all test suites of extensions is slow, when there are thousands of
+test cases. So the fields, which are used to select test cases, are parsed
+from source code, and saved in an index. When test cases are selected, only
+modules, which may have matched cases, are imported. The index is refreshed,
+when a source file is changed.
+"""
+
+import ast
+import hashlib
+import json
+import re
+from dataclasses import dataclass, field
+from functools import partial
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from dataclasses_json import dataclass_json
+
+from lisa import schema
+from lisa.util import constants, lock_file, write_file_atomically
+from lisa.util.logger import Logger, get_logger
+from lisa.util.package import get_package_files, import_module_file, import_root_package
+
+_get_logger = partial(get_logger, "init", "module")
+
+_INDEX_FILE_NAME = "lisa_testsuite_index.json"
+
+# the arguments to select test cases, and their positions in metadata.
+_SUITE_ARGUMENTS = {"area": 0, "category": 1, "tags": 3}
+_CASE_ARGUMENTS = {"priority": 1}
+
+
+@dataclass_json()
+@dataclass
+class _IndexedCase:
+    # None means it cannot be parsed from source code, so it's always matched.
+    name: str
+    area: Optional[str] = None
+    category: Optional[str] = None
+    priority: Optional[int] = None
+    tags: Optional[List[str]] = None
+
+
+@dataclass_json()
+@dataclass
+class _IndexedFile:
+    mtime_ns: int
+    size: int
+    sha256: str
+    # the module registers plugins or mix-in types, so it's always imported.
+    is_plugin: bool = False
+    cases: List[_IndexedCase] = field(default_factory=list)
+
+
+class _Package:
+    def __init__(
+        self, name: str, package_dir: Path, files: Dict[Path, _IndexedFile]
+    ) -> None:
+        self.name = name
+        self.package_dir = package_dir
+        self.files = files
+        self.imported: Set[Path] = set()
+
+    def import_files(self, files: List[Path], log: Logger) -> None:
+        for file in files:
+            if file in self.imported:
+                continue
+            import_module_file(
+                file=file,
+                root_package_name=self.name,
+                package_dir=self.package_dir,
+                log=log,
+            )
+            self.imported.add(file)
+
+
+_packages: List[_Package] = []
+
+
+def add_package(path: Path, package_name: str) -> None:
+    """
+    Add an extension package. Modules with plugins are imported now, and
+    modules of test suites are imported, when their cases are selected.
+    """
+    if not path.exists():
+        raise FileNotFoundError(f"import module path: {path}")
+
+    log = _get_logger()
+    log.info(f"loading Python extensions from {path}")
+    package_dir, package_files = get_package_files(path)
+    import_root_package(package_name=package_name, path=package_dir)
+
+    package = _Package(package_name, package_dir, _load_index(package_files, log))
+    _packages.append(package)
+    package.import_files(
+        [file for file, indexed in package.files.items() if indexed.is_plugin], log
+    )
+
+
+def import_cases(filters: Optional[List[Any]] = None) -> None:
+    """
+    Import modules of added packages, which may have cases matched by the
+    filters. If filters are None, all modules are imported.
+    """
+    log = _get_logger()
+    for package in _packages:
+        files = [
+            file
+            for file, indexed in package.files.items()
+            if file not in package.imported and _is_needed(indexed, filters)
+        ]
+        package.import_files(files, log)
+        log.debug(
+            f"imported {len(package.imported)} of {len(package.files)} modules "
+            f"in '{package.name}'"
+        )
+
+
+def _is_needed(indexed: _IndexedFile, filters: Optional[List[Any]]) -> bool:
+    # it's conservative. A module is imported, if any case in it may be
+    # included by any filter. The accurate selection is done on imported cases.
+    if not filters:
+        return True
+    for filter_ in filters:
+        if not isinstance(filter_, schema.TestCase) or not filter_.criteria:
+            return True
+        if filter_.select_action in [
+            constants.TESTCASE_SELECT_ACTION_NONE,
+            constants.TESTCASE_SELECT_ACTION_EXCLUDE,
+            constants.TESTCASE_SELECT_ACTION_FORCE_EXCLUDE,
+        ]:
+            continue
+        if any(_is_matched(case, filter_.criteria) for case in indexed.cases):
+            return True
+    return False
+
+
+def _is_matched(case: _IndexedCase, criteria: schema.Criteria) -> bool:
+    for name in [
+        constants.NAME,
+        constants.TESTCASE_CRITERIA_AREA,
+        constants.TESTCASE_CRITERIA_CATEGORY,
+    ]:
+        pattern = getattr(criteria, name)
+        value = getattr(case, name)
+        if pattern and value is not None and not re.fullmatch(pattern, value):
+            return False
+
+    priority = criteria.priority
+    if priority is not None and case.priority is not None:
+        priorities = [priority] if isinstance(priority, int) else priority
+        if case.priority not in priorities:
+            return False
+
+    tags = criteria.tags
+    if tags and case.tags is not None:
+        tags = [tags] if isinstance(tags, str) else tags
+        if not any(x in case.tags for x in tags):
+            return False
+    return True
+
+
+def _load_index(files: List[Path], log: Logger) -> Dict[Path, _IndexedFile]:
+    cache_path: Optional[Path] = getattr(constants, "CACHE_PATH", None)
+    if not cache_path:
+        return {file: _index_file(file, file.read_bytes()) for file in files}
+
+    index_path = cache_path / _INDEX_FILE_NAME
+    result: Dict[Path, _IndexedFile] = {}
+    with lock_file(index_path.with_suffix(".lock")):
+        raw_index: Dict[str, Any] = {}
+        if index_path.exists():
+            with open(index_path, "r") as f:
+                raw_index = json.load(f)
+
+        changed_count = 0
+        is_dirty = False
+        for file in files:
+            stat = file.stat()
+            key = str(file.resolve())
+            raw_entry = raw_index.get(key, None)
+            entry = (
+                _IndexedFile.from_dict(raw_entry) if raw_entry else None  # type: ignore
+            )
+            if (
+                not entry
+                or entry.mtime_ns != stat.st_mtime_ns
+                or entry.size != stat.st_size
+            ):
+                content = file.read_bytes()
+                sha256 = hashlib.sha256(content).hexdigest()
+                if not entry or entry.sha256 != sha256:
+                    entry = _index_file(file, content)
+                    changed_count += 1
+                entry.mtime_ns = stat.st_mtime_ns
+                entry.size = stat.st_size
+                raw_index[key] = entry.to_dict()
+                is_dirty = True
+            result[file] = entry
+
+        # remove deleted files.
+        for name in list(raw_index.keys()):
+            if not Path(name).exists():
+                del raw_index[name]
+                is_dirty = True
+        if is_dirty:
+            write_file_atomically(index_path, json.dumps(raw_index).encode("utf-8"))
+    log.debug(f"indexed {len(files)} modules, {changed_count} changed")
+    return result
+
+
+def _index_file(file: Path, content: bytes) -> _IndexedFile:
+    stat = file.stat()
+    is_plugin, cases = _parse_source(content)
+    return _IndexedFile(
+        mtime_ns=stat.st_mtime_ns,
+        size=stat.st_size,
+        sha256=hashlib.sha256(content).hexdigest(),
+        is_plugin=is_plugin,
+        cases=cases,
+    )
+
+
+def _parse_source(content: bytes) -> Tuple[bool, List[_IndexedCase]]:
+    try:
+        tree = ast.parse(content)
+    except SyntaxError:
+        # it raises the error on importing.
+        return True, []
+
+    is_plugin = False
+    cases: List[_IndexedCase] = []
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+            if node.name == "type_name" or _find_decorator(node, "hookimpl"):
+                is_plugin = True
+        elif isinstance(node, ast.Call):
+            if _get_name(node.func) in ["register", "add_hookspecs"]:
+                is_plugin = True
+        elif isinstance(node, ast.ClassDef):
+            suite_decorator = _find_decorator(node, "TestSuiteMetadata")
+            if not suite_decorator:
+                continue
+            suite_arguments = _get_arguments(suite_decorator, _SUITE_ARGUMENTS)
+            # tags is None by default, but it's an empty list in metadata.
+            if "tags" not in suite_arguments:
+                suite_arguments["tags"] = []
+            for item in node.body:
+                if not isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                    continue
+                case_decorator = _find_decorator(item, "TestCaseMetadata")
+                if not case_decorator:
+                    continue
+                case_arguments = _get_arguments(case_decorator, _CASE_ARGUMENTS)
+                case_arguments.setdefault("priority", 2)
+                cases.append(
+                    _IndexedCase(name=item.name, **suite_arguments, **case_arguments)
+                )
+    return is_plugin, cases
+
+
+def _find_decorator(node: Any, name: str) -> Optional[ast.expr]:
+    decorator: ast.expr
+    for decorator in node.decorator_list:
+        target = decorator.func if isinstance(decorator, ast.Call) else decorator
+        if _get_name(target) == name:
+            return decorator
+    return None
+
+
+def _get_name(node: ast.expr) -> str:
+    if isinstance(node, ast.Name):
+        return node.id
+    if isinstance(node, ast.Attribute):
+        return node.attr
+    return ""
+
+
+def _get_arguments(decorator: ast.expr, positions: Dict[str, int]) -> Dict[str, Any]:
+    # Returns parsed values of arguments. If an argument is specified, but it's
+    # not a literal, the value is None. If it's not specified, it's not in the
+    # result.
+    result: Dict[str, Any] = {}
+    if not isinstance(decorator, ast.Call):
+        return result
+    keywords = {x.arg: x.value for x in decorator.keywords}
+    for name, position in positions.items():
+        if None in keywords or any(isinstance(x, ast.Starred) for x in decorator.args):
+            # **kwargs or *args cannot be parsed.
+            result[name] = None
+            continue
+        if name in keywords:
+            value_node: Optional[ast.expr] = keywords[name]
+        elif position < len(decorator.args):
+            value_node = decorator.args[position]
+        else:
+            continue
+        try:
+            value = ast.literal_eval(value_node)  # type: ignore
+            if name == "tags" and value is None:
+                value = []
+        except Exception:
+            value = None
+        if name == "tags":
+            if not isinstance(value, list) or not all(
+                isinstance(x, str) for x in value
+            ):
+                value = None
+        elif name == "priority":
+            if not isinstance(value, int):
+                value = None
+        elif not isinstance(value, str):
+            value = None
+        result[name] = value
+    return result
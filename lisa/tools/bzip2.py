@@ -1,5 +1,8 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
+
+from typing import List
+
 from lisa.executable import Tool
 from lisa.operating_system import Posix
 
@@ -13,7 +16,11 @@ class Bzip2(Tool):
     def can_install(self) -> bool:
         return True
 
+    @property
+    def packages(self) -> List[str]:
+        return [self.package_name]
+
     def _install(self) -> bool:
         posix_os: Posix = self.node.os  # type: ignore
-        posix_os.install_packages([self])
+        posix_os.install_packages(self.packages)
         return self._check_exists()
@@ -495,9 +495,13 @@ class Ethtool(Tool):
         self._device_set: Set[str] = set()
         self._device_settings_map: Dict[str, DeviceSettings] = {}
 
+    @property
+    def packages(self) -> List[str]:
+        return ["ethtool"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("ethtool")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
 
     def get_device_driver(self, interface: str) -> str:
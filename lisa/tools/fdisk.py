@@ -87,9 +87,13 @@ class Fdisk(Tool):
                 sudo=True,
             )
 
+    @property
+    def packages(self) -> List[str]:
+        return ["util-linux"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("util-linux")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
 
     def _get_partitions(self, disk_name: str) -> List[str]:
@@ -2,7 +2,7 @@
 # Licensed under the MIT license.
 
 import re
-from typing import cast
+from typing import List, cast
 
 from semver import VersionInfo
 
@@ -48,7 +48,11 @@ class Gcc(Tool):
             return VersionInfo(int(major), int(minor), int(patch))
         raise LisaException("fail to get gcc version")
 
+    @property
+    def packages(self) -> List[str]:
+        return ["gcc"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("gcc")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
@@ -1,7 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from typing import cast
+from typing import List, cast
 
 from lisa.executable import Tool
 from lisa.operating_system import Posix
@@ -20,7 +20,11 @@ class Gdb(Tool):
         output = self.run(f"{arguments} {filename}", shell=True, force_run=True)
         return output.stdout
 
+    @property
+    def packages(self) -> List[str]:
+        return ["gdb"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("gdb")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
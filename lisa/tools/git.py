@@ -1,6 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import hashlib
 import pathlib
 import re
 from typing import Dict, List, Optional
@@ -58,13 +59,32 @@ class Git(Tool):
         fail_on_exists: bool = True,
         auth_token: Optional[str] = None,
         timeout: int = 600,
+        depth: int = 0,
+        filter_: str = "",
+        reference: Optional[pathlib.PurePath] = None,
     ) -> pathlib.PurePath:
+        """
+        depth: clone the latest commits only. If the ref is set, only the ref is
+            fetched with the depth, so it can be a branch, tag or commit.
+        filter_: the filter of partial clone, like "blob:none", which
+            downloads blobs on demand.
+        reference: a local repo, like the mirror, which provides objects, so
+            they are not downloaded again. The objects are copied, so the clone
+            doesn't break, when the reference is updated and pruned later.
+        """
         self.node.shell.mkdir(cwd, exist_ok=True)
-        auth_flag = ""
-        if auth_token:
-            auth_flag = f'-c http.extraheader="AUTHORIZATION: bearer {auth_token}"'
+        auth_flag = self._get_auth_flag(auth_token)
 
         cmd = f"clone {auth_flag} {url} {dir_name} --recurse-submodules"
+        if depth:
+            cmd += f" --depth {depth} --shallow-submodules"
+            if ref:
+                # the ref is fetched below, it may not be in the default branch.
+                cmd += " --no-checkout"
+        if filter_:
+            cmd += f" --filter={filter_}"
+        if reference:
+            cmd += f" --reference-if-able {reference} --dissociate"
 
         # git print to stderr for normal info, so set no_error_log to True.
         result = self.run(cmd, cwd=cwd, no_error_log=True, timeout=timeout)
@@ -99,9 +119,52 @@ class Git(Tool):
         full_path = cwd / code_dir
         self._log.debug(f"code path: {full_path}")
         if ref:
+            if depth:
+                self.fetch(cwd=full_path, ref=ref, depth=depth, auth_token=auth_token)
+                ref = "FETCH_HEAD"
             self.checkout(ref, cwd=full_path)
         return full_path
 
+    def mirror(
+        self,
+        url: str,
+        cwd: pathlib.PurePath,
+        auth_token: Optional[str] = None,
+        timeout: int = 600,
+    ) -> pathlib.PurePath:
+        """
+        Create or update a bare mirror of the repo under cwd, and return the
+        path of it. The mirror is kept on the node, so it can be the reference
+        of clones in later runs, and only new objects are downloaded. It's
+        locked by flock, so concurrent clones of the same repo on the node wait
+        for one update, instead of downloading it multiple times.
+        """
+        name = url.rstrip("/").split("/")[-1]
+        if name.endswith(".git"):
+            name = name[:-4]
+        url_hash = hashlib.sha256(url.encode("utf-8")).hexdigest()[:12]
+        mirror_path = cwd / f"{name}_{url_hash}.git"
+        lock_path = cwd / f"{name}_{url_hash}.lock"
+        auth_flag = self._get_auth_flag(auth_token)
+
+        self.node.shell.mkdir(cwd, parents=True, exist_ok=True)
+        self._log.debug(f"updating mirror of {url} in {mirror_path}")
+        # check existence in the lock, because it may be created by others.
+        script = (
+            f"if [ -d {mirror_path} ]; then "
+            f"{self.command} -C {mirror_path} {auth_flag} remote update --prune; "
+            f"else {self.command} {auth_flag} clone --mirror {url} {mirror_path}; fi"
+        )
+        result = self.node.execute(
+            f"flock {lock_path} sh -c '{script}'",
+            shell=True,
+            no_error_log=True,
+            timeout=timeout,
+        )
+        result.assert_exit_code(message=f"failed to update mirror. {result.stdout}")
+        self._mark_safe(mirror_path)
+        return mirror_path
+
     def checkout(
         self, ref: str, cwd: pathlib.PurePath, checkout_branch: str = ""
     ) -> None:
@@ -147,9 +210,26 @@ class Git(Tool):
         )
         result.assert_exit_code(message=f"failed to pull code. {result.stdout}")
 
-    def fetch(self, cwd: pathlib.PurePath) -> None:
+    def fetch(
+        self,
+        cwd: pathlib.PurePath,
+        ref: str = "",
+        depth: int = 0,
+        auth_token: Optional[str] = None,
+    ) -> None:
+        """
+        Fetch all refs, or the ref only, if it's set. The fetched ref can be
+        checked out by "FETCH_HEAD".
+        """
+        cmd = f"{self._get_auth_flag(auth_token)} fetch"
+        if depth:
+            cmd += f" --depth {depth}"
+        if ref:
+            cmd += f" origin {ref}"
+        else:
+            cmd += " -p"
         result = self.run(
-            "fetch -p",
+            cmd,
             force_run=True,
             cwd=cwd,
             no_info_log=True,
@@ -274,6 +354,11 @@ class Git(Tool):
         version_str = get_matched_str(result.stdout, self.VERSION_PATTERN)
         return VersionInfo.parse(version_str)
 
+    def _get_auth_flag(self, auth_token: Optional[str]) -> str:
+        if not auth_token:
+            return ""
+        return f'-c http.extraheader="AUTHORIZATION: bearer {auth_token}"'
+
     def _mark_safe(self, cwd: pathlib.PurePath) -> None:
         self.run(f"config --global --add safe.directory {cwd}", cwd=cwd, force_run=True)
 
@@ -11,6 +11,7 @@ from lisa.executable import Tool
 from lisa.operating_system import FreeBSD, Posix
 from lisa.tools.powershell import PowerShell
 from lisa.util import LisaException
+from lisa.util.query_cache import cached_query
 
 CpuType = Enum(
     "CpuType",
@@ -134,6 +135,7 @@ class Lscpu(Tool):
         ).is_subset_of(self.__architecture_dict.keys())
         return self.__architecture_dict[architecture]
 
+    @cached_query(ttl=600)
     def get_core_count(self, force_run: bool = False) -> int:
         result = self.run(force_run=force_run)
         matched = self.__vcpu.findall(result.stdout)
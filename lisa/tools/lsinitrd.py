@@ -2,7 +2,7 @@
 # Licensed under the MIT license.
 
 import re
-from typing import cast
+from typing import List, cast
 
 from lisa.executable import Tool
 from lisa.operating_system import Posix
@@ -23,9 +23,13 @@ class Lsinitrd(Tool):
     def can_install(self) -> bool:
         return True
 
+    @property
+    def packages(self) -> List[str]:
+        return ["dracut-core"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("dracut-core")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
 
     def has_module(self, module_file_name: str, initrd_file_path: str = "") -> bool:
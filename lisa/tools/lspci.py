@@ -83,9 +83,13 @@ class Lspci(Tool):
         self._command = "lspci"
         self._pci_devices: List[PciDevice] = []
 
+    @property
+    def packages(self) -> List[str]:
+        return ["pciutils"]
+
     def _install(self) -> bool:
         if isinstance(self.node.os, Posix):
-            self.node.os.install_packages("pciutils")
+            self.node.os.install_packages(self.packages)
         return self._check_exists()
 
     def get_device_names_by_type(
@@ -2,11 +2,10 @@
 # Licensed under the MIT license.
 
 from pathlib import PurePath
-from typing import TYPE_CHECKING, Dict, Optional, cast
+from typing import TYPE_CHECKING, Dict, List, Optional, cast
 
 from lisa.executable import Tool
 from lisa.operating_system import Posix
-from lisa.tools.gcc import Gcc
 from lisa.tools.lscpu import Lscpu
 from lisa.util.process import ExecutableResult
 
@@ -27,9 +26,13 @@ class Make(Tool):
     def can_install(self) -> bool:
         return True
 
+    @property
+    def packages(self) -> List[str]:
+        return ["make", "gcc"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages([self, Gcc])
+        posix_os.install_packages(self.packages)
         return self._check_exists()
 
     def make_install(
@@ -170,7 +170,11 @@ class Mount(Tool):
         self._log.debug(f"Found mount points: {mount_points}")
         return any([x for x in mount_points if mount_point == x["mount_point"]])
 
+    @property
+    def packages(self) -> List[str]:
+        return ["util-linux"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("util-linux")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
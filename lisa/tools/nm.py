@@ -1,7 +1,7 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
-from typing import cast
+from typing import List, cast
 
 from lisa.executable import Tool
 from lisa.operating_system import Posix
@@ -16,9 +16,13 @@ class Nm(Tool):
     def can_install(self) -> bool:
         return True
 
+    @property
+    def packages(self) -> List[str]:
+        return ["binutils"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("binutils")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
 
     def get_symbol_table(self, file: str) -> str:
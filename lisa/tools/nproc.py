@@ -2,6 +2,7 @@
 # Licensed under the MIT license.
 
 from lisa.executable import Tool
+from lisa.util.query_cache import cached_query
 
 
 class Nproc(Tool):
@@ -9,6 +10,7 @@ class Nproc(Tool):
     def command(self) -> str:
         return "nproc"
 
-    def get_num_procs(self) -> int:
-        result = self.run()
+    @cached_query(ttl=600)
+    def get_num_procs(self, force_run: bool = False) -> int:
+        result = self.run(force_run=force_run)
         return int(result.stdout)
@@ -1,6 +1,6 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
-from typing import cast
+from typing import List, cast
 
 from lisa.executable import Tool
 from lisa.operating_system import Posix
@@ -38,7 +38,11 @@ class Parted(Tool):
         )
         cmd_result.assert_exit_code()
 
+    @property
+    def packages(self) -> List[str]:
+        return ["parted"]
+
     def _install(self) -> bool:
         posix_os: Posix = cast(Posix, self.node.os)
-        posix_os.install_packages("parted")
+        posix_os.install_packages(self.packages)
         return self._check_exists()
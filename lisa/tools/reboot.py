@@ -109,6 +109,7 @@ class Reboot(Tool):
         except Exception as identifier:
             # it doesn't matter to exceptions here. The system may reboot fast
             self._log.debug(f"ignorable exception on rebooting: {identifier}")
+        self.node.invalidate_query_cache("reboot")
 
         connected: bool = False
         # The previous steps may take longer time than time out. After that, it
@@ -154,6 +155,7 @@ class WindowsReboot(Reboot):
         self.node.tools[PowerShell].run_cmdlet(
             "Restart-Computer -Force", force_run=True
         )
+        self.node.invalidate_query_cache("reboot")
 
         # wait for nested vm ssh connection to be ready
         from lisa.node import RemoteNode
@@ -86,6 +86,10 @@ class TcpDump(Tool):
 
         return packets
 
+    @property
+    def packages(self) -> List[str]:
+        return ["tcpdump"]
+
     def _install(self) -> bool:
-        self.node.os.install_packages("tcpdump")  # type: ignore
+        self.node.os.install_packages(self.packages)  # type: ignore
         return self._check_exists()
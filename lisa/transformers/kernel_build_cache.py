@@ -0,0 +1,171 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import json
+from contextlib import contextmanager
+from pathlib import Path, PurePath
+from typing import Iterator
+
+from lisa.node import Node
+from lisa.tools import Cp, Tar
+from lisa.util import LisaException, lock_file, write_file_atomically
+from lisa.util.logger import Logger
+
+# The inputs of building, which are hashed as the key. The patches and other
+# changes are included by the diff and untracked files. The toolchain is
+# included by versions of compiler and linker.
+_KEY_SCRIPT = (
+    "git rev-parse HEAD; git diff HEAD; "
+    "git ls-files -o --exclude-standard -z | xargs -0 -r sha256sum; "
+    "cat .config; gcc --version; ld --version; uname -m"
+)
+
+_MODULES_FILE_NAME = "modules.tar.gz"
+_IMAGE_FILE_NAME = "vmlinuz"
+_SYSTEM_MAP_FILE_NAME = "System.map"
+_CONFIG_FILE_NAME = "config"
+# it's written at last, so a cached build is complete, if it exists.
+_INFORMATION_FILE_NAME = "information.json"
+
+
+class KernelBuildCache:
+    """
+    Caches built kernels in a local folder, by the hash of the commit, the
+    changes on it, the kernel config and the toolchain. The first node builds
+    the kernel and saves it, other nodes with the same key wait for it, and
+    install the cached kernel instead of building it again.
+    """
+
+    def __init__(self, path: Path, log: Logger) -> None:
+        self._path = path
+        self._log = log
+
+    def get_key(self, node: Node, code_path: PurePath) -> str:
+        """
+        Returns the key of the configured code, or empty, if it cannot be
+        hashed, like the code is not a git repo.
+        """
+        result = node.execute("git rev-parse HEAD", cwd=code_path, shell=True)
+        if result.exit_code != 0:
+            self._log.info(
+                f"the kernel build is not cached, because the code is not in a "
+                f"git repo: {result.stdout}"
+            )
+            return ""
+        result = node.execute(
+            f"({_KEY_SCRIPT}) 2>&1 | sha256sum",
+            cwd=code_path,
+            shell=True,
+            expected_exit_code=0,
+        )
+        key = result.stdout.split()[0]
+        self._log.debug(f"kernel build cache key: {key}")
+        return key
+
+    @contextmanager
+    def lock(self, key: str) -> Iterator[None]:
+        """
+        The lock makes other nodes wait, when the kernel of the key is building.
+        """
+        with lock_file(self._path / f"{key}.lock"):
+            yield
+
+    def install(self, node: Node, key: str) -> str:
+        """
+        Install the cached kernel, and returns its version. It returns empty, if
+        it's not cached.
+        """
+        local_path = self._path / key
+        information_path = local_path / _INFORMATION_FILE_NAME
+        if not information_path.exists():
+            self._log.info(f"kernel build cache miss: {key}")
+            return ""
+
+        with open(information_path, "r") as f:
+            kernel_version: str = json.load(f)["kernel_version"]
+        self._log.info(f"kernel build cache hit: {key}, version: {kernel_version}")
+
+        node_path = node.working_path / "kernel_build_cache" / key
+        node.shell.mkdir(node_path, parents=True, exist_ok=True)
+        for file_name in [
+            _MODULES_FILE_NAME,
+            _IMAGE_FILE_NAME,
+            _SYSTEM_MAP_FILE_NAME,
+            _CONFIG_FILE_NAME,
+        ]:
+            node.shell.copy(local_path / file_name, node_path / file_name)
+
+        node.tools[Tar].extract(
+            file=str(node_path / _MODULES_FILE_NAME),
+            dest_dir="/lib/modules/",
+            gzip=True,
+            sudo=True,
+        )
+        node.tools[Cp].copy(
+            src=node_path / _CONFIG_FILE_NAME,
+            dest=node.get_pure_path(f"/boot/config-{kernel_version}"),
+            sudo=True,
+        )
+
+        # It's the same as "make install", which generates initrd and updates
+        # the boot loader by the installkernel of the distro.
+        result = node.execute(
+            f"installkernel {kernel_version} {node_path / _IMAGE_FILE_NAME} "
+            f"{node_path / _SYSTEM_MAP_FILE_NAME} /boot",
+            sudo=True,
+            shell=True,
+        )
+        if result.exit_code != 0:
+            raise LisaException(f"failed to install cached kernel: {result.stdout}")
+
+        return kernel_version
+
+    def save(
+        self, node: Node, key: str, code_path: PurePath, kernel_version: str
+    ) -> None:
+        """
+        Save the built and installed kernel on the node to the cache. It
+        doesn't raise errors, because the kernel is installed already.
+        """
+        try:
+            self._save(
+                node=node, key=key, code_path=code_path, kernel_version=kernel_version
+            )
+        except Exception as identifier:
+            self._log.info(f"failed to save kernel build to cache: {identifier}")
+
+    def _save(
+        self, node: Node, key: str, code_path: PurePath, kernel_version: str
+    ) -> None:
+        local_path = self._path / key
+        local_path.mkdir(parents=True, exist_ok=True)
+        node_path = node.working_path / "kernel_build_cache" / key
+        node.shell.mkdir(node_path, parents=True, exist_ok=True)
+
+        result = node.execute(
+            "make -s image_name", cwd=code_path, shell=True, expected_exit_code=0
+        )
+        image_path = code_path / result.stdout.strip()
+        node.execute(
+            f"tar -czf {node_path / _MODULES_FILE_NAME} -C /lib/modules "
+            f"--exclude={kernel_version}/build --exclude={kernel_version}/source "
+            f"{kernel_version}",
+            sudo=True,
+            shell=True,
+            expected_exit_code=0,
+            expected_exit_code_failure_message="failed to pack kernel modules",
+        )
+        node.execute(f"chmod a+r {node_path / _MODULES_FILE_NAME}", sudo=True)
+        for node_file, file_name in [
+            (node_path / _MODULES_FILE_NAME, _MODULES_FILE_NAME),
+            (image_path, _IMAGE_FILE_NAME),
+            (code_path / "System.map", _SYSTEM_MAP_FILE_NAME),
+            (code_path / ".config", _CONFIG_FILE_NAME),
+        ]:
+            node.shell.copy_back(node_file, local_path / file_name)
+
+        write_file_atomically(
+            local_path / _INFORMATION_FILE_NAME,
+            json.dumps({"kernel_version": kernel_version}).encode("utf-8"),
+        )
+        self._log.info(f"saved kernel build to cache: {key}")
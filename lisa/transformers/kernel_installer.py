@@ -132,6 +132,7 @@ class KernelInstallerTransformer(Transformer):
 
         installer.validate()
         installed_kernel_version = installer.install()
+        node.invalidate_query_cache("kernel installed")
         self._information = installer.information
         self._log.info(f"installed kernel version: {installed_kernel_version}")
 
@@ -2,7 +2,7 @@
 # Licensed under the MIT license.
 from dataclasses import dataclass, field
 from datetime import datetime, timezone
-from pathlib import PurePath
+from pathlib import Path, PurePath
 from typing import Any, Dict, List, Optional, Type, cast
 
 from dataclasses_json import dataclass_json
@@ -17,6 +17,7 @@ from lisa.tools.lscpu import Lscpu
 from lisa.util import LisaException, field_metadata, subclasses
 from lisa.util.logger import Logger, get_logger
 
+from .kernel_build_cache import KernelBuildCache
 from .kernel_installer import BaseInstaller, BaseInstallerSchema
 
 
@@ -59,6 +60,15 @@ class RepoLocationSchema(LocalLocationSchema):
             required=False,
         ),
     )
+    # clone the latest commits of the ref only. 0 means the full history.
+    depth: int = 0
+    # the filter of partial clone, like "blob:none", which downloads the
+    # history without blobs, and blobs are downloaded on demand.
+    clone_filter: str = ""
+    # The folder on the node to keep a mirror of the repo. The code is cloned
+    # with the mirror as reference, so later runs and other transformers on the
+    # same node download new objects only. It's disabled, if it's empty.
+    mirror_path: str = ""
 
 
 @dataclass_json()
@@ -73,6 +83,8 @@ class PatchModifierSchema(BaseModifierSchema):
     ref: str = ""
     path: str = ""
     file_pattern: str = "*.patch"
+    # clone the latest commits of the ref only. 0 means the full history.
+    depth: int = 0
 
 
 @dataclass_json()
@@ -93,9 +105,17 @@ class SourceInstallerSchema(BaseInstallerSchema):
         ),
     )
 
+    # The local folder to cache built kernels. If nodes build the same code
+    # with the same config and toolchain, the first one builds it, and others
+    # install the cached kernel. It's disabled, if it's empty.
+    build_cache_path: str = ""
+    # use ccache to speed up building near-identical code on the same node.
+    use_ccache: bool = False
+
 
 class SourceInstaller(BaseInstaller):
     _code_path: PurePath
+    _use_ccache: bool = False
 
     @classmethod
     def type_name(cls) -> str:
@@ -159,15 +179,41 @@ class SourceInstaller(BaseInstaller):
         self._modify_code(node=node, code_path=self._code_path)
 
         kconfig_file = runbook.kernel_config_file
-        self._build_code(
+        self._configure_code(
             node=node, code_path=self._code_path, kconfig_file=kconfig_file
         )
 
-        self._install_build(node=node, code_path=self._code_path)
+        if not runbook.build_cache_path:
+            return self._build_and_install(node=node, code_path=self._code_path)
+
+        cache = KernelBuildCache(Path(runbook.build_cache_path), self._log)
+        key = cache.get_key(node=node, code_path=self._code_path)
+        if not key:
+            return self._build_and_install(node=node, code_path=self._code_path)
+        with cache.lock(key):
+            kernel_version = cache.install(node=node, key=key)
+            if kernel_version:
+                self._update_boot_loader(node)
+            else:
+                kernel_version = self._build_and_install(
+                    node=node, code_path=self._code_path
+                )
+                cache.save(
+                    node=node,
+                    key=key,
+                    code_path=self._code_path,
+                    kernel_version=kernel_version,
+                )
+        return kernel_version
+
+    def _build_and_install(self, node: Node, code_path: PurePath) -> str:
+        self._build_code(node=node, code_path=code_path)
+
+        self._install_build(node=node, code_path=code_path)
 
         result = node.execute(
             "make kernelrelease 2>/dev/null",
-            cwd=self._code_path,
+            cwd=code_path,
             shell=True,
         )
 
@@ -180,7 +226,7 @@ class SourceInstaller(BaseInstaller):
         # copy current config back to system folder.
         result = node.execute(
             f"cp .config /boot/config-{kernel_version}",
-            cwd=self._code_path,
+            cwd=code_path,
             sudo=True,
         )
         result.assert_exit_code()
@@ -188,15 +234,21 @@ class SourceInstaller(BaseInstaller):
         return kernel_version
 
     def _install_build(self, node: Node, code_path: PurePath) -> None:
+        # modules are built by the default target already.
         make = node.tools[Make]
-        make.make(arguments="modules", cwd=code_path, sudo=True)
+        make.make(
+            arguments=self._get_make_arguments("INSTALL_MOD_STRIP=1 modules_install"),
+            cwd=code_path,
+            sudo=True,
+        )
 
         make.make(
-            arguments="INSTALL_MOD_STRIP=1 modules_install", cwd=code_path, sudo=True
+            arguments=self._get_make_arguments("install"), cwd=code_path, sudo=True
         )
 
-        make.make(arguments="install", cwd=code_path, sudo=True)
+        self._update_boot_loader(node)
 
+    def _update_boot_loader(self, node: Node) -> None:
         # The build for Redhat needs extra steps than RPM package. So put it
         # here, not in OS.
         if isinstance(node.os, Redhat):
@@ -227,8 +279,10 @@ class SourceInstaller(BaseInstaller):
             self._log.debug(f"modifying code by {modifier.type_name()}")
             modifier.modify()
 
-    def _build_code(self, node: Node, code_path: PurePath, kconfig_file: str) -> None:
-        self._log.info("building code...")
+    def _configure_code(
+        self, node: Node, code_path: PurePath, kconfig_file: str
+    ) -> None:
+        self._log.info("configuring code...")
 
         uname = node.tools[Uname]
         kernel_information = uname.get_linux_information()
@@ -299,16 +353,30 @@ class SourceInstaller(BaseInstaller):
         make = node.tools[Make]
         make.make(arguments="olddefconfig", cwd=code_path)
 
+    def _build_code(self, node: Node, code_path: PurePath) -> None:
+        self._log.info("building code...")
+        make = node.tools[Make]
         # set timeout to 2 hours
-        make.make(arguments="", cwd=code_path, timeout=60 * 60 * 2)
+        make.make(
+            arguments=self._get_make_arguments(""), cwd=code_path, timeout=60 * 60 * 2
+        )
+
+    def _get_make_arguments(self, arguments: str) -> str:
+        if not self._use_ccache:
+            return arguments
+        # The same compiler is used in all steps, otherwise kbuild may rebuild
+        # objects, because the command line is changed.
+        return f'CC="ccache gcc" {arguments}'.strip()
 
     def _install_build_tools(self, node: Node) -> None:
+        runbook: SourceInstallerSchema = self.runbook
         os = node.os
         self._log.info("installing build tools")
         if isinstance(os, Redhat):
-            for package in list(
-                ["elfutils-libelf-devel", "openssl-devel", "dwarves", "bc"]
-            ):
+            packages = ["elfutils-libelf-devel", "openssl-devel", "dwarves", "bc"]
+            if runbook.use_ccache:
+                packages.append("ccache")
+            for package in packages:
                 if os.is_package_in_repo(package):
                     os.install_packages(package)
             os.group_install_packages("Development Tools")
@@ -363,6 +431,11 @@ class SourceInstaller(BaseInstaller):
                 f"Implement its build dependencies installation there."
             )
 
+        self._use_ccache = runbook.use_ccache
+        if self._use_ccache and node.execute("command -v ccache", shell=True).exit_code:
+            self._log.info("ccache is not found, build without it.")
+            self._use_ccache = False
+
 
 class BaseLocation(subclasses.BaseClassWithRunbookMixin):
     def __init__(
@@ -407,21 +480,45 @@ class RepoLocation(BaseLocation):
         self._node.execute(f"mkdir -p {code_path}", sudo=True)
         self._node.execute(f"chmod -R 777 {code_path}", sudo=True)
 
-        self._log.info(f"cloning code from {runbook.repo} to {code_path}...")
         git = self._node.tools[Git]
+        reference: Optional[PurePath] = None
+        if runbook.mirror_path:
+            reference = git.mirror(
+                url=runbook.repo,
+                cwd=self._node.get_pure_path(runbook.mirror_path),
+                auth_token=runbook.auth_token,
+                timeout=1800,
+            )
+
+        self._log.info(f"cloning code from {runbook.repo} to {code_path}...")
         code_path = git.clone(
             url=runbook.repo,
             cwd=code_path,
             fail_on_exists=runbook.fail_on_code_exists,
             auth_token=runbook.auth_token,
             timeout=1800,
+            depth=runbook.depth,
+            filter_=runbook.clone_filter,
+            reference=reference,
         )
 
-        git.fetch(cwd=code_path)
+        ref = runbook.ref
+        if runbook.depth:
+            # fetch the ref only, instead of all branches and tags.
+            if ref:
+                git.fetch(
+                    cwd=code_path,
+                    ref=ref,
+                    depth=runbook.depth,
+                    auth_token=runbook.auth_token,
+                )
+                ref = "FETCH_HEAD"
+        else:
+            git.fetch(cwd=code_path, auth_token=runbook.auth_token)
 
-        if runbook.ref:
+        if ref:
             self._log.info(f"checkout code from: '{runbook.ref}'")
-            git.checkout(ref=runbook.ref, cwd=code_path)
+            git.checkout(ref=ref, cwd=code_path)
 
         latest_commit_id = git.get_latest_commit_id(cwd=code_path)
         self._log.info(f"Kernel HEAD is now at : {latest_commit_id}")
@@ -477,7 +574,9 @@ class PatchModifier(BaseModifier):
         code_path = _get_code_path(runbook.path, self._node, "patch")
 
         git = self._node.tools[Git]
-        code_path = git.clone(url=runbook.repo, cwd=code_path, ref=runbook.ref)
+        code_path = git.clone(
+            url=runbook.repo, cwd=code_path, ref=runbook.ref, depth=runbook.depth
+        )
         patches_path = code_path / runbook.file_pattern
         git.apply(cwd=self._code_path, patches=patches_path)
 
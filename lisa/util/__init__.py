@@ -1,10 +1,14 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import errno
+import os
 import random
 import re
 import string
 import sys
+import tempfile
+from contextlib import contextmanager
 from datetime import datetime
 from pathlib import Path
 from time import sleep
@@ -14,6 +18,7 @@ from typing import (
     Callable,
     Dict,
     Iterable,
+    Iterator,
     List,
     Optional,
     Pattern,
@@ -563,6 +568,67 @@ def dump_file(file_name: Path, content: Any) -> None:
         f.write(secret.mask(content))
 
 
+def write_file_atomically(file_name: Path, content: bytes) -> None:
+    """
+    Write to a temporary file in the same folder, and rename it to the target.
+    So readers in other threads or processes see the old or the new content,
+    not a partial file.
+    """
+    file_name.parent.mkdir(parents=True, exist_ok=True)
+    with tempfile.NamedTemporaryFile(
+        dir=file_name.parent, prefix=f".{file_name.name}.", delete=False
+    ) as f:
+        temp_file_name = Path(f.name)
+        try:
+            f.write(content)
+        except Exception:
+            f.close()
+            temp_file_name.unlink()
+            raise
+    try:
+        os.replace(temp_file_name, file_name)
+    except Exception:
+        temp_file_name.unlink()
+        raise
+
+
+@contextmanager
+def lock_file(file_name: Path) -> Iterator[None]:
+    """
+    An exclusive lock across processes. The lock file is created, if it
+    doesn't exist, and it's kept after unlocked.
+    """
+    file_name.parent.mkdir(parents=True, exist_ok=True)
+    with open(file_name, "a+b") as f:
+        if sys.platform == "win32":
+            import msvcrt
+
+            f.seek(0)
+            while True:
+                try:
+                    # it retries 10 seconds, and raises OSError with EDEADLOCK,
+                    # if it's still locked.
+                    msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+                    break
+                except OSError as identifier:
+                    if identifier.errno != errno.EDEADLOCK:
+                        raise
+                    sleep(1)
+            try:
+                yield
+            finally:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+        else:
+            import fcntl
+
+            fcntl.flock(f.fileno(), fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(f.fileno(), fcntl.LOCK_UN)
+
+
 def parse_version(version: str) -> VersionInfo:
     """
     Convert an incomplete version string into a semver-compatible Version
@@ -40,6 +40,9 @@ NORMALIZE_PATTERN = re.compile(r"[^A-Za-z0-9]")
 
 # default values
 DEFAULT_USER_NAME = "lisatest"
+DEFAULT_SSH_CHANNEL_POOL_SIZE = 2
+# in MB
+DEFAULT_PROCESS_OUTPUT_MEMORY_LIMIT = 64
 
 # feature names
 FEATURE_DISK = "Disk"
@@ -52,6 +55,9 @@ LIST_CASE = "case"
 NOTIFIER = "notifier"
 NOTIFIER_CONSOLE = "console"
 NOTIFIER_FILE = "file"
+NOTIFIER_OVERFLOW_BLOCK = "block"
+NOTIFIER_OVERFLOW_DROP_OLDEST = "drop_oldest"
+NOTIFIER_OVERFLOW_DROP_NEWEST = "drop_newest"
 
 # common
 NODES = "nodes"
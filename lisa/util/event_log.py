@@ -0,0 +1,313 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""
+Writes and reads events in JSON Lines format. The writer keeps the file open,
+and flushes buffered lines by size and time, so a high volume of events
+doesn't cost a file open and close per event. The file can be compressed by
+gzip or zstd.
+
+Events can be read, filtered and followed by
+
+    python -m lisa.util.event_log <path> [--type TestResult] [--tail 10] [-f]
+"""
+
+import argparse
+import gzip
+import io
+import json
+import threading
+from collections import deque
+from dataclasses import fields, is_dataclass
+from datetime import datetime
+from enum import Enum
+from pathlib import Path
+from time import sleep
+from typing import IO, Any, Callable, Deque, Dict, Iterator, List, Optional
+
+from lisa.util import LisaException
+
+try:
+    import zstandard  # type: ignore
+except ModuleNotFoundError:
+    zstandard = None
+
+COMPRESSION_GZIP = "gzip"
+COMPRESSION_ZSTD = "zstd"
+
+_SUFFIXES = {COMPRESSION_GZIP: ".gz", COMPRESSION_ZSTD: ".zst"}
+_READ_BLOCK_SIZE = 64 * 1024
+
+
+def to_json_line(event: Any, **extra: Any) -> str:
+    """
+    Serialize a dataclass or dict to a compact line. Values, which are not
+    supported by json, like datetime and enum, are converted to str.
+    """
+    content = dict(extra)
+    content.update(_to_dict(event))
+    return json.dumps(content, default=_default, separators=(",", ":")) + "\n"
+
+
+class EventLogWriter:
+    """
+    Appends lines to a file. Lines are buffered in memory, and written when the
+    buffered size is over flush_size, or when they are buffered longer than
+    flush_interval seconds. If it's compressed, the suffix of the compression
+    is appended to the path, if it's not there.
+    """
+
+    def __init__(
+        self,
+        path: Path,
+        compression: str = "",
+        flush_size: int = 64 * 1024,
+        flush_interval: float = 1,
+    ) -> None:
+        suffix = _SUFFIXES.get(compression, "")
+        if path.suffix != suffix:
+            path = path.with_name(path.name + suffix)
+        self.path = path
+        self._flush_size = flush_size
+        self._flush_interval = flush_interval
+        self._buffer: List[str] = []
+        self._buffered_size = 0
+        self._lock = threading.Lock()
+        self._closed = threading.Event()
+
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._file = _open(path, "ab", compression)
+        self._flush_thread = threading.Thread(
+            target=self._flush_periodically, name="event_log_flush", daemon=True
+        )
+        self._flush_thread.start()
+
+    def write(self, line: str) -> None:
+        with self._lock:
+            if self._closed.is_set():
+                raise LisaException(f"event log is closed: {self.path}")
+            self._buffer.append(line)
+            self._buffered_size += len(line)
+            if self._buffered_size >= self._flush_size:
+                self._flush()
+
+    def flush(self) -> None:
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            if self._closed.is_set():
+                return
+            self._closed.set()
+            self._flush()
+            self._file.close()
+        self._flush_thread.join()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        self._file.write("".join(self._buffer).encode("utf-8"))
+        # the compressed stream is flushed to a complete block, so readers can
+        # decompress it before the file is closed.
+        self._file.flush()
+        self._buffer = []
+        self._buffered_size = 0
+
+    def _flush_periodically(self) -> None:
+        while not self._closed.wait(self._flush_interval):
+            with self._lock:
+                if not self._closed.is_set():
+                    self._flush()
+
+
+def read_events(
+    path: Path,
+    types: Optional[List[str]] = None,
+    predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Read events of a file. The compression is detected by the file suffix.
+    types: the values of "type" field to be returned.
+    predicate: return True, if the event should be returned.
+    """
+    with _open(path, "rb") as file, io.TextIOWrapper(file, encoding="utf-8") as text:
+        for line in text:
+            event = _parse_line(line, types, predicate)
+            if event is not None:
+                yield event
+
+
+def tail_events(
+    path: Path,
+    count: int,
+    types: Optional[List[str]] = None,
+    predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Return the last count events. An uncompressed file is read backward, so
+    only the tail of it is read.
+    """
+    if _get_compression(path):
+        return list(deque(read_events(path, types, predicate), maxlen=count))
+
+    result: Deque[Dict[str, Any]] = deque()
+    with open(path, "rb") as file:
+        position = file.seek(0, io.SEEK_END)
+        remaining = b""
+        while position > 0 and len(result) < count:
+            size = min(_READ_BLOCK_SIZE, position)
+            position -= size
+            file.seek(position)
+            lines = (file.read(size) + remaining).split(b"\n")
+            # the first line may be incomplete, read it with the next block.
+            remaining = lines.pop(0) if position > 0 else b""
+            for line in reversed(lines):
+                event = _parse_line(line.decode("utf-8"), types, predicate)
+                if event is not None:
+                    result.appendleft(event)
+                    if len(result) == count:
+                        break
+    return list(result)
+
+
+def follow_events(
+    path: Path,
+    types: Optional[List[str]] = None,
+    predicate: Optional[Callable[[Dict[str, Any]], bool]] = None,
+    interval: float = 1,
+    stop: Optional[threading.Event] = None,
+) -> Iterator[Dict[str, Any]]:
+    """
+    Return new events, which are appended to an uncompressed file, until stop
+    is set.
+    """
+    if _get_compression(path):
+        raise LisaException(f"cannot follow a compressed file: {path}")
+
+    with open(path, "rb") as file:
+        file.seek(0, io.SEEK_END)
+        incomplete_line = b""
+        while not (stop and stop.is_set()):
+            content = file.read()
+            if not content:
+                sleep(interval)
+                continue
+            lines = (incomplete_line + content).split(b"\n")
+            incomplete_line = lines.pop()
+            for line in lines:
+                event = _parse_line(line.decode("utf-8"), types, predicate)
+                if event is not None:
+                    yield event
+
+
+def _parse_line(
+    line: str,
+    types: Optional[List[str]],
+    predicate: Optional[Callable[[Dict[str, Any]], bool]],
+) -> Optional[Dict[str, Any]]:
+    # check the type in text first, so most lines are not parsed, if they are
+    # filtered out.
+    if not line.strip() or (types and not any(f'"type":"{x}"' in line for x in types)):
+        return None
+    event: Dict[str, Any] = json.loads(line)
+    if types and event.get("type") not in types:
+        return None
+    if predicate and not predicate(event):
+        return None
+    return event
+
+
+def _open(path: Path, mode: str, compression: Optional[str] = None) -> IO[bytes]:
+    if compression is None:
+        compression = _get_compression(path)
+    if not compression:
+        return open(path, mode)
+    if compression == COMPRESSION_GZIP:
+        return gzip.open(path, mode)  # type: ignore
+    if compression == COMPRESSION_ZSTD:
+        if zstandard is None:
+            raise LisaException(
+                "zstandard package is not installed, install it by "
+                "'pip install lisa[zstd]'."
+            )
+        file = open(path, mode)
+        if "r" in mode:
+            return zstandard.ZstdDecompressor().stream_reader(  # type: ignore
+                file, read_across_frames=True, closefd=True
+            )
+        return _ZstdWriter(file)  # type: ignore
+    raise LisaException(f"unknown compression: {compression}")
+
+
+def _get_compression(path: Path) -> str:
+    for compression, suffix in _SUFFIXES.items():
+        if path.suffix == suffix:
+            return compression
+    return ""
+
+
+class _ZstdWriter:
+    # flush() of the zstd stream writer doesn't end a block by default.
+    def __init__(self, file: IO[bytes]) -> None:
+        self._writer = zstandard.ZstdCompressor().stream_writer(file, closefd=True)
+
+    def write(self, data: bytes) -> int:
+        return int(self._writer.write(data))
+
+    def flush(self) -> None:
+        self._writer.flush(zstandard.FLUSH_BLOCK)
+
+    def close(self) -> None:
+        self._writer.flush(zstandard.FLUSH_FRAME)
+        self._writer.close()
+
+
+def _to_dict(value: Any) -> Dict[str, Any]:
+    if isinstance(value, dict):
+        return value
+    if is_dataclass(value):
+        # it doesn't copy values like dataclasses.asdict, so it's faster, and
+        # it works with values, which cannot be copied.
+        return {x.name: getattr(value, x.name) for x in fields(value)}
+    return dict(vars(value))
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        return value.isoformat()
+    if isinstance(value, Enum):
+        return value.name
+    if is_dataclass(value) and not isinstance(value, type):
+        return _to_dict(value)
+    if isinstance(value, (set, tuple)):
+        return list(value)
+    return str(value)
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="Read events of a JSON Lines file.")
+    parser.add_argument("path", type=Path)
+    parser.add_argument(
+        "--type", dest="types", action="append", help="the type of events to read."
+    )
+    parser.add_argument("--tail", type=int, default=0, help="read the last events.")
+    parser.add_argument(
+        "-f", "--follow", action="store_true", help="wait for new events."
+    )
+    args = parser.parse_args()
+
+    events: Iterator[Dict[str, Any]] = iter([])
+    if args.tail:
+        events = iter(tail_events(args.path, args.tail, args.types))
+    elif not args.follow:
+        events = read_events(args.path, args.types)
+    for event in events:
+        print(json.dumps(event))
+    if args.follow:
+        for event in follow_events(args.path, args.types):
+            print(json.dumps(event), flush=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -102,17 +102,25 @@ class LogWriter(object):
     def __init__(self, logger: Logger, level: int):
         self._level = level
         self._log = logger
-        self._buffer: str = ""
+        # keep chunks in a list, and join them once when a line is completed.
+        # Concatenating on every write copies the whole buffer again.
+        self._chunks: List[str] = []
 
     def write(self, message: str) -> None:
-        self._buffer = "".join([self._buffer, message])
         if "\n" in message:
-            self.flush()
+            # log completed lines only, the partial line waits for the rest.
+            index = message.rindex("\n") + 1
+            completed, remaining = message[:index], message[index:]
+            self._chunks.append(completed)
+            self._log.lines(self._level, "".join(self._chunks))
+            self._chunks = [remaining] if remaining else []
+        elif message:
+            self._chunks.append(message)
 
     def flush(self) -> None:
-        if len(self._buffer) > 0:
-            self._log.lines(self._level, self._buffer)
-            self._buffer = ""
+        if self._chunks:
+            self._log.lines(self._level, "".join(self._chunks))
+            self._chunks = []
 
     def close(self) -> None:
         self.flush()
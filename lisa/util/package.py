@@ -20,12 +20,12 @@ import importlib
 import importlib.util
 import sys
 from pathlib import Path
-from typing import Iterable, Optional
+from typing import Iterable, List, Optional, Tuple
 
 from lisa.util.logger import Logger, get_logger
 
 
-def _import_module(
+def import_module_file(
     file: Path,
     root_package_name: Optional[str],
     package_dir: Path,
@@ -57,7 +57,7 @@ def _import_module(
         importlib.import_module(name=module_name, package=root_package_name)
 
 
-def _import_root_package(package_name: str, path: Path) -> None:
+def import_root_package(package_name: str, path: Path) -> None:
     # the module can be imported with __init__.py only, but it doesn't need to exist
     init_file = path / "__init__.py"
     spec = importlib.util.spec_from_file_location(
@@ -84,31 +84,41 @@ def import_package(path: Path, package_name: str, enable_log: bool = True) -> No
     else:
         log = None
 
-    package_files: Iterable[Path]
+    package_dir, package_files = get_package_files(path)
+
+    # import the package
+    import_root_package(package_name=package_name, path=package_dir)
+
+    # import all the modules in the package
+    for file in package_files:
+        import_module_file(
+            file=file,
+            root_package_name=package_name,
+            package_dir=package_dir,
+            log=log,
+        )
+
+
+def get_package_files(path: Path) -> Tuple[Path, List[Path]]:
+    """
+    Returns the package folder, and module files to import in the package.
+    """
     if path.is_file():
         # Import a single module within a package.
         package_dir = path.parent
-        package_files = [path]
+        files: Iterable[Path] = [path]
     else:
         # Import the entire package.
         package_dir = path
-        package_files = path.glob("**/*.py")
-
-    # import the package
-    _import_root_package(package_name=package_name, path=package_dir)
+        files = path.glob("**/*.py")
 
-    # import all the modules in the package
-    for file in package_files:
+    package_files: List[Path] = []
+    for file in files:
         file_name = file.stem
         # skip test files and __init__.py
         if ("tests" == file.parent.stem and file_name.startswith("test_")) or (
             file.stem == "__init__"
         ):
             continue
-
-        _import_module(
-            file=file,
-            root_package_name=package_name,
-            package_dir=package_dir,
-            log=log,
-        )
+        package_files.append(file)
+    return package_dir, package_files
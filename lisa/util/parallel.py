@@ -164,18 +164,25 @@ def run_in_parallel_async(
     tasks: List[Callable[[], T_RESULT]],
     callback: Callable[[T_RESULT], None],
     log: Optional[Logger] = None,
+    max_workers: int = 0,
 ) -> TaskManager[T_RESULT]:
     """
-    For concurrent complex tasks, returns the task manager after submitting
+    For concurrent complex tasks, returns the task manager after submitting.
+    max_workers limits the count of running tasks, 0 means all tasks run at the
+    same time.
     """
-    task_manager = TaskManager(max_workers=len(tasks), callback=callback)
+    if max_workers <= 0:
+        max_workers = len(tasks)
+    task_manager = TaskManager(max_workers=max_workers, callback=callback)
     for index, task in enumerate(tasks):
         task_manager.submit_task(Task(task_id=index, task=task, parent_logger=log))
     return task_manager
 
 
 def run_in_parallel(
-    tasks: List[Callable[[], T_RESULT]], log: Optional[Logger] = None
+    tasks: List[Callable[[], T_RESULT]],
+    log: Optional[Logger] = None,
+    max_workers: int = 0,
 ) -> List[T_RESULT]:
     """
     The simple version of concurrency task. It wait all task complete
@@ -189,6 +196,8 @@ def run_in_parallel(
         """
         results.append(result)
 
-    task_manager = run_in_parallel_async(tasks, simple_collect_result, log)
+    task_manager = run_in_parallel_async(
+        tasks, simple_collect_result, log, max_workers=max_workers
+    )
     task_manager.wait_for_all_workers()
     return results
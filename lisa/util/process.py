@@ -1,24 +1,30 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import codecs
 import io
 import logging
 import pathlib
 import re
 import shlex
 import signal
+import socket
 import subprocess
+import tempfile
+import threading
 import time
-from dataclasses import dataclass
+from functools import partial
 from pathlib import Path
-from typing import Dict, List, Optional, Union
+from typing import IO, Callable, Dict, List, Optional, Set, Union, cast
 
 import spur  # type: ignore
 from assertpy.assertpy import AssertionBuilder, assert_that, fail
+from paramiko.channel import ChannelFile, ChannelStderrFile
 from spur.errors import NoSuchCommandError  # type: ignore
 
+from lisa import development
 from lisa.util import LisaException, RequireUserPasswordException, filter_ansi_escape
-from lisa.util.logger import Logger, LogWriter, add_handler, get_logger
+from lisa.util.logger import Logger, LogWriter, get_logger
 from lisa.util.perf_timer import create_timer
 from lisa.util.shell import Shell, SshShell
 
@@ -30,18 +36,66 @@ TIMEOUT_READING_PASSWORD_PATTERNS = [
 ]
 
 
-@dataclass
 class ExecutableResult:
-    stdout: str
-    stderr: str
-    exit_code: Optional[int]
-    cmd: Union[str, List[str]]
-    elapsed: float
-    is_timeout: bool = False
+    """
+    The stdout can be a function, which loads the output when it's used first
+    time. So the output of commands, which is not used, isn't copied and
+    filtered. The result may be shared by threads, so it's loaded in a lock,
+    and release_stdout is called, after the loaded stdout is saved.
+    """
+
+    def __init__(
+        self,
+        stdout: Union[str, Callable[[], str]],
+        stderr: str,
+        exit_code: Optional[int],
+        cmd: Union[str, List[str]],
+        elapsed: float,
+        is_timeout: bool = False,
+        release_stdout: Optional[Callable[[], None]] = None,
+    ) -> None:
+        self._stdout: Optional[str] = None
+        self._load_stdout: Optional[Callable[[], str]] = None
+        self._release_stdout = release_stdout
+        self._stdout_lock = threading.Lock()
+        if isinstance(stdout, str):
+            self._stdout = stdout
+        else:
+            self._load_stdout = stdout
+        self.stderr = stderr
+        self.exit_code = exit_code
+        self.cmd = cmd
+        self.elapsed = elapsed
+        self.is_timeout = is_timeout
+
+    @property
+    def stdout(self) -> str:
+        if self._stdout is None:
+            with self._stdout_lock:
+                if self._stdout is None:
+                    assert self._load_stdout
+                    self._stdout = self._load_stdout()
+                    self._load_stdout = None
+                    self._release()
+        return self._stdout
+
+    @stdout.setter
+    def stdout(self, value: str) -> None:
+        with self._stdout_lock:
+            self._stdout = value
+            self._load_stdout = None
+            self._release()
 
     def __str__(self) -> str:
         return self.stdout
 
+    def __repr__(self) -> str:
+        return (
+            f"ExecutableResult(stdout={self.stdout!r}, stderr={self.stderr!r}, "
+            f"exit_code={self.exit_code!r}, cmd={self.cmd!r}, "
+            f"elapsed={self.elapsed!r}, is_timeout={self.is_timeout!r})"
+        )
+
     def assert_exit_code(
         self,
         expected_exit_code: Union[int, List[int]] = 0,
@@ -71,6 +125,252 @@ class ExecutableResult:
             f.write(self.stdout)
         return self
 
+    def _release(self) -> None:
+        if self._release_stdout:
+            self._release_stdout()
+            self._release_stdout = None
+
+
+class _OutputWatcher:
+    """
+    Receives output chunks as they arrive, and wakes up the threads which wait
+    for keywords. Each chunk is matched once with a short tail of the previous
+    output, so the whole output doesn't need to be scanned again on every
+    check.
+    """
+
+    # keep recent output, so the keywords are found, even if they are printed
+    # in a partial line before waiting.
+    _recent_size = 4096
+
+    def __init__(self) -> None:
+        self._condition = threading.Condition()
+        self._recent: str = ""
+        # keyword -> tail of previous output, which may be the first part of
+        # the keyword.
+        self._pending: Dict[str, str] = {}
+        self._found: Set[str] = set()
+        self._is_closed = False
+
+    def feed(self, chunk: str) -> None:
+        with self._condition:
+            self._recent = (self._recent + chunk)[-self._recent_size :]
+            matched = False
+            for keyword, tail in self._pending.items():
+                if keyword in self._found:
+                    continue
+                content = tail + chunk
+                if keyword in content:
+                    self._found.add(keyword)
+                    matched = True
+                else:
+                    self._pending[keyword] = _get_tail(content, len(keyword) - 1)
+            if matched:
+                self._condition.notify_all()
+
+    def close(self) -> None:
+        with self._condition:
+            self._is_closed = True
+            self._condition.notify_all()
+
+    def wait(
+        self, keyword: str, contains_existing: Callable[[str], bool], timeout: float
+    ) -> bool:
+        with self._condition:
+            if keyword in self._recent or contains_existing(keyword):
+                return True
+            self._pending[keyword] = _get_tail(self._recent, len(keyword) - 1)
+            try:
+                self._condition.wait_for(
+                    lambda: keyword in self._found or self._is_closed,
+                    timeout=timeout,
+                )
+                return keyword in self._found
+            finally:
+                self._pending.pop(keyword, None)
+                self._found.discard(keyword)
+
+
+class OutputCapture:
+    """
+    Captures the output of a process. Chunks are kept in a list, and joined
+    once when the output is read. If the output is larger than the memory
+    limit, it's spilled to a temporary file, so a command with huge output
+    doesn't exhaust the memory.
+    """
+
+    # spur may write one character a time, so join small chunks regularly, or
+    # the list takes more memory than the content.
+    _compact_count = 4096
+    _block_size = 1024 * 1024
+
+    def __init__(self, memory_limit: int) -> None:
+        self._memory_limit = memory_limit
+        self._chunks: List[str] = []
+        self._pending: List[str] = []
+        self._memory_size = 0
+        self._size = 0
+        self._file: Optional[IO[bytes]] = None
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return self._size
+
+    @property
+    def is_spilled(self) -> bool:
+        return self._file is not None
+
+    def write(self, chunk: str) -> None:
+        with self._lock:
+            self._pending.append(chunk)
+            self._size += len(chunk)
+            self._memory_size += len(chunk)
+            if len(self._pending) >= self._compact_count:
+                self._compact()
+            if self._memory_size > self._memory_limit:
+                self._spill()
+
+    def getvalue(self) -> str:
+        with self._lock:
+            self._compact()
+            if self._file is None:
+                return "".join(self._chunks)
+            self._file.seek(0)
+            return "".join(
+                [self._file.read().decode("utf-8", errors="replace"), *self._chunks]
+            )
+
+    def get_tail(self, size: int) -> str:
+        with self._lock:
+            self._compact()
+            result: List[str] = []
+            length = 0
+            for chunk in reversed(self._chunks):
+                if length >= size:
+                    break
+                result.append(chunk)
+                length += len(chunk)
+            if length < size and self._file is not None:
+                # a character takes 4 bytes at most in utf-8. The first
+                # character may be cut, but it's dropped by the size.
+                file_size = self._file.seek(0, io.SEEK_END)
+                self._file.seek(max(file_size - (size - length) * 4, 0))
+                result.append(self._file.read().decode("utf-8", errors="replace"))
+            return _get_tail("".join(reversed(result)), size)
+
+    def contains(self, keyword: str) -> bool:
+        with self._lock:
+            self._compact()
+            encoded_keyword = keyword.encode("utf-8")
+            tail = b""
+            if self._file is not None:
+                self._file.seek(0)
+                while True:
+                    block = self._file.read(self._block_size)
+                    if not block:
+                        break
+                    content = tail + block
+                    if encoded_keyword in content:
+                        return True
+                    tail = content[-len(encoded_keyword) + 1 :]
+            content = tail + "".join(self._chunks).encode("utf-8")
+            return encoded_keyword in content
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                # the temporary file is deleted on closing.
+                self._file.close()
+                self._file = None
+            self._chunks = []
+            self._pending = []
+            self._memory_size = 0
+
+    def _compact(self) -> None:
+        if self._pending:
+            self._chunks.append("".join(self._pending))
+            self._pending = []
+
+    def _spill(self) -> None:
+        self._compact()
+        if self._file is None:
+            self._file = tempfile.TemporaryFile(prefix="lisa_output_")
+        self._file.seek(0, io.SEEK_END)
+        for chunk in self._chunks:
+            self._file.write(chunk.encode("utf-8"))
+        self._chunks = []
+        self._memory_size = 0
+
+
+class _WatchedLogWriter(LogWriter):
+    def __init__(
+        self,
+        logger: Logger,
+        level: int,
+        watcher: _OutputWatcher,
+        capture: OutputCapture,
+    ):
+        super().__init__(logger=logger, level=level)
+        self._watcher = watcher
+        self.capture = capture
+
+    def write(self, message: str) -> None:
+        super().write(message)
+        self.capture.write(message)
+        self._watcher.feed(message)
+
+
+class _StreamingReader:
+    """
+    Reads the output of a remote process to _WatchedLogWriter. spur reads one
+    character a time, and keeps another copy of the whole output, but the
+    output is captured by the writer already. So this reader reads available
+    bytes from the channel, and doesn't keep the output.
+    """
+
+    _read_size = 64 * 1024
+
+    def __init__(
+        self, file_in: ChannelFile, file_out: _WatchedLogWriter, encoding: str
+    ) -> None:
+        self._file_in = file_in
+        self._file_out = file_out
+        self._decoder = codecs.getincrementaldecoder(encoding)(errors="replace")
+        # the channel returns available bytes, but the file object of paramiko
+        # blocks until all requested bytes are received.
+        if isinstance(file_in, ChannelStderrFile):
+            self._read = partial(file_in.channel.recv_stderr, self._read_size)
+        else:
+            self._read = partial(file_in.channel.recv, self._read_size)
+
+        self._thread = threading.Thread(target=self._capture_output)
+        self._thread.daemon = True
+        self._thread.start()
+
+    def wait(self) -> None:
+        self._thread.join()
+
+    def _capture_output(self) -> None:
+        # spur reads the initialization lines, like the pid, by readline, so
+        # the file may buffer the beginning of the output.
+        data: bytes = self._file_in._rbuffer  # type: ignore
+        self._file_in._rbuffer = bytes()  # type: ignore
+        while True:
+            text = self._decoder.decode(data)
+            if text:
+                self._file_out.write(text)
+            try:
+                data = self._read()
+            except socket.timeout:
+                # the channel may have the spawning timeout still.
+                data = bytes()
+                continue
+            if not data:
+                break
+        text = self._decoder.decode(b"", final=True)
+        if text:
+            self._file_out.write(text)
+
 
 # TODO: So much cleanup here. It was using duck typing.
 class Process:
@@ -90,12 +390,13 @@ class Process:
         self._result: Optional[ExecutableResult] = None
         self._sudo: bool = False
         self._nohup: bool = False
-
-        # add a string stream handler to the logger
-        self._log_buffer = io.StringIO()
-        self._log_handler = logging.StreamHandler(self._log_buffer)
-        msg_only_format = logging.Formatter(fmt="%(message)s", datefmt="")
-        add_handler(self._log_handler, self._log, msg_only_format)
+        # it's set when the process exits, so waiters don't need to poll.
+        self._exit_event: Optional[threading.Event] = None
+        self._output_watcher = _OutputWatcher()
+        self._output_readers: List[_StreamingReader] = []
+        # the stdout tail is kept for checking sudo password, after the output
+        # is released.
+        self._stdout_tail: str = ""
 
     def start(
         self,
@@ -125,8 +426,19 @@ class Process:
 
         self.stdout_logger = get_logger("stdout", parent=self._log)
         self.stderr_logger = get_logger("stderr", parent=self._log)
-        self._stdout_writer = LogWriter(logger=self.stdout_logger, level=stdout_level)
-        self._stderr_writer = LogWriter(logger=self.stderr_logger, level=stderr_level)
+        memory_limit = development.get_process_output_memory_limit()
+        self._stdout_writer = _WatchedLogWriter(
+            logger=self.stdout_logger,
+            level=stdout_level,
+            watcher=self._output_watcher,
+            capture=OutputCapture(memory_limit=memory_limit),
+        )
+        self._stderr_writer = _WatchedLogWriter(
+            logger=self.stderr_logger,
+            level=stderr_level,
+            watcher=self._output_watcher,
+            capture=OutputCapture(memory_limit=memory_limit),
+        )
 
         self._sudo = sudo
         self._nohup = nohup
@@ -161,10 +473,13 @@ class Process:
 
         try:
             self._timer = create_timer()
+            # the output of a remote process is read by _StreamingReader, so
+            # spur doesn't read it until the result is generated.
+            is_streamed = isinstance(self._shell, SshShell)
             self._process = self._shell.spawn(
                 command=split_command,
-                stdout=self._stdout_writer,
-                stderr=self._stderr_writer,
+                stdout=None if is_streamed else self._stdout_writer,
+                stderr=None if is_streamed else self._stderr_writer,
                 cwd=cwd_path,
                 update_env=update_envs,
                 allow_error=True,
@@ -172,9 +487,19 @@ class Process:
                 encoding="utf-8",
                 use_pty=self._is_posix,
             )
+            if is_streamed:
+                self._output_readers = [
+                    _StreamingReader(
+                        self._process._stdout, self._stdout_writer, "utf-8"
+                    ),
+                    _StreamingReader(
+                        self._process._stderr, self._stderr_writer, "utf-8"
+                    ),
+                ]
             # save for logging.
             self._cmd = split_command
             self._running = True
+            self._exit_event = self._create_exit_event()
         except (FileNotFoundError, NoSuchCommandError) as identifier:
             # FileNotFoundError: not found command on Windows
             # NoSuchCommandError: not found command on remote Posix
@@ -246,15 +571,15 @@ class Process:
     ) -> ExecutableResult:
         timer = create_timer()
         is_timeout = False
-        has_checked_password = False
 
-        while self.is_running() and timeout >= timer.elapsed(False):
-            time.sleep(0.01)
-            if timer.elapsed(False) > 0.5 and not has_checked_password:
-                self.check_and_input_password()
-                has_checked_password = True
+        # Block on the exit notification instead of polling. If the process
+        # is still running after 0.5 second, it may wait for sudo password.
+        is_exited = self._wait_exit(min(timeout, 0.5))
+        if not is_exited:
+            self.check_and_input_password()
+            is_exited = self._wait_exit(max(timeout - timer.elapsed(False), 0))
 
-        if timeout < timer.elapsed():
+        if not is_exited:
             if self._process is not None:
                 self._log.info(f"timeout in {timeout} sec, and killed")
             self.kill()
@@ -263,37 +588,58 @@ class Process:
         if self._result is None:
             assert self._process
             if is_timeout:
-                # LogWriter only flushes if "\n" is written, so we need to flush
-                # manually.
-                self._stdout_writer.flush()
-                process_result = spur.results.result(
-                    return_code=1,
-                    allow_error=True,
-                    output=self._log_buffer.getvalue(),
-                    stderr_output="",
-                )
+                return_code: Optional[int] = 1
             else:
-                process_result = self._process.wait_for_result()
+                # the output is captured by the writers, so only the return
+                # code is used. The readers must be done first, or spur may
+                # read the rest of the output also.
+                for reader in self._output_readers:
+                    reader.wait()
+                return_code = self._process.wait_for_result().return_code
+
+            # LogWriter only flushes if "\n" is written, so the last partial
+            # line is flushed on closing.
+            self._stdout_writer.close()
+            self._stderr_writer.close()
+            # no more output, wake up the keyword waiters.
+            self._output_watcher.close()
+
+            stdout_capture = self._stdout_writer.capture
+            stderr_capture = self._stderr_writer.capture
+            self._stdout_tail = stdout_capture.get_tail(_password_check_size)
+            stderr = stderr_capture.getvalue()
+            stderr_capture.close()
             if not self._is_posix and self._shell.is_remote:
                 # special handle remote windows. There are extra control chars
                 # and on extra line at the end.
 
                 # remove extra controls in remote Windows
-                process_result.output = filter_ansi_escape(process_result.output)
-                process_result.stderr_output = filter_ansi_escape(
-                    process_result.stderr_output
-                )
-
-            self._stdout_writer.close()
-            self._stderr_writer.close()
-            # cache for future queries, in case it's queried twice.
+                stderr = filter_ansi_escape(stderr)
+            # cache for future queries, in case it's queried twice. The stdout
+            # is loaded and filtered when it's used, but how to filter is
+            # decided now, because the shell may be closed at that time.
+            profile_error = ""
+            if (
+                isinstance(self._shell, SshShell)
+                and self._shell._inner_shell
+                and self._shell._inner_shell._spur._shell_type
+                == spur.ssh.ShellTypes.minimal
+            ):
+                profile_error = self._shell.spawn_initialization_error_string
             self._result = ExecutableResult(
-                process_result.output.strip(),
-                process_result.stderr_output.strip(),
-                process_result.return_code,
+                partial(
+                    self._load_stdout,
+                    capture=stdout_capture,
+                    filter_ansi=not self._is_posix and self._shell.is_remote,
+                    filter_sudo=self._is_posix and self._sudo,
+                    profile_error=profile_error,
+                ),
+                stderr.strip(),
+                return_code,
                 self._cmd,
                 self._timer.elapsed(),
                 is_timeout,
+                release_stdout=stdout_capture.close,
             )
 
             self._recycle_resource()
@@ -307,21 +653,7 @@ class Process:
                 message=expected_exit_code_failure_message,
             )
 
-        if self._is_posix and self._sudo:
-            self._result.stdout = self._filter_sudo_result(self._result.stdout)
-
-        if (
-            isinstance(self._shell, SshShell)
-            and self._shell._inner_shell
-            and self._shell._inner_shell._spur._shell_type
-            == spur.ssh.ShellTypes.minimal
-        ):
-            self._result.stdout = self._filter_profile_error(self._result.stdout)
-        self._check_if_need_input_password(self._result.stdout)
-
-        self._result.stdout = self._filter_sudo_required_password_info(
-            self._result.stdout
-        )
+        self._check_if_need_input_password(self._stdout_tail)
 
         return self._result
 
@@ -351,19 +683,15 @@ class Process:
         error_on_missing: bool = True,
         interval: int = 1,
     ) -> None:
-        # check if stdout buffers contain the string "keyword" to determine if
-        # it is running
-        start_time = time.time()
-        while time.time() - start_time < timeout:
-            # LogWriter only flushes if "\n" is written, so we need to flush
-            # manually.
-            self._stdout_writer.flush()
-
-            # check if buffer contains the keyword
-            if keyword in self._log_buffer.getvalue():
-                return
-
-            time.sleep(interval)
+        # check if stdout contains the string "keyword" to determine if it is
+        # running. The output is matched incrementally when it arrives, the
+        # interval is kept for compatibility only.
+        if self._output_watcher.wait(
+            keyword=keyword,
+            contains_existing=self._contains_output,
+            timeout=timeout,
+        ):
+            return
 
         if error_on_missing:
             raise LisaException(
@@ -374,6 +702,68 @@ class Process:
                 f"not found '{keyword}' in {timeout} seconds, but ignore it."
             )
 
+    def _contains_output(self, keyword: str) -> bool:
+        return self._stdout_writer.capture.contains(
+            keyword
+        ) or self._stderr_writer.capture.contains(keyword)
+
+    def _load_stdout(
+        self,
+        capture: OutputCapture,
+        filter_ansi: bool,
+        filter_sudo: bool,
+        profile_error: str,
+    ) -> str:
+        stdout = capture.getvalue()
+        if filter_ansi:
+            stdout = filter_ansi_escape(stdout)
+        stdout = stdout.strip()
+
+        if filter_sudo:
+            stdout = self._filter_sudo_result(stdout)
+
+        if profile_error:
+            stdout = self._filter_profile_error(stdout, profile_error)
+
+        return self._filter_sudo_required_password_info(stdout)
+
+    def _create_exit_event(self) -> Optional[threading.Event]:
+        if isinstance(self._process, spur.ssh.SshProcess):
+            # paramiko sets this event, when the exit status is received or
+            # the channel is closed.
+            return cast(threading.Event, self._process._channel.status_event)
+        elif isinstance(self._process, spur.local.LocalProcess):
+            exit_event = threading.Event()
+            popen: subprocess.Popen[str] = self._process._subprocess
+
+            def _watch_child() -> None:
+                try:
+                    popen.wait()
+                finally:
+                    exit_event.set()
+
+            watcher = threading.Thread(
+                target=_watch_child, name=f"process_watcher[{self._id_}]"
+            )
+            watcher.daemon = True
+            watcher.start()
+            return exit_event
+
+        # unknown process type, fall back to polling.
+        return None
+
+    def _wait_exit(self, timeout: float) -> bool:
+        """
+        Wait until the process exits or timeout. Return True, if it exits.
+        """
+        if self._exit_event is not None and self.is_running():
+            self._exit_event.wait(timeout)
+        elif self._exit_event is None:
+            timer = create_timer()
+            while self.is_running() and timeout >= timer.elapsed(False):
+                time.sleep(0.01)
+        return not self.is_running()
+
     def _recycle_resource(self) -> None:
         # TODO: The spur library is not very good and leaves open
         # resources (probably due to it starting the process with
@@ -407,7 +797,7 @@ class Process:
             self._log.debug(f'found error message in sudo: "{lines[0]}"')
         return raw_input
 
-    def _filter_profile_error(self, raw_input: str) -> str:
+    def _filter_profile_error(self, raw_input: str, error_string: str) -> str:
         # If there is CommandInitializationError when calling spawn, the stdout has that
         # error line before the output of every command. E.g. the stdout of command
         # "uname -vrmo" is like: '/etc/profile.d/clover.sh: line 10: /opt/clover/bin/
@@ -417,19 +807,8 @@ class Process:
         # '/etc/profile.d/vglrun.sh: line 3: lspci: command not found\r\nDescription:\t
         # CentOS Linux release 7.9.2009 (Core)'
         # So remove the error line
-        if (
-            isinstance(self._shell, SshShell)
-            and self._shell.spawn_initialization_error_string
-        ):
-            raw_input = re.sub(
-                re.compile(rf"{self._shell.spawn_initialization_error_string}\r\n"),
-                "",
-                raw_input,
-            )
-            self._log.debug(
-                "filter the profile error string: "
-                f"{self._shell.spawn_initialization_error_string}"
-            )
+        raw_input = re.sub(re.compile(rf"{error_string}\r\n"), "", raw_input)
+        self._log.debug(f"filter the profile error string: {error_string}")
         return raw_input
 
     def _check_if_need_input_password(self, raw_input: str) -> None:
@@ -467,6 +846,17 @@ class Process:
         return raw_input
 
 
+# the sudo password prompt is printed before the command runs, so the output is
+# short, if the password is not input.
+_password_check_size = 4096
+
+
+def _get_tail(content: str, size: int) -> str:
+    if size <= 0:
+        return ""
+    return content[-size:]
+
+
 def _create_exports(update_envs: Dict[str, str]) -> str:
     result: str = ""
 
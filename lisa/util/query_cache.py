@@ -0,0 +1,98 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+import functools
+import inspect
+from threading import Lock
+from time import monotonic
+from typing import Any, Callable, Dict, Tuple, TypeVar, cast
+
+T = TypeVar("T", bound=Callable[..., Any])
+
+
+class QueryCache:
+    """
+    Caches results of read-only queries on a node, like cpu count, disks or
+    kernel version. Each result expires after its TTL, and all results are
+    dropped, when the node state may be changed, like reboot, kernel
+    installation or the node is marked as dirty.
+    """
+
+    def __init__(self) -> None:
+        # key -> (expire time, value)
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = Lock()
+        self._hit_count = 0
+        self._miss_count = 0
+        self._invalidated_count = 0
+
+    def get(self, key: str) -> Tuple[bool, Any]:
+        """
+        Returns if a not expired value is found, and the value.
+        """
+        with self._lock:
+            entry = self._entries.get(key, None)
+            if entry and entry[0] > monotonic():
+                self._hit_count += 1
+                return True, entry[1]
+            self._miss_count += 1
+            return False, None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        with self._lock:
+            self._entries[key] = (monotonic() + ttl, value)
+
+    def invalidate(self) -> None:
+        with self._lock:
+            if self._entries:
+                self._entries = {}
+                self._invalidated_count += 1
+
+    def get_statistics(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "hit": self._hit_count,
+                "miss": self._miss_count,
+                "invalidated": self._invalidated_count,
+            }
+
+
+def cached_query(ttl: float) -> Callable[[T], T]:
+    """
+    Caches the result of a read-only method in the query cache of the node, so
+    the query is shared by all callers on the node in the TTL seconds. The
+    method must be of an object with the node attribute, like tools. If the
+    method has the force_run argument, force_run=True skips the cache, and it's
+    passed to the method on cache missed, so the query runs again.
+
+    for example,
+    @cached_query(ttl=600)
+    def get_num_procs(self, force_run: bool = False) -> int:
+    """
+
+    def decorator(func: T) -> T:
+        signature = inspect.signature(func)
+        has_force_run = "force_run" in signature.parameters
+
+        @functools.wraps(func)
+        def wrapper(self: Any, *args: Any, **kwargs: Any) -> Any:
+            bound = signature.bind(self, *args, **kwargs)
+            bound.apply_defaults()
+            arguments = dict(bound.arguments)
+            arguments.pop("self")
+            force_run = arguments.pop("force_run", False)
+            key = f"{type(self).__name__}.{func.__name__}|{sorted(arguments.items())}"
+
+            cache: QueryCache = self.node.query_cache
+            if not force_run:
+                found, value = cache.get(key)
+                if found:
+                    return value
+            if has_force_run:
+                arguments["force_run"] = True
+            value = func(self, **arguments)
+            cache.set(key, value, ttl)
+            return value
+
+        return cast(T, wrapper)
+
+    return decorator
@@ -7,16 +7,29 @@ import re
 import shutil
 import socket
 import sys
+import threading
 import time
+from collections import deque
 from functools import partial
 from pathlib import Path, PurePath
 from time import sleep
-from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union, cast
+from typing import (
+    Any,
+    Deque,
+    Dict,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Set,
+    Tuple,
+    Union,
+    cast,
+)
 
 import paramiko
 import spur  # type: ignore
 import spurplus  # type: ignore
-from func_timeout import FunctionTimedOut, func_set_timeout  # type: ignore
 from paramiko.ssh_exception import NoValidConnectionsError, SSHException
 
 from lisa import development, schema
@@ -123,6 +136,23 @@ def try_connect(
     ssh_timeout: int = 300,
     sock: Optional[Any] = None,
 ) -> Any:
+    paramiko_client, stdout = _connect_and_detect(
+        connection_info=connection_info, ssh_timeout=ssh_timeout, sock=sock
+    )
+    paramiko_client.close()
+
+    return stdout
+
+
+def _connect_and_detect(
+    connection_info: schema.ConnectionInfo,
+    ssh_timeout: int = 300,
+    sock: Optional[Any] = None,
+) -> Tuple[paramiko.SSHClient, Any]:
+    """
+    Connect to the node, and run a command to detect the OS. It returns the
+    connected client, so the caller can reuse the authenticated transport.
+    """
     # spur always run a posix command and will fail on Windows.
     # So try with paramiko firstly.
     paramiko_client = paramiko.SSHClient()
@@ -162,9 +192,8 @@ def try_connect(
                 tries -= 1
 
             stdin.channel.shutdown_write()
-            paramiko_client.close()
 
-            return stdout
+            return paramiko_client, stdout
         except SSHException as e:
             # socket is open, but SSH service not responded
             if (
@@ -183,13 +212,174 @@ def try_connect(
 
 
 # paramiko stuck on get command output of 'fortinet' VM, and spur hide timeout of
-# exec_command. So use an external timeout wrapper to force timeout.
+# exec_command. The channel timeout limits reading the initialization lines
+# only, because exec_command waits for the reply without timeout. So the
+# channel is closed, if spawning is not done in time.
 # some images needs longer time to set up ssh connection.
 # e.g. Oracle Oracle-Linux 7.5 7.5.20181207
 # e.g. qubole-inc qubole-data-service default-img 0.7.4
-@func_set_timeout(20)  # type: ignore
-def _spawn_ssh_process(shell: spur.ssh.SshShell, **kwargs: Any) -> spur.ssh.SshProcess:
-    return shell.spawn(**kwargs)
+_SPAWN_TIMEOUT = 20
+
+
+class SshChannelPool:
+    """
+    Keeps sessions pre-opened on the authenticated transport of a node, so
+    commands don't wait for the round trip of opening a channel. A session
+    runs one command only, so a background thread replaces the used ones.
+
+    It also closes sessions, which are not spawned in _SPAWN_TIMEOUT seconds,
+    by one background thread, instead of a timeout thread per command.
+    """
+
+    def __init__(self, transport: paramiko.Transport, size: int, name: str) -> None:
+        self._transport = transport
+        self._size = size
+        self._channels: Deque[paramiko.Channel] = deque()
+        self._condition = threading.Condition()
+        self._is_closed = False
+        # the deadline of channels, which are spawning.
+        self._deadlines: Dict[paramiko.Channel, float] = {}
+        self._expired_channels: Set[paramiko.Channel] = set()
+        # the spawning channel of the current thread.
+        self._spawning = threading.local()
+
+        # pre-opened channels are used.
+        self.hit_count = 0
+        # no pre-opened channel, so it's opened on demand.
+        self.miss_count = 0
+        self.opened_count = 0
+
+        if size > 0:
+            filler = threading.Thread(
+                target=self._fill, name=f"ssh_channel_pool[{name}]"
+            )
+            filler.daemon = True
+            filler.start()
+        watchdog = threading.Thread(
+            target=self._close_expired, name=f"ssh_spawn_watchdog[{name}]"
+        )
+        watchdog.daemon = True
+        watchdog.start()
+
+    @property
+    def size(self) -> int:
+        return self._size
+
+    def open_session(self) -> paramiko.Channel:
+        channel: Optional[paramiko.Channel] = None
+        with self._condition:
+            while self._channels and not channel:
+                candidate = self._channels.popleft()
+                # it may be closed by the server side.
+                if not candidate.closed:
+                    channel = candidate
+            if channel:
+                self.hit_count += 1
+            else:
+                self.miss_count += 1
+            # wake up the filler to replace the used one.
+            self._condition.notify_all()
+
+        if not channel:
+            channel = self._transport.open_session()
+            with self._condition:
+                self.opened_count += 1
+        channel.settimeout(_SPAWN_TIMEOUT)
+        with self._condition:
+            self._deadlines[channel] = time.monotonic() + _SPAWN_TIMEOUT
+            self._condition.notify_all()
+        self._spawning.channel = channel
+        return channel
+
+    def end_spawn(self) -> bool:
+        """
+        Stop the deadline of the channel, which is opened by the current thread.
+        Returns True, if the channel is closed, because the deadline passed.
+        """
+        channel: Optional[paramiko.Channel] = getattr(self._spawning, "channel", None)
+        self._spawning.channel = None
+        if channel is None:
+            return False
+        with self._condition:
+            self._deadlines.pop(channel, None)
+            if channel in self._expired_channels:
+                self._expired_channels.remove(channel)
+                return True
+        return False
+
+    def open_sftp_client(self) -> Optional[paramiko.SFTPClient]:
+        return self._transport.open_sftp_client()
+
+    def close(self) -> None:
+        with self._condition:
+            self._is_closed = True
+            for channel in self._channels:
+                channel.close()
+            self._channels.clear()
+            self._deadlines.clear()
+            self._condition.notify_all()
+
+    def _fill(self) -> None:
+        while True:
+            with self._condition:
+                self._condition.wait_for(
+                    lambda: self._is_closed or len(self._channels) < self._size
+                )
+                if self._is_closed:
+                    return
+            try:
+                channel = self._transport.open_session()
+            except Exception:
+                # the transport is broken, commands will open channels on
+                # demand and raise the real errors.
+                return
+            with self._condition:
+                if self._is_closed:
+                    channel.close()
+                    return
+                self._channels.append(channel)
+                self.opened_count += 1
+
+    def _close_expired(self) -> None:
+        while True:
+            with self._condition:
+                if self._is_closed:
+                    return
+                now = time.monotonic()
+                expired: List[paramiko.Channel] = []
+                for channel, deadline in list(self._deadlines.items()):
+                    if deadline > now:
+                        continue
+                    del self._deadlines[channel]
+                    # the event is not ready, when it's waiting for the reply
+                    # of a request, like exec_command. Otherwise, the command
+                    # is started, and it may run long.
+                    if not channel.event_ready and not channel.closed:
+                        expired.append(channel)
+                        self._expired_channels.add(channel)
+                if not expired:
+                    timeout = (
+                        min(self._deadlines.values()) - now if self._deadlines else None
+                    )
+                    self._condition.wait(timeout)
+                    continue
+            # closing the channel wakes up exec_command, which raises an
+            # exception of closed channel.
+            for channel in expired:
+                channel.close()
+
+
+class _SpurSshShell(spur.SshShell):  # type: ignore
+    """
+    The spur shell, which opens sessions from the channel pool.
+    """
+
+    channel_pool: Optional[SshChannelPool] = None
+
+    def _get_ssh_transport(self) -> Any:
+        if self.channel_pool:
+            return self.channel_pool
+        return super()._get_ssh_transport()
 
 
 class SshShell(InitializableMixin):
@@ -203,6 +393,13 @@ class SshShell(InitializableMixin):
         self.is_sudo_required_password: bool = False
         self.password_prompts: List[str] = []
         self.spawn_initialization_error_string = ""
+        self._channel_pool: Optional[SshChannelPool] = None
+        self.connection_count = 0
+        self._closed_pool_statistics: Dict[str, int] = {
+            "hit_count": 0,
+            "miss_count": 0,
+            "opened_count": 0,
+        }
 
         paramiko_logger = logging.getLogger("paramiko")
         paramiko_logger.setLevel(logging.WARN)
@@ -224,20 +421,23 @@ class SshShell(InitializableMixin):
         )
 
         try:
-            stdout = try_connect(self.connection_info, sock=sock)
+            paramiko_client, stdout = _connect_and_detect(
+                self.connection_info, sock=sock
+            )
         except Exception as identifier:
+            self._close_jump_boxes()
             raise LisaException(
                 f"failed to connect SSH "
                 f"[{self.connection_info.address}:{self.connection_info.port}], "
                 f"{identifier.__class__.__name__}: {identifier}"
             )
-
-        self._close_jump_boxes()
+        self.connection_count += 1
 
         # Some windows doesn't end the text stream, so read first line only.
         # it's  enough to detect os.
         stdout_content = stdout.readline()
         stdout.close()
+        stdout.channel.close()
 
         if stdout_content and "Windows" in stdout_content:
             self.is_posix = False
@@ -246,11 +446,6 @@ class SshShell(InitializableMixin):
             self.is_posix = True
             shell_type = spur.ssh.ShellTypes.sh
 
-        sock = self._establish_jump_boxes(
-            address=self.connection_info.address,
-            port=self.connection_info.port,
-        )
-
         spur_kwargs = {
             "hostname": self.connection_info.address,
             "port": self.connection_info.port,
@@ -265,13 +460,28 @@ class SshShell(InitializableMixin):
             "sock": sock,
         }
 
-        spur_ssh_shell = spur.SshShell(shell_type=shell_type, **spur_kwargs)
+        spur_ssh_shell = _SpurSshShell(shell_type=shell_type, **spur_kwargs)
+        # reuse the connection of OS detection, instead of connecting again.
+        spur_ssh_shell._client = paramiko_client
+        transport = paramiko_client.get_transport()
+        assert transport
+        self._channel_pool = SshChannelPool(
+            transport=transport,
+            size=development.get_ssh_channel_pool_size(),
+            name=str(self.connection_info),
+        )
+        spur_ssh_shell.channel_pool = self._channel_pool
+
         sftp = spurplus.sftp.ReconnectingSFTP(
             sftp_opener=spur_ssh_shell._open_sftp_client
         )
         self._inner_shell = spurplus.SshShell(spur_ssh_shell=spur_ssh_shell, sftp=sftp)
 
     def close(self) -> None:
+        if self._channel_pool:
+            self._save_channel_pool_statistics(self._channel_pool)
+            self._channel_pool.close()
+            self._channel_pool = None
         if self._inner_shell:
             self._inner_shell.close()
             # after closed, can be reconnect
@@ -287,6 +497,20 @@ class SshShell(InitializableMixin):
             is_inner_shell_ready = True
         return is_inner_shell_ready
 
+    def get_channel_pool_statistics(self) -> Dict[str, int]:
+        """
+        Returns how many SSH connections and channels are opened, and how many
+        commands reuse pre-opened channels. It includes closed connections.
+        """
+        statistics = self._closed_pool_statistics.copy()
+        if self._channel_pool:
+            statistics["hit_count"] += self._channel_pool.hit_count
+            statistics["miss_count"] += self._channel_pool.miss_count
+            statistics["opened_count"] += self._channel_pool.opened_count
+        statistics["pool_size"] = development.get_ssh_channel_pool_size()
+        statistics["connection_count"] = self.connection_count
+        return statistics
+
     def spawn(
         self,
         command: Sequence[str],
@@ -308,8 +532,7 @@ class SshShell(InitializableMixin):
                 if self._inner_shell._spur._shell_type == spur.ssh.ShellTypes.minimal:
                     # minimal shell type doesn't support store_pid
                     store_pid = False
-                process: spur.ssh.SshProcess = _spawn_ssh_process(
-                    self._inner_shell,
+                process: spur.ssh.SshProcess = self._inner_shell.spawn(
                     command=command,
                     update_env=update_env,
                     store_pid=store_pid,
@@ -320,13 +543,22 @@ class SshShell(InitializableMixin):
                     use_pty=use_pty,
                     allow_error=allow_error,
                 )
+                # the timeout is for initialization only, the command itself
+                # may run long.
+                process._channel.settimeout(None)
+                self._end_spawn()
                 break
-            except FunctionTimedOut:
+            except (socket.timeout, SSHException) as identifier:
+                # the channel is closed by the pool, if exec_command hangs.
+                is_expired = self._end_spawn()
+                if not is_expired and not isinstance(identifier, socket.timeout):
+                    raise identifier
                 raise LisaException(
                     f"The remote node is timeout on execute {command}. "
                     f"It may be caused by paramiko/spur not support the shell of node."
                 )
             except spur.errors.CommandInitializationError as identifier:
+                self._end_spawn()
                 # Some publishers images, such as azhpc-desktop, javlinltd and
                 # vfunctiontechnologiesltd, there might have permission errors when
                 # scripts under /etc/profile.d directory are executed at startup of
@@ -571,6 +803,16 @@ class SshShell(InitializableMixin):
             path = str(path)
         return path
 
+    def _end_spawn(self) -> bool:
+        if self._channel_pool:
+            return self._channel_pool.end_spawn()
+        return False
+
+    def _save_channel_pool_statistics(self, channel_pool: SshChannelPool) -> None:
+        self._closed_pool_statistics["hit_count"] += channel_pool.hit_count
+        self._closed_pool_statistics["miss_count"] += channel_pool.miss_count
+        self._closed_pool_statistics["opened_count"] += channel_pool.opened_count
+
     def _establish_jump_boxes(self, address: str, port: int) -> Any:
         jump_boxes_runbook = development.get_jump_boxes()
         sock: Any = None
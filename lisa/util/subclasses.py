@@ -1,12 +1,25 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+import importlib
 from collections import UserDict
-from typing import TYPE_CHECKING, Any, Generic, Iterable, Type, TypeVar, cast
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Generic,
+    Iterable,
+    List,
+    Optional,
+    Type,
+    TypeVar,
+    cast,
+)
 
 from lisa import schema
 from lisa.util import BaseClassMixin, InitializableMixin, LisaException, constants
-from lisa.util.logger import get_logger
+from lisa.util.logger import Logger, get_logger
 
 
 class BaseClassWithRunbookMixin(BaseClassMixin):
@@ -31,6 +44,65 @@ class BaseClassWithRunbookMixin(BaseClassMixin):
 T_BASECLASS = TypeVar("T_BASECLASS", bound=BaseClassMixin)
 
 
+# type name -> modules, which define subclasses with the type name. They are
+# imported, when the type name is used first. See mixin_modules.py
+_lazy_modules: Dict[str, List[str]] = {}
+# imports all modules, if a type name is not in the lazy modules. It happens,
+# when optional packages are installed after the manifest is saved.
+_import_all: Optional[Callable[[], None]] = None
+
+
+def set_lazy_modules(
+    lazy_modules: Dict[str, List[str]], import_all: Callable[[], None]
+) -> None:
+    global _import_all
+    _lazy_modules.clear()
+    _lazy_modules.update(lazy_modules)
+    _import_all = import_all
+
+
+def get_subclass_modules(package_name: str) -> Dict[str, List[str]]:
+    """
+    Returns type names and modules of all imported subclasses, which are in the
+    package.
+    """
+    result: Dict[str, List[str]] = {}
+    for subclass_type in _get_all_subclasses(BaseClassMixin):
+        module_name = subclass_type.__module__
+        if not module_name.startswith(f"{package_name}."):
+            continue
+        try:
+            type_name = subclass_type.type_name()
+        except Exception:
+            # base classes don't implement the type name.
+            continue
+        modules = result.setdefault(type_name, [])
+        if module_name not in modules:
+            modules.append(module_name)
+    return result
+
+
+def _import_lazy_modules(type_name: str, log: Logger) -> None:
+    global _import_all
+    # the modules are imported once only, even the type is not found.
+    module_names = _lazy_modules.pop(type_name, [])
+    for module_name in module_names:
+        log.debug(f"importing [{module_name}] for [{type_name}]")
+        importlib.import_module(module_name)
+    if not module_names and _import_all:
+        log.debug(f"importing all modules for [{type_name}]")
+        import_all = _import_all
+        _import_all = None
+        import_all()
+
+
+def _get_all_subclasses(cls: Type[BaseClassMixin]) -> Iterable[Type[BaseClassMixin]]:
+    # recursive loop subclasses of subclasses
+    for subclass_type in cls.__subclasses__():
+        yield subclass_type
+        yield from _get_all_subclasses(subclass_type)
+
+
 if TYPE_CHECKING:
     SubClassTypeDict = UserDict[str, type]
 else:
@@ -49,7 +121,10 @@ class Factory(InitializableMixin, Generic[T_BASECLASS], SubClassTypeDict):
         for subclass_type in self._get_subclasses(self._base_type):
             subclass_type_name = subclass_type.type_name()
             exists_type = self.get(subclass_type_name)
-            if exists_type:
+            if exists_type is subclass_type:
+                # it's scanned again, after lazy modules are imported.
+                continue
+            elif exists_type:
                 # so far, it happens on ut only.
                 # When UT code import each other, it happens.
                 # it's important to use first registered.
@@ -97,14 +172,15 @@ class Factory(InitializableMixin, Generic[T_BASECLASS], SubClassTypeDict):
     def _get_subclasses(
         self, cls: Type[BaseClassMixin]
     ) -> Iterable[Type[BaseClassMixin]]:
-        # recursive loop subclasses of subclasses
-        for subclass_type in cls.__subclasses__():
-            yield subclass_type
-            yield from self._get_subclasses(subclass_type)
+        return _get_all_subclasses(cls)
 
     def _get_sub_type(self, type_name: str) -> type:
         self.initialize()
         sub_type = self.get(type_name)
+        if sub_type is None:
+            _import_lazy_modules(type_name, self._log)
+            self._initialize()
+            sub_type = self.get(type_name)
         if sub_type is None:
             raise LisaException(
                 f"cannot find subclass '{type_name}' of {self._base_type.__name__}. "
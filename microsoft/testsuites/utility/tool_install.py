@@ -1,4 +1,4 @@
-from typing import Any, Dict, List, Union
+from typing import Any, Dict, List, Type, Union
 
 from lisa import (
     Logger,
@@ -43,12 +43,14 @@ class Utilities(TestSuite):
         defined_tool_mapping: Dict[str, str] = {
             tool.lower(): tool for tool in tools.__all__
         }
+        tool_types: List[Type[Tool]] = []
         for input_tool_name in tool_names:
             tool_name = defined_tool_mapping.get(input_tool_name.lower())
             if not tool_name:
                 raise LisaException(f"{input_tool_name} is not a valid tool")
-            tool: Union[None, Tool] = getattr(tools, tool_name)
+            tool: Union[None, Type[Tool]] = getattr(tools, tool_name)
             if tool:
-                node.tools.get(tool)  # type: ignore
+                tool_types.append(tool)
             else:
                 raise LisaException(f"Error fetching tool {input_tool_name}")
+        node.tools.prefetch(tool_types)
@@ -0,0 +1,92 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from threading import Event
+from typing import Any, List
+from unittest import TestCase
+
+from lisa.sut_orchestrator.azure.common import DataDiskPool, wait_operations
+from lisa.util.logger import get_logger
+
+
+class _FakePoller:
+    """
+    The operation is done, when the event is set.
+    """
+
+    def __init__(self, name: str) -> None:
+        self.name = name
+        self.event = Event()
+
+    def done(self) -> bool:
+        return self.event.is_set()
+
+    def wait(self, timeout: float) -> None:
+        self.event.wait(timeout)
+
+    def result(self) -> str:
+        return self.name
+
+
+class _FakeDisks:
+    def __init__(self) -> None:
+        self.created: List[str] = []
+
+    def begin_create_or_update(
+        self, resource_group_name: str, name: str, _: Any
+    ) -> Any:
+        self.created.append(name)
+        poller = _FakePoller(name)
+        poller.event.set()
+        return poller
+
+
+class _FakeComputeClient:
+    def __init__(self) -> None:
+        self.disks = _FakeDisks()
+
+
+class DataDiskOperationsTestCase(TestCase):
+    def test_wait_operations(self) -> None:
+        log = get_logger("test", "disk")
+        pollers: List[_FakePoller] = []
+        running_counts: List[int] = []
+
+        def _begin(name: str) -> _FakePoller:
+            running_counts.append(len([x for x in pollers if not x.done()]))
+            poller = _FakePoller(name)
+            pollers.append(poller)
+            # the later one is done first, the earlier one is done later.
+            if int(name) % 2:
+                poller.event.set()
+                pollers[-2].event.set()
+            return poller
+
+        names = [str(x) for x in range(10)]
+        results = wait_operations(names, _begin, 2, log, "created disk")
+
+        self.assertEqual(names, results)
+        self.assertLessEqual(max(running_counts), 2)
+
+    def test_data_disk_pool(self) -> None:
+        log = get_logger("test", "disk")
+        compute_client = _FakeComputeClient()
+        pool = DataDiskPool(size=2)
+
+        # the pool is empty at first, and it's refilled in background.
+        taken = pool.take(compute_client, "rg", "westus", "sku", 20, 3, log)
+        self.assertEqual(0, len(taken))
+        self.assertEqual(2, len(compute_client.disks.created))
+
+        taken = pool.take(compute_client, "rg", "westus", "sku", 20, 3, log)
+        self.assertEqual(compute_client.disks.created[:2], list(taken))
+        self.assertEqual(4, len(compute_client.disks.created))
+
+        # disks of other sizes are not shared.
+        taken = pool.take(compute_client, "rg", "westus", "sku", 40, 1, log)
+        self.assertEqual(0, len(taken))
+        self.assertEqual(6, len(compute_client.disks.created))
+
+        pool.clear(compute_client, "rg", delete_disks=False, log=log)
+        taken = pool.take(compute_client, "rg", "westus", "sku", 20, 1, log)
+        self.assertEqual(0, len(taken))
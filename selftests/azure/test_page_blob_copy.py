@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from threading import Lock
+from types import SimpleNamespace
+from typing import Any, Dict, List, Optional, Tuple
+from unittest import TestCase
+
+from azure.storage.blob import BlobType
+
+from lisa.sut_orchestrator.azure import common
+from lisa.util.logger import get_logger
+
+_MB = 1024 * 1024
+
+
+class _FakeBlob:
+    """
+    An in-memory page blob, which supports the APIs used by copying.
+    """
+
+    def __init__(self, endpoint: Dict[str, "_FakeBlob"], url: str) -> None:
+        self._endpoint = endpoint
+        self.url = url
+        self.data = bytearray()
+        self.pages: List[Tuple[int, int]] = []
+        self.metadata: Dict[str, str] = {}
+        self.content_md5: Optional[bytearray] = None
+        self.requested_size = 0
+        self.fail_at: Optional[int] = None
+        self._lock = Lock()
+
+    def get_blob_properties(self) -> Any:
+        return SimpleNamespace(
+            size=len(self.data),
+            blob_type=BlobType.PageBlob,
+            metadata=dict(self.metadata),
+            content_settings=SimpleNamespace(
+                content_type="application/octet-stream",
+                content_md5=self.content_md5,
+            ),
+        )
+
+    def get_page_ranges(self) -> Tuple[List[Dict[str, int]], List[Dict[str, int]]]:
+        with self._lock:
+            return [{"start": x, "end": y - 1} for x, y in sorted(self.pages)], []
+
+    def create_page_blob(self, size: int, metadata: Dict[str, str]) -> None:
+        self.data = bytearray(size)
+        self.pages = []
+        self.metadata = metadata
+
+    def upload_pages_from_url(
+        self, source_url: str, offset: int, length: int, source_offset: int
+    ) -> None:
+        if self.fail_at is not None and offset <= self.fail_at < offset + length:
+            raise ConnectionError("fake connection error")
+        source = self._endpoint[source_url]
+        with self._lock:
+            self.data[offset : offset + length] = source.data[
+                source_offset : source_offset + length
+            ]
+            self.pages.append((offset, offset + length))
+            self.requested_size += length
+
+    def set_http_headers(self, content_settings: Any) -> None:
+        self.content_md5 = content_settings.content_md5
+
+    def set_blob_metadata(self, metadata: Dict[str, str]) -> None:
+        self.metadata = metadata
+
+
+class PageBlobCopyTestCase(TestCase):
+    def setUp(self) -> None:
+        self._log = get_logger("test", "copy")
+        self._endpoint: Dict[str, _FakeBlob] = {}
+        self._src = _FakeBlob(self._endpoint, "https://fake/src.vhd?sig=x")
+        self._endpoint[self._src.url] = self._src
+        self._src.create_page_blob(32 * _MB, {})
+        self._src.content_md5 = bytearray(b"md5")
+        # two sparse ranges, the second one crosses the boundary of requests.
+        for start, end in [(0, 6 * _MB), (10 * _MB - 512, 17 * _MB)]:
+            self._src.data[start:end] = bytes([start % 251 + 1]) * (end - start)
+            self._src.pages.append((start, end))
+        self._dst = _FakeBlob(self._endpoint, "https://fake/dst.vhd")
+
+    def test_copy_sparse_ranges(self) -> None:
+        self._copy()
+
+        self.assertEqual(self._src.data, self._dst.data)
+        self.assertEqual(13 * _MB + 512, self._dst.requested_size)
+        self.assertEqual(bytearray(b"md5"), self._dst.content_md5)
+        self.assertFalse(common.is_page_copy_pending(self._dst))
+
+    def test_resume_failed_copy(self) -> None:
+        self._dst.fail_at = 12 * _MB
+        with self.assertRaises(ConnectionError):
+            self._copy()
+        self.assertTrue(common.is_page_copy_pending(self._dst))
+        copied_size = self._dst.requested_size
+
+        self._dst.fail_at = None
+        self._copy()
+
+        self.assertEqual(self._src.data, self._dst.data)
+        self.assertEqual(13 * _MB + 512, self._dst.requested_size)
+        self.assertLess(0, copied_size)
+        self.assertFalse(common.is_page_copy_pending(self._dst))
+
+    def _copy(self) -> None:
+        common.copy_page_blob(
+            src_blob_client=self._src,
+            dst_blob_client=self._dst,
+            src_url=self._src.url,
+            concurrency=2,
+            log=self._log,
+        )
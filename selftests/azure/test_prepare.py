@@ -1,7 +1,12 @@
 # Copyright (c) Microsoft Corporation.
 # Licensed under the MIT license.
 
+from copy import deepcopy
+from datetime import datetime, timedelta
 from pathlib import Path
+from tempfile import TemporaryDirectory
+from threading import Event
+from time import sleep
 from typing import Any, Dict, List, Optional
 from unittest.case import TestCase
 
@@ -89,6 +94,75 @@ class AzurePrepareTestCase(TestCase):
         self.verify_eligible_vm_size("westus3", "notreal", False)
         self.assertTrue(notreal_key in self._platform._locations_data_cache)
 
+    def test_location_info_refreshed_in_background(self) -> None:
+        # expired data is returned, and it's refreshed in background.
+        location = "westus3"
+        key = self._platform._get_location_key(location)
+        expired_data = self._platform.get_location_info(location, self._log)
+        expired_data = deepcopy(expired_data)
+        expired_data.updated_time = datetime.now() - timedelta(days=2)
+        queried_data = platform_.AzureLocation(location=location)
+        query_event = Event()
+
+        def _query_location_info(location: str, log: Any) -> platform_.AzureLocation:
+            query_event.wait(timeout=10)
+            return queried_data
+
+        original_cache_path = constants.CACHE_PATH
+        with TemporaryDirectory() as cache_path:
+            constants.CACHE_PATH = Path(cache_path)
+            try:
+                self._platform._locations_data_cache[key] = expired_data
+                self._platform._query_location_info = (  # type: ignore
+                    _query_location_info
+                )
+                self.assertIs(
+                    expired_data,
+                    self._platform.get_location_info(location, self._log),
+                )
+                query_event.set()
+                for _ in range(100):
+                    if self._platform._locations_data_cache[key] is not expired_data:
+                        break
+                    sleep(0.1)
+                self.assertEqual(
+                    queried_data.updated_time,
+                    self._platform._locations_data_cache[key].updated_time,
+                )
+
+                # the refreshed data is saved, and loaded by other runners.
+                self._platform._locations_data_cache.pop(key)
+                loaded_data = self._platform.get_location_info(location, self._log)
+                self.assertEqual(queried_data.updated_time, loaded_data.updated_time)
+            finally:
+                constants.CACHE_PATH = original_cache_path
+                self._platform._locations_data_cache.pop(key, None)
+
+    def test_quota_reservation(self) -> None:
+        # the reserved cores are counted, until the quota is queried again
+        # after the deployment completed.
+        location = "westus3"
+        family = "standardDSv2Family"
+        snapshot = platform_._QuotaSnapshot(
+            updated_time=datetime.now(), usages={family: (4, 10)}
+        )
+        self._platform._quota_snapshots[location] = snapshot
+        self.assertEqual(
+            (3, 5), self._platform._get_quotas(location)["Standard_DS2_v2"]
+        )
+
+        reservation = platform_._QuotaReservation(location=location, cores={family: 4})
+        self._platform._quota_reservations["1"] = reservation
+        self.assertEqual(
+            (1, 5), self._platform._get_quotas(location)["Standard_DS2_v2"]
+        )
+
+        reservation.completed_time = datetime.now()
+        snapshot.updated_time = reservation.completed_time + timedelta(seconds=1)
+        self.assertEqual(
+            (3, 5), self._platform._get_quotas(location)["Standard_DS2_v2"]
+        )
+
     def test_predefined_2nd_location(self) -> None:
         # location predefined in eastus, so all prepared skip westus3
         env = self.load_environment(node_req_count=2)
@@ -0,0 +1,111 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import hashlib
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Thread
+from typing import Any, List
+from unittest import TestCase
+
+from lisa.sut_orchestrator.azure.common import SerialConsoleLogReader
+from lisa.util.logger import get_logger
+
+
+class _FakeBlobHandler(BaseHTTPRequestHandler):
+    """
+    Serve the serial console log like a blob, which supports Range and ETag.
+    """
+
+    content = b""
+    blob_type = "AppendBlob"
+    requested_sizes: List[int] = []
+
+    def do_GET(self) -> None:  # noqa: N802
+        content = self.content
+        etag = f'"{hashlib.sha256(content).hexdigest()}"'
+        range_header = self.headers.get("Range")
+        if_match = self.headers.get("If-Match")
+        if self.headers.get("If-None-Match") == etag:
+            self._send(304, b"", etag)
+        elif if_match and if_match != etag:
+            self._send(412, b"", etag)
+        elif range_header:
+            start = int(range_header.split("=")[1].split("-")[0])
+            if start >= len(content):
+                self._send(416, b"", etag, f"bytes */{len(content)}")
+            else:
+                self._send(
+                    206,
+                    content[start:],
+                    etag,
+                    f"bytes {start}-{len(content) - 1}/{len(content)}",
+                )
+        else:
+            self._send(200, content, etag)
+
+    def log_message(self, format: str, *args: Any) -> None:
+        pass
+
+    def _send(
+        self, status: int, body: bytes, etag: str, content_range: str = ""
+    ) -> None:
+        self.requested_sizes.append(len(body))
+        self.send_response(status)
+        self.send_header("ETag", etag)
+        self.send_header("x-ms-blob-type", self.blob_type)
+        if content_range:
+            self.send_header("Content-Range", content_range)
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+class SerialConsoleLogReaderTestCase(TestCase):
+    def setUp(self) -> None:
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), _FakeBlobHandler)
+        Thread(target=self._server.serve_forever, daemon=True).start()
+        _FakeBlobHandler.requested_sizes = []
+        _FakeBlobHandler.blob_type = "AppendBlob"
+        self._url = (
+            f"http://127.0.0.1:{self._server.server_address[1]}/serial.log?sig=1"
+        )
+
+    def tearDown(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+    def test_read_incrementally(self) -> None:
+        log = get_logger("test", "serial")
+        reader = SerialConsoleLogReader()
+        _FakeBlobHandler.content = b"booting\n"
+        self.assertEqual(b"booting\n", reader.read(self._url, log))
+
+        # only new bytes are downloaded, and the SAS token can be changed.
+        _FakeBlobHandler.content = b"booting\nlogin:"
+        self.assertEqual(
+            b"booting\nlogin:", reader.read(self._url.replace("sig=1", "sig=2"), log)
+        )
+        # not changed
+        self.assertEqual(b"booting\nlogin:", reader.read(self._url, log))
+
+        # the blob is shrunk, so it's downloaded again.
+        _FakeBlobHandler.content = b"reboot"
+        self.assertEqual(b"reboot", reader.read(self._url, log))
+
+        self.assertEqual([8, 6, 0, 0, 6], _FakeBlobHandler.requested_sizes)
+
+    def test_read_rewritten_blob(self) -> None:
+        log = get_logger("test", "serial")
+        reader = SerialConsoleLogReader()
+        _FakeBlobHandler.blob_type = "PageBlob"
+        _FakeBlobHandler.content = b"booting\n"
+        self.assertEqual(b"booting\n", reader.read(self._url, log))
+        # not changed
+        self.assertEqual(b"booting\n", reader.read(self._url, log))
+
+        # the blob is rewritten in a larger size, so the old content is not a
+        # prefix, and it's downloaded again.
+        _FakeBlobHandler.content = b"rebooted\nlogin:"
+        self.assertEqual(b"rebooted\nlogin:", reader.read(self._url, log))
+
+        self.assertEqual([8, 0, 0, 15], _FakeBlobHandler.requested_sizes)
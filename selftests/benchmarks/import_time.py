@@ -0,0 +1,63 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""
+Compares the import time of mix-in modules, when they are imported all, and
+when they are imported lazily by the manifest. Each one runs in a new process.
+Run it by
+
+    python -m selftests.benchmarks.import_time
+"""
+
+import subprocess
+import sys
+import tempfile
+from typing import Tuple
+
+_REPEAT = 5
+
+_SCRIPT = """
+import sys
+from pathlib import Path
+from timeit import default_timer as timer
+
+started = timer()
+import lisa.mixin_modules
+
+if {is_lazy}:
+    lisa.mixin_modules.import_modules_lazily(Path({cache_path!r}))
+else:
+    lisa.mixin_modules.import_modules()
+# lisa redirects stdout to the logger.
+print(timer() - started, len(sys.modules), file=sys.stderr)
+"""
+
+
+def _measure(is_lazy: bool, cache_path: str) -> Tuple[float, int]:
+    script = _SCRIPT.format(is_lazy=is_lazy, cache_path=cache_path)
+    results = []
+    for _ in range(_REPEAT):
+        process = subprocess.run(
+            [sys.executable, "-W", "ignore", "-c", script],
+            capture_output=True,
+            check=True,
+            text=True,
+        )
+        elapsed, module_count = process.stderr.split()[-2:]
+        results.append((float(elapsed), int(module_count)))
+    return min(results)
+
+
+def main() -> None:
+    with tempfile.TemporaryDirectory() as cache_path:
+        # the first lazy run saves the manifest.
+        _measure(is_lazy=True, cache_path=cache_path)
+
+        print(f"{'method':>8}{'time (sec)':>16}{'modules':>16}")
+        for name, is_lazy in [("all", False), ("lazy", True)]:
+            elapsed, module_count = _measure(is_lazy=is_lazy, cache_path=cache_path)
+            print(f"{name:>8}{elapsed:>16.3f}{module_count:>16}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""
+Measures the time of the JUnit notifier per test result, when the run grows.
+With checkpoint interval 0, the report is written on every result. Run it by
+
+    python -m selftests.benchmarks.junit
+"""
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import List
+
+from lisa.messages import TestResultMessage, TestRunMessage, TestRunStatus, TestStatus
+from lisa.notifiers.junit import JUnit, JUnitSchema
+from lisa.util import constants
+from lisa.util.perf_timer import create_timer
+
+_SUITE_COUNT = 50
+
+
+def _create_messages(count: int) -> List[TestResultMessage]:
+    messages: List[TestResultMessage] = []
+    for index in range(count):
+        suite_name = f"microsoft.testsuites.suite_{index % _SUITE_COUNT}"
+        for status in [TestStatus.RUNNING, TestStatus.PASSED]:
+            if status == TestStatus.PASSED and index % 10 == 0:
+                status = TestStatus.FAILED
+            messages.append(
+                TestResultMessage(
+                    id_=str(index),
+                    name=f"case_{index}",
+                    suite_full_name=suite_name,
+                    status=status,
+                    message="failed" if status == TestStatus.FAILED else "",
+                    stacktrace="Traceback: ..." if status == TestStatus.FAILED else "",
+                    elapsed=float(index),
+                    time=datetime.now(),
+                )
+            )
+    return messages
+
+
+def run(count: int, checkpoint_interval: float, path: Path) -> float:
+    """
+    Returns the average seconds per result.
+    """
+    constants.RUN_LOCAL_LOG_PATH = path
+    notifier = JUnit(JUnitSchema(type="junit", checkpoint_interval=checkpoint_interval))
+    notifier.initialize()
+    messages = _create_messages(count)
+
+    timer = create_timer()
+    notifier._received_message(TestRunMessage(status=TestRunStatus.INITIALIZING))
+    for message in messages:
+        notifier._received_message(message)
+    notifier._received_message(TestRunMessage(status=TestRunStatus.SUCCESS))
+    notifier.finalize()
+    return timer.elapsed() / count
+
+
+def main() -> None:
+    print(f"{'results':>8}{'interval':>10}{'usec/result':>14}")
+    with tempfile.TemporaryDirectory() as path:
+        for count in [1000, 5000, 10000]:
+            for interval in [0, 10]:
+                elapsed = run(count, interval, Path(path))
+                print(f"{count:>8}{interval:>10}{elapsed * 1000000:>14.1f}")
+
+
+if __name__ == "__main__":
+    main()
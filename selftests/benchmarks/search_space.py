@@ -0,0 +1,115 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""
+Compares capability matching with and without the cache of search space, on
+the Azure vm sizes in selftests/azure. Run it by
+
+    python -m selftests.benchmarks.search_space
+"""
+
+import timeit
+from pathlib import Path
+from typing import Callable, List, Tuple
+
+from lisa import schema, search_space
+from lisa.sut_orchestrator.azure import platform_
+from lisa.util import constants
+from lisa.util.logger import get_logger
+
+
+def _load_capabilities() -> List[platform_.AzureCapability]:
+    log = get_logger("benchmark", "search_space")
+    data_path = Path(__file__).parent.parent / "azure"
+    constants.CACHE_PATH = data_path
+
+    platform = platform_.AzurePlatform(schema.Platform())
+    platform._azure_runbook = platform_.AzurePlatformSchema()
+    platform.subscription_id = "mockup subscription id"
+
+    capabilities: List[platform_.AzureCapability] = []
+    for path in sorted(data_path.glob("azure_locations_*.json")):
+        location = path.stem[len("azure_locations_") :]
+        location_info = platform.get_location_info(location, log)
+        capabilities.extend(location_info.capabilities.values())
+    return capabilities
+
+
+def _create_requirements() -> List[schema.NodeSpace]:
+    requirements: List[schema.NodeSpace] = []
+    for core_count in [1, 2, 4, 8, 16]:
+        for memory_mb in [512, 4096, 16384]:
+            requirements.append(
+                schema.NodeSpace(
+                    core_count=search_space.IntRange(min=core_count),
+                    memory_mb=search_space.IntRange(min=memory_mb),
+                )
+            )
+    return requirements
+
+
+def _check_all(
+    requirements: List[schema.NodeSpace],
+    capabilities: List[platform_.AzureCapability],
+    use_key: bool,
+) -> None:
+    for requirement in requirements:
+        requirement_key = (
+            search_space.get_canonical_key(requirement) if use_key else None
+        )
+        for capability in capabilities:
+            search_space.check(
+                requirement,
+                capability.capability,
+                requirement_key=requirement_key,
+                capability_key=capability.get_capability_key() if use_key else None,
+            )
+
+
+def _generate_min_all(pairs: List[Tuple[schema.NodeSpace, schema.NodeSpace]]) -> None:
+    for requirement, capability in pairs:
+        requirement.generate_min_capability(capability)
+
+
+def _measure(method: Callable[[], None], count: int) -> float:
+    # returns microseconds per item. The first run fills the cache.
+    method()
+    return min(timeit.repeat(method, number=1, repeat=5)) / count * 1000000
+
+
+def main() -> None:
+    capabilities = _load_capabilities()
+    requirements = _create_requirements()
+    pairs = [
+        (requirement, capability.capability)
+        for requirement in requirements
+        for capability in capabilities
+        if requirement.check(capability.capability).result
+    ]
+    check_count = len(requirements) * len(capabilities)
+    print(
+        f"vm sizes: {len(capabilities)}, requirements: {len(requirements)}, "
+        f"matched pairs: {len(pairs)}"
+    )
+
+    print(f"{'method':>24}{'no cache (us)':>16}{'cache (us)':>16}")
+    search_space.clear_cache()
+    no_cache = _measure(
+        lambda: _check_all(requirements, capabilities, use_key=False), check_count
+    )
+    cache = _measure(
+        lambda: _check_all(requirements, capabilities, use_key=True), check_count
+    )
+    print(f"{'check':>24}{no_cache:>16.1f}{cache:>16.1f}")
+
+    schema.NodeSpace._is_cached = False
+    no_cache = _measure(lambda: _generate_min_all(pairs), len(pairs))
+    schema.NodeSpace._is_cached = True
+    search_space.clear_cache()
+    cache = _measure(lambda: _generate_min_all(pairs), len(pairs))
+    print(f"{'generate_min_capability':>24}{no_cache:>16.1f}{cache:>16.1f}")
+    print(f"cache: {search_space.get_cache_statistics()}")
+
+
+if __name__ == "__main__":
+    main()
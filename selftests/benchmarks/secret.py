@@ -0,0 +1,89 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+"""
+Compares the masking engines of secrets on log lines. Run it by
+
+    python -m selftests.benchmarks.secret
+"""
+
+import random
+import string
+import timeit
+import uuid
+from functools import partial
+from typing import Callable, List
+
+from lisa import secret
+from lisa.secret import PATTERN_GUID, PATTERN_HEADTAIL, PATTERN_URL
+
+
+def _random_text(length: int) -> str:
+    return "".join(random.choices(string.ascii_letters + string.digits + " ", k=length))
+
+
+def _create_secrets(count: int) -> List[str]:
+    secrets: List[str] = []
+    for index in range(count):
+        kind = index % 3
+        if kind == 0:
+            value = str(uuid.uuid4())
+            secret.add_secret(value, PATTERN_GUID)
+        elif kind == 1:
+            value = _random_text(16).replace(" ", "_")
+            secret.add_secret(value, PATTERN_HEADTAIL)
+        else:
+            value = (
+                f"https://account{index}.blob.core.windows.net/vhds/image.vhd"
+                f"?sp=r&sig={uuid.uuid4().hex}"
+            )
+            secret.add_secret(value, PATTERN_URL)
+        secrets.append(value)
+    return secrets
+
+
+def _create_lines(secrets: List[str], count: int) -> List[str]:
+    lines: List[str] = []
+    for index in range(count):
+        line = f"2023-06-21 12:00:00.000[1234][INFO] lisa.cmd[{index}].stdout "
+        line += _random_text(random.randint(20, 200))
+        # 1% lines contain a secret.
+        if index % 100 == 0:
+            line += f" {random.choice(secrets)}"
+        lines.append(line)
+    return lines
+
+
+def _measure(method: Callable[[str], str], lines: List[str]) -> float:
+    return min(timeit.repeat(lambda: [method(x) for x in lines], number=1, repeat=3))
+
+
+def main() -> None:
+    random.seed(0)
+    matcher = secret._matcher
+    print(f"{'secrets':>8} {'scan (s)':>10} {'automaton (s)':>14}")
+    for count in [8, 16, 32, 64, 128, 256]:
+        secret.reset()
+        secrets = _create_secrets(count)
+        lines = _create_lines(secrets, 20000)
+
+        scan_time = _measure(matcher.mask_by_scan, lines)
+        automaton_time = "n/a"
+        if secret._ahocorasick:
+            # compile it regardless the threshold.
+            matcher._is_automaton_dirty = True
+            matcher._compile()
+            automaton = matcher._automaton
+            for line in lines:
+                assert matcher.mask_by_scan(line) == matcher.mask_by_automaton(
+                    line, automaton
+                ), f"inconsistent result on: {line}"
+            automaton_method = partial(matcher.mask_by_automaton, automaton=automaton)
+            automaton_time = f"{_measure(automaton_method, lines):.3f}"
+
+        print(f"{count:>8} {scan_time:>10.3f} {automaton_time:>14}")
+    secret.reset()
+
+
+if __name__ == "__main__":
+    main()
@@ -544,6 +544,34 @@ class RunnerTestCase(TestCase):
             test_results=test_results,
         )
 
+    def test_requirement_check_cached(self) -> None:
+        # the requirement check is cached until the environment status changes.
+        test_testsuite.generate_cases_metadata()
+        env_runbook = generate_env_runbook(is_single_env=True, remote=True)
+        runner = generate_runner(env_runbook, times=2)
+        runner.initialize()
+        index = runner._schedule_index
+        environment = runner.environments[0]
+        test_result = runner.test_results[0]
+
+        check_result = index.check(test_result, environment)
+        self.assertEqual(check_result, index.check(test_result, environment))
+        self.assertEqual(1, index.miss_count)
+        self.assertEqual(1, index.hit_count)
+
+        environment.status = EnvironmentStatus.Prepared
+        index.check(test_result, environment)
+        self.assertEqual(2, index.miss_count)
+
+        # the check result is shared, so it shouldn't be changed by merging.
+        test_result.check_environment(
+            environment, save_reason=True, check_result=check_result
+        )
+        test_result.check_environment(
+            environment, save_reason=True, check_result=check_result
+        )
+        self.assertIsNot(check_result, test_result.check_results)
+
     def test_env_skipped_no_case(self) -> None:
         # no case found, as not call generate_case_metadata
         # in this case, not deploy any env
@@ -0,0 +1,58 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from unittest import TestCase
+
+from lisa.messages import SubTestMessage, TestResultMessage, TestStatus
+from lisa.util import event_log
+
+
+class EventLogTestCase(TestCase):
+    def test_write_and_read(self) -> None:
+        for compression in ["", event_log.COMPRESSION_GZIP]:
+            with self.subTest(compression=compression):
+                with tempfile.TemporaryDirectory() as temp_path:
+                    self._verify_write_and_read(Path(temp_path), compression)
+
+    def _verify_write_and_read(self, path: Path, compression: str) -> None:
+        # the buffer is flushed multiple times by size.
+        writer = event_log.EventLogWriter(
+            path / "messages.log", compression=compression, flush_size=1024
+        )
+        for index in range(100):
+            message = (
+                TestResultMessage(
+                    name=f"case_{index}",
+                    status=TestStatus.PASSED,
+                    time=datetime(2023, 1, 1),
+                )
+                if index % 2
+                else SubTestMessage(name=f"sub_{index}")
+            )
+            writer.write(event_log.to_json_line(message, logged_time=index))
+        writer.close()
+
+        suffix = ".gz" if compression else ".log"
+        self.assertEqual(suffix, writer.path.suffix)
+        events = list(event_log.read_events(writer.path))
+        self.assertEqual(100, len(events))
+        self.assertEqual(
+            {"logged_time": 1, "type": "TestResult", "status": "PASSED"},
+            {x: events[1][x] for x in ["logged_time", "type", "status"]},
+        )
+        self.assertEqual("2023-01-01T00:00:00", events[1]["time"])
+
+        events = list(
+            event_log.read_events(
+                writer.path,
+                types=["TestResult"],
+                predicate=lambda x: x["logged_time"] > 90,
+            )
+        )
+        self.assertEqual(["case_91", "case_93"], [x["name"] for x in events[:2]])
+
+        events = event_log.tail_events(writer.path, 3, types=["SubTestResult"])
+        self.assertEqual(["sub_94", "sub_96", "sub_98"], [x["name"] for x in events])
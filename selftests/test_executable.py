@@ -0,0 +1,84 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import tempfile
+from pathlib import Path
+from typing import Any, List, Type
+from unittest import TestCase, skipIf
+
+from lisa.executable import Tool
+from lisa.node import local_node_connect
+
+_MISSING_COMMAND = "lisa_selftest_missing_tool"
+
+
+class _ExistingTool(Tool):
+    @property
+    def command(self) -> str:
+        return "sh"
+
+    @property
+    def can_install(self) -> bool:
+        return False
+
+
+class _MissingTool(Tool):
+    @property
+    def command(self) -> str:
+        return _MISSING_COMMAND
+
+    @property
+    def can_install(self) -> bool:
+        return True
+
+    @property
+    def packages(self) -> List[str]:
+        return [_MISSING_COMMAND]
+
+    @property
+    def dependencies(self) -> List[Type[Tool]]:
+        return [_ExistingTool]
+
+    def _install(self) -> bool:
+        raise AssertionError("it should be installed by packages together.")
+
+
+@skipIf(os.name != "posix", "the batched check runs on posix only")
+class ToolsPrefetchTestCase(TestCase):
+    def test_prefetch(self) -> None:
+        executed: List[str] = []
+        installed: List[List[str]] = []
+        with tempfile.TemporaryDirectory() as bin_path:
+            node = local_node_connect(base_part_path=Path(bin_path) / "log")
+            execute = node.execute
+            path = os.environ["PATH"]
+            os.environ["PATH"] = f"{bin_path}{os.pathsep}{path}"
+
+            def _execute(cmd: str, *args: Any, **kwargs: Any) -> Any:
+                executed.append(cmd)
+                return execute(cmd, *args, **kwargs)
+
+            def _install_packages(packages: List[str], *args: Any) -> None:
+                installed.append(packages)
+                for package in packages:
+                    script = Path(bin_path) / package
+                    script.write_text("#!/bin/sh\n")
+                    script.chmod(0o755)
+
+            node.execute = _execute  # type: ignore
+            node.os.install_packages = _install_packages  # type: ignore
+            try:
+                node.tools.prefetch([_MissingTool])
+            finally:
+                os.environ["PATH"] = path
+                node.cleanup()
+
+        self.assertEqual([[_MISSING_COMMAND]], installed)
+        # checked before and after installing, and the missing one is checked
+        # with sudo again.
+        self.assertEqual(3, len(executed))
+        executed.clear()
+        self.assertTrue(node.tools[_ExistingTool].exists)
+        self.assertTrue(node.tools[_MissingTool].exists)
+        self.assertEqual([], executed)
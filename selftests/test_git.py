@@ -0,0 +1,117 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import subprocess
+import tempfile
+from pathlib import Path
+from typing import Any, List
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from lisa.node import local_node_connect
+from lisa.tools import Git
+from lisa.util import constants
+
+
+def _git(cwd: Path, *args: str) -> str:
+    process = subprocess.run(
+        ["git", *args], cwd=cwd, stdout=subprocess.PIPE, text=True, check=True
+    )
+    return process.stdout.strip()
+
+
+@skipIf(os.name != "posix", "the mirror is locked by flock")
+class GitTestCase(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self._temp_path = Path(temp_dir.name)
+        # safe.directory is added to the global config, so keep it in temp.
+        environ = patch.dict(
+            os.environ,
+            {"GIT_CONFIG_GLOBAL": str(self._temp_path / "gitconfig")},
+        )
+        environ.start()
+        self.addCleanup(environ.stop)
+        # the ref is checked out to a branch named by the run id.
+        run_id = patch.object(constants, "RUN_ID", "test")
+        run_id.start()
+        self.addCleanup(run_id.stop)
+
+        self._repo_path = self._temp_path / "repo"
+        self._repo_path.mkdir()
+        _git(self._repo_path, "init", "-q", "-b", "main")
+        for index in range(3):
+            (self._repo_path / "file").write_text(str(index))
+            _git(self._repo_path, "add", "file")
+            _git(
+                self._repo_path,
+                "-c",
+                "user.name=test",
+                "-c",
+                "user.email=test@test",
+                "commit",
+                "-q",
+                "-m",
+                str(index),
+            )
+        # the depth works with file url only.
+        self._url = f"file://{self._repo_path}"
+
+        node = local_node_connect(base_part_path=self._temp_path / "log")
+        self.addCleanup(node.cleanup)
+        self._commands: List[str] = []
+        execute_async = node.execute_async
+
+        # node.execute runs by execute_async, so all commands are recorded.
+        def _execute_async(cmd: str, *args: Any, **kwargs: Any) -> Any:
+            self._commands.append(cmd)
+            return execute_async(cmd, *args, **kwargs)
+
+        node.execute_async = _execute_async  # type: ignore
+        self._git = node.tools[Git]
+        self._commands.clear()
+
+    def test_clone_ref_with_depth(self) -> None:
+        ref = _git(self._repo_path, "rev-parse", "HEAD~1")
+
+        code_path = self._git.clone(
+            self._url, self._temp_path / "code", ref=ref, depth=1
+        )
+
+        self.assertIn(
+            f"git clone  {self._url}  --recurse-submodules --depth 1 "
+            "--shallow-submodules --no-checkout",
+            self._commands,
+        )
+        self.assertIn(f"git  fetch --depth 1 origin {ref}", self._commands)
+        self.assertEqual(ref, _git(Path(code_path), "rev-parse", "HEAD"))
+        self.assertEqual("1", (Path(code_path) / "file").read_text())
+
+    def test_clone_from_mirror(self) -> None:
+        cwd = self._temp_path / "mirror"
+        mirror_path = self._git.mirror(self._url, cwd)
+        self._git.mirror(self._url, cwd)
+
+        lock_path = str(mirror_path)[: -len(".git")] + ".lock"
+        updates = [x for x in self._commands if x.startswith("flock ")]
+        self.assertEqual(2, len(updates))
+        self.assertTrue(updates[0].startswith(f"flock {lock_path} "))
+        # it's cloned at first, and updated later.
+        self.assertIn(f"--mirror {self._url} {mirror_path}", updates[0])
+        self.assertIn(f"-C {mirror_path}  remote update --prune", updates[0])
+        self.assertTrue(Path(mirror_path, "HEAD").exists())
+
+        code_path = self._git.clone(
+            self._url, self._temp_path / "code", reference=mirror_path
+        )
+
+        self.assertIn(
+            f"git clone  {self._url}  --recurse-submodules "
+            f"--reference-if-able {mirror_path} --dissociate",
+            self._commands,
+        )
+        # the clone doesn't depend on objects of the mirror.
+        alternates = Path(code_path) / ".git" / "objects" / "info" / "alternates"
+        self.assertFalse(alternates.exists())
@@ -0,0 +1,59 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import os
+import tempfile
+from pathlib import Path
+from unittest import TestCase, skipIf
+from unittest.mock import patch
+
+from lisa.node import local_node_connect
+from lisa.sut_orchestrator.libvirt.image_cache import ImageCache
+from lisa.sut_orchestrator.libvirt.schema import DiskImageFormat
+from lisa.util import constants
+
+_FORMATS = (DiskImageFormat.RAW, DiskImageFormat.RAW)
+
+
+@skipIf(os.name != "posix", "the image cache runs on posix only")
+class ImageCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self._temp_path = Path(temp_dir.name)
+        # the cache path is set in the lisa entry, so it may not be declared.
+        cache_path = patch.object(constants, "CACHE_PATH", self._temp_path, create=True)
+        cache_path.start()
+        self.addCleanup(cache_path.stop)
+
+        self._node = local_node_connect(base_part_path=self._temp_path / "log")
+        self.addCleanup(self._node.cleanup)
+        self._cache_dir = str(self._temp_path / "image_cache")
+
+    def test_keep_images_used_by_others(self) -> None:
+        # the budget is 0, so all images are evicted, if they are not in use.
+        other = self._create_cache()
+        cache = self._create_cache()
+
+        image_x = other.get_image(self._create_image("x"), *_FORMATS)
+        image_y = cache.get_image(self._create_image("y"), *_FORMATS)
+        self.assertTrue(Path(image_x).exists())
+        self.assertEqual(0, cache.get_statistics()["evicted"])
+
+        other.release_image(image_x)
+        cache._evict()
+        self.assertFalse(Path(image_x).exists())
+        self.assertTrue(Path(image_y).exists())
+        self.assertEqual(1, cache.get_statistics()["evicted"])
+
+        cache.release_image(image_y)
+        self.assertEqual(image_y, other.get_image(self._create_image("y"), *_FORMATS))
+        self.assertEqual(1, other.get_statistics()["hit"])
+
+    def _create_cache(self) -> ImageCache:
+        return ImageCache(self._node, self._cache_dir, 0, self._node.log)
+
+    def _create_image(self, content: str) -> str:
+        path = self._temp_path / f"{content}.img"
+        path.write_text(content * 4096)
+        return str(path)
@@ -0,0 +1,89 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import io
+import tempfile
+import time
+import xml.etree.ElementTree as ET  # noqa: N817
+from datetime import datetime
+from pathlib import Path
+from unittest import TestCase
+
+from lisa.messages import TestResultMessage, TestRunMessage, TestRunStatus, TestStatus
+from lisa.notifiers.junit import JUnit, JUnitSchema
+from lisa.util import constants
+
+
+class JUnitTestCase(TestCase):
+    def setUp(self) -> None:
+        self._log_path = constants.RUN_LOCAL_LOG_PATH
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        constants.RUN_LOCAL_LOG_PATH = Path(temp_dir.name)
+
+    def tearDown(self) -> None:
+        constants.RUN_LOCAL_LOG_PATH = self._log_path
+
+    def test_same_as_element_tree(self) -> None:
+        notifier = self._create_notifier(checkpoint_interval=0)
+        notifier._received_message(
+            TestRunMessage(status=TestRunStatus.INITIALIZING, runbook_name='r"1')
+        )
+        # the values need escaping in attributes and text.
+        for status, text in [
+            (TestStatus.PASSED, "passed"),
+            (TestStatus.FAILED, "a\"b'c\td\ne<&>"),
+            (TestStatus.SKIPPED, "tab\tonly"),
+        ]:
+            self._send_result(notifier, f"case_{status.name}", status, text)
+        notifier._received_message(TestRunMessage(status=TestRunStatus.SUCCESS))
+        notifier.finalize()
+
+        # build the tree, which is written by ElementTree at once.
+        testsuites = ET.Element("testsuites", notifier._testsuites.attrib)
+        for testsuite_info in notifier._testsuites_info.values():
+            testsuite = ET.SubElement(
+                testsuites, "testsuite", testsuite_info.xml.attrib
+            )
+            for testcase in testsuite_info.testcases:
+                testsuite.append(ET.fromstring(testcase))
+        expected = io.BytesIO()
+        ET.ElementTree(testsuites).write(
+            expected, xml_declaration=True, encoding="utf-8"
+        )
+
+        self.assertEqual(expected.getvalue(), notifier._report_path.read_bytes())
+
+    def test_write_pending_results(self) -> None:
+        notifier = self._create_notifier(checkpoint_interval=0.2)
+        notifier._received_message(TestRunMessage(status=TestRunStatus.INITIALIZING))
+        self._send_result(notifier, "case_1", TestStatus.PASSED, "")
+
+        # the result is written by the timer without more messages.
+        time.sleep(0.5)
+        self.assertIn(b'name="case_1"', notifier._report_path.read_bytes())
+        notifier.finalize()
+
+    def _create_notifier(self, checkpoint_interval: float) -> JUnit:
+        notifier = JUnit(
+            JUnitSchema(type="junit", checkpoint_interval=checkpoint_interval)
+        )
+        notifier.initialize()
+        return notifier
+
+    def _send_result(
+        self, notifier: JUnit, name: str, status: TestStatus, text: str
+    ) -> None:
+        for message_status in [TestStatus.RUNNING, status]:
+            notifier._received_message(
+                TestResultMessage(
+                    id_=name,
+                    name=name,
+                    suite_full_name="suite\t1",
+                    status=message_status,
+                    message=text,
+                    stacktrace=text,
+                    elapsed=1,
+                    time=datetime(2023, 1, 1),
+                )
+            )
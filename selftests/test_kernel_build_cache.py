@@ -0,0 +1,109 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import tempfile
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Any, Dict, List
+from unittest import TestCase
+
+from lisa.tools import Cp, Tar
+from lisa.transformers.kernel_build_cache import KernelBuildCache
+from lisa.util.logger import get_logger
+from lisa.util.shell import LocalShell
+
+_KERNEL_VERSION = "6.1.0-test"
+
+
+class _Result:
+    def __init__(self, stdout: str = "", exit_code: int = 0) -> None:
+        self.stdout = stdout
+        self.exit_code = exit_code
+
+
+class _FakeTool:
+    def __init__(self) -> None:
+        self.calls: List[Dict[str, Any]] = []
+
+    def extract(self, **kwargs: Any) -> None:
+        self.calls.append(kwargs)
+
+    def copy(self, **kwargs: Any) -> None:
+        self.calls.append(kwargs)
+
+
+class _FakeNode:
+    """
+    Runs file operations on the local path, and records commands.
+    """
+
+    def __init__(self, working_path: Path, is_git_repo: bool = True) -> None:
+        self.working_path = working_path
+        self.shell = LocalShell()
+        self.tools = {Tar: _FakeTool(), Cp: _FakeTool()}
+        self.commands: List[str] = []
+        self._is_git_repo = is_git_repo
+
+    def get_pure_path(self, path: str) -> PurePath:
+        return PurePosixPath(path)
+
+    def execute(self, cmd: str, **kwargs: Any) -> _Result:
+        self.commands.append(cmd)
+        if cmd == "git rev-parse HEAD":
+            return _Result("1a2b3c", 0 if self._is_git_repo else 128)
+        if cmd.endswith("| sha256sum"):
+            return _Result("0123abcd  -")
+        if cmd == "make -s image_name":
+            return _Result("arch/x86/boot/bzImage")
+        if cmd.startswith("tar -czf "):
+            Path(cmd.split()[2]).write_bytes(b"modules")
+        return _Result()
+
+
+class KernelBuildCacheTestCase(TestCase):
+    def setUp(self) -> None:
+        temp_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(temp_dir.cleanup)
+        self._temp_path = Path(temp_dir.name)
+        self._code_path = self._temp_path / "code"
+        (self._code_path / "arch/x86/boot").mkdir(parents=True)
+        for name in ["arch/x86/boot/bzImage", "System.map", ".config"]:
+            (self._code_path / name).write_text(name)
+        self._cache = KernelBuildCache(
+            self._temp_path / "cache", get_logger("test", "cache")
+        )
+
+    def test_save_and_install(self) -> None:
+        node: Any = _FakeNode(self._temp_path / "build_node")
+        key = self._cache.get_key(node, self._code_path)
+        self.assertEqual("0123abcd", key)
+
+        with self._cache.lock(key):
+            self.assertEqual("", self._cache.install(node, key))
+            self._cache.save(node, key, self._code_path, _KERNEL_VERSION)
+
+        other_node: Any = _FakeNode(self._temp_path / "other_node")
+        with self._cache.lock(key):
+            self.assertEqual(_KERNEL_VERSION, self._cache.install(other_node, key))
+
+        node_path = other_node.working_path / "kernel_build_cache" / key
+        self.assertEqual("arch/x86/boot/bzImage", (node_path / "vmlinuz").read_text())
+        self.assertEqual("/lib/modules/", other_node.tools[Tar].calls[0]["dest_dir"])
+        self.assertEqual(
+            PurePosixPath(f"/boot/config-{_KERNEL_VERSION}"),
+            other_node.tools[Cp].calls[0]["dest"],
+        )
+        self.assertTrue(
+            other_node.commands[-1].startswith(f"installkernel {_KERNEL_VERSION} ")
+        )
+
+    def test_not_git_repo(self) -> None:
+        node: Any = _FakeNode(self._temp_path / "node", is_git_repo=False)
+        self.assertEqual("", self._cache.get_key(node, self._code_path))
+
+    def test_save_failure(self) -> None:
+        node: Any = _FakeNode(self._temp_path / "node")
+        (self._code_path / "System.map").unlink()
+
+        # the failure is logged only, and the incomplete build is not used.
+        self._cache.save(node, "key", self._code_path, _KERNEL_VERSION)
+        self.assertEqual("", self._cache.install(node, "key"))
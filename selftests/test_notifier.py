@@ -0,0 +1,99 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import threading
+from typing import Any, List, Type
+from unittest import TestCase
+from unittest.mock import patch
+
+from lisa import constants, notifier, schema
+from lisa.messages import MessageBase, TestRunMessage
+
+
+class MockNotifier(notifier.Notifier):
+    @classmethod
+    def type_name(cls) -> str:
+        return ""
+
+    @classmethod
+    def type_schema(cls) -> Type[schema.TypedSchema]:
+        return schema.Notifier
+
+    def _subscribed_message_type(self) -> List[Type[MessageBase]]:
+        return [TestRunMessage]
+
+    def _received_messages(self, batch: List[MessageBase]) -> None:
+        self.batches.append(batch)
+        self.released.wait()
+        super()._received_messages(batch)
+
+    def _received_message(self, message: MessageBase) -> None:
+        self.received.append(message)
+
+    def _initialize(self, *args: Any, **kwargs: Any) -> None:
+        self.batches: List[List[MessageBase]] = []
+        self.received: List[MessageBase] = []
+        self.released = threading.Event()
+        self.released.set()
+
+
+class NotifierTestCase(TestCase):
+    def setUp(self) -> None:
+        # notifiers are registered globally, so use empty registries in each
+        # test, and restore them after the test.
+        patcher = patch.multiple(
+            notifier, _notifiers=[], _messages={}, _subscribers={}, _workers={}
+        )
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_order_and_snapshot(self) -> None:
+        mock_notifier = MockNotifier(schema.Notifier())
+        notifier.register_notifier(mock_notifier)
+
+        message = TestRunMessage(run_name="first")
+        notifier.notify(message)
+        # the sender changes the message after sent.
+        message.run_name = "second"
+        notifier.notify(message)
+        notifier.flush()
+
+        self.assertListEqual(
+            ["first", "second"],
+            [x.run_name for x in mock_notifier.received],  # type: ignore
+        )
+
+    def test_batch_and_drop(self) -> None:
+        mock_notifier = MockNotifier(
+            schema.Notifier(
+                queue_size=2,
+                overflow_policy=constants.NOTIFIER_OVERFLOW_DROP_OLDEST,
+            )
+        )
+        notifier.register_notifier(mock_notifier)
+
+        # hold the worker in the first batch, so next messages are queued.
+        mock_notifier.released.clear()
+        notifier.notify(TestRunMessage(run_name="0"))
+        notifier.flush(timeout=0.1)
+        for index in range(1, 5):
+            notifier.notify(TestRunMessage(run_name=str(index)))
+        mock_notifier.released.set()
+        notifier.flush()
+
+        self.assertListEqual(
+            ["0", "3", "4"],
+            [x.run_name for x in mock_notifier.received],  # type: ignore
+        )
+        self.assertEqual(2, len(mock_notifier.batches))
+        statistics = notifier.get_queue_statistics()[""]
+        self.assertEqual(2, statistics["dropped"])
+        self.assertEqual(0, statistics["depth"])
+
+    def test_synchronous(self) -> None:
+        mock_notifier = MockNotifier(schema.Notifier(queue_size=0))
+        notifier.register_notifier(mock_notifier)
+
+        notifier.notify(TestRunMessage(run_name="sync"))
+
+        self.assertEqual(1, len(mock_notifier.received))
@@ -0,0 +1,47 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import subprocess
+from typing import Any
+from unittest import TestCase
+from unittest.mock import patch
+
+from lisa import operating_system
+from lisa.operating_system import OperatingSystem
+
+
+class _Result:
+    def __init__(self, stdout: str) -> None:
+        self.stdout = stdout
+
+
+class _LocalNode:
+    is_remote = False
+
+    def execute(self, cmd: str, **kwargs: Any) -> _Result:
+        process = subprocess.run(
+            ["sh", "-c", cmd], stdout=subprocess.PIPE, text=True, check=False
+        )
+        return _Result(process.stdout)
+
+
+class FingerprintTestCase(TestCase):
+    def setUp(self) -> None:
+        OperatingSystem._OperatingSystem__fingerprint_cache.clear()  # type: ignore
+
+    def tearDown(self) -> None:
+        OperatingSystem._OperatingSystem__fingerprint_cache.clear()  # type: ignore
+
+    def test_output_without_new_line(self) -> None:
+        commands = {
+            "os-release": "printf 'NAME=\"Test\"\\n\\nID=test'",
+            "uname": "printf 'Linux'",
+            "issue": "cat /not/existing",
+        }
+        with patch.dict(operating_system._FINGERPRINT_COMMANDS, commands, clear=True):
+            fingerprint = OperatingSystem._get_fingerprint(_LocalNode())
+
+        self.assertEqual(
+            {"os-release": 'NAME="Test"\nID=test', "uname": "Linux", "issue": ""},
+            fingerprint,
+        )
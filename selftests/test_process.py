@@ -0,0 +1,78 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import logging
+import threading
+import time
+from typing import List
+from unittest import TestCase
+
+from paramiko.channel import ChannelFile
+
+from lisa.util.logger import get_logger
+from lisa.util.process import (
+    ExecutableResult,
+    OutputCapture,
+    _OutputWatcher,
+    _StreamingReader,
+    _WatchedLogWriter,
+)
+
+
+class _FakeChannel:
+    def __init__(self, chunks: List[bytes]) -> None:
+        self._chunks = chunks
+
+    def recv(self, size: int) -> bytes:
+        return self._chunks.pop(0) if self._chunks else b""
+
+
+class StreamingReaderTestCase(TestCase):
+    def test_read_buffered_output(self) -> None:
+        channel = _FakeChannel([b"1234\n0\nhello world\n", b"second\n"])
+        file_in = ChannelFile(channel, "rb")  # type: ignore
+        # spur reads the pid and the result of "which" on spawning, and the
+        # rest of the first chunk is buffered in the file.
+        self.assertEqual(b"1234\n", file_in.readline())
+        self.assertEqual(b"0\n", file_in.readline())
+
+        writer = _WatchedLogWriter(
+            logger=get_logger("test", "stdout"),
+            level=logging.DEBUG,
+            watcher=_OutputWatcher(),
+            capture=OutputCapture(memory_limit=1024),
+        )
+        reader = _StreamingReader(file_in, writer, "utf-8")
+        reader.wait()
+        writer.close()
+
+        self.assertEqual("hello world\nsecond\n", writer.capture.getvalue())
+
+
+class ExecutableResultTestCase(TestCase):
+    def test_load_stdout_once(self) -> None:
+        capture = OutputCapture(memory_limit=1024)
+        capture.write("hello\n")
+        loaded: List[str] = []
+
+        def _load() -> str:
+            # make threads read the stdout at the same time.
+            time.sleep(0.1)
+            loaded.append(capture.getvalue())
+            return loaded[-1].strip()
+
+        result = ExecutableResult(
+            _load, "", 0, "echo hello", 0, release_stdout=capture.close
+        )
+        values: List[str] = []
+        threads = [
+            threading.Thread(target=lambda: values.append(result.stdout))
+            for _ in range(4)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(["hello\n"], loaded)
+        self.assertEqual(["hello"] * 4, values)
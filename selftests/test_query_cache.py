@@ -0,0 +1,51 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+from typing import List
+from unittest import TestCase
+
+from lisa.util.query_cache import QueryCache, cached_query
+
+
+class _Node:
+    def __init__(self) -> None:
+        self.query_cache = QueryCache()
+
+
+class _Tool:
+    def __init__(self, node: _Node) -> None:
+        self.node = node
+        self.force_runs: List[bool] = []
+
+    @cached_query(ttl=600)
+    def get_count(self, name: str, force_run: bool = False) -> int:
+        self.force_runs.append(force_run)
+        return len(self.force_runs)
+
+
+class QueryCacheTestCase(TestCase):
+    def test_cached_query(self) -> None:
+        node = _Node()
+        tool = _Tool(node)
+        self.assertEqual(1, tool.get_count("a"))
+        # shared by tools on the same node.
+        self.assertEqual(1, _Tool(node).get_count("a"))
+        self.assertEqual(2, tool.get_count("b"))
+        self.assertEqual(3, tool.get_count("a", force_run=True))
+        self.assertEqual(3, tool.get_count("a"))
+        # the query runs again on missed, so force_run is passed.
+        self.assertEqual([True, True, True], tool.force_runs)
+
+        node.query_cache.invalidate()
+        self.assertEqual(4, tool.get_count("a"))
+        self.assertEqual(
+            {"hit": 2, "miss": 3, "invalidated": 1},
+            node.query_cache.get_statistics(),
+        )
+
+    def test_expired(self) -> None:
+        cache = QueryCache()
+        cache.set("key", 1, ttl=0)
+        self.assertEqual((False, None), cache.get("key"))
+        cache.set("key", 2, ttl=600)
+        self.assertEqual((True, 2), cache.get("key"))
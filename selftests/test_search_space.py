@@ -15,8 +15,11 @@ from lisa.search_space import (
     SetSpace,
     check,
     check_countspace,
+    clear_cache,
     generate_min_capability,
     generate_min_capability_countspace,
+    get_cache_statistics,
+    get_canonical_key,
 )
 from lisa.util import LisaException
 from lisa.util.logger import get_logger
@@ -183,6 +186,55 @@ class SearchSpaceTestCase(unittest.TestCase):
             IntRange(min=5, max=5, max_inclusive=False)
         self.assertIn("shouldn't be equal to", str(cm.exception))
 
+    def test_canonical_key(self) -> None:
+        self.assertEqual(
+            get_canonical_key(IntRange(min=1, max=5)),
+            get_canonical_key(IntRange(min=1, max=5)),
+        )
+        self.assertNotEqual(
+            get_canonical_key(IntRange(min=1, max=5)),
+            get_canonical_key(IntRange(min=1, max=5, max_inclusive=False)),
+        )
+        # count spaces in different types are not mixed.
+        self.assertNotEqual(get_canonical_key(1), get_canonical_key(True))
+        self.assertNotEqual(
+            get_canonical_key(1), get_canonical_key([IntRange(min=1, max=1)])
+        )
+        self.assertEqual(
+            get_canonical_key(SetSpace(is_allow_set=True, items=["a", "b"])),
+            get_canonical_key(SetSpace(is_allow_set=True, items=["a", "b"])),
+        )
+        self.assertNotEqual(
+            get_canonical_key(SetSpace(is_allow_set=True, items=["a"])),
+            get_canonical_key(SetSpace(is_allow_set=False, items=["a"])),
+        )
+        self.assertEqual(
+            get_canonical_key(MockItem(number=IntRange(min=2))),
+            get_canonical_key(MockItem(number=IntRange(min=2))),
+        )
+        self.assertIsNone(get_canonical_key(object()))
+
+    def test_cached_check(self) -> None:
+        clear_cache()
+        requirement = MockItem(number=IntRange(min=6))
+        capability = MockItem(number=IntRange(min=1, max=5))
+        requirement_key = get_canonical_key(requirement)
+        capability_key = get_canonical_key(capability)
+
+        for _ in range(2):
+            result = check(
+                requirement,
+                capability,
+                requirement_key=requirement_key,
+                capability_key=capability_key,
+            )
+            self._assert_check(False, result)
+            # changing the result doesn't affect the cached one.
+            result.reasons.clear()
+        self.assertEqual(
+            {"size": 1, "hit_count": 1, "miss_count": 1}, get_cache_statistics()
+        )
+
     def _verify_matrix(
         self,
         expected_meet: List[List[bool]],
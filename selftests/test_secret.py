@@ -2,8 +2,10 @@
 # Licensed under the MIT license.
 
 import re
+from unittest import skipIf
 from unittest.case import TestCase
 
+from lisa import secret
 from lisa.secret import PATTERN_GUID, add_secret, mask, reset
 from lisa.util.logger import get_logger
 
@@ -79,3 +81,22 @@ class SecretTestCase(TestCase):
         with self.assertLogs("lisa") as cm:
             log.info("with args t2: %s", "t1")
         self.assertListEqual(["INFO:lisa.:with args ******: ******"], cm.output)
+
+    @skipIf(not secret._ahocorasick, "pyahocorasick is not installed")
+    def test_automaton(self) -> None:
+        add_secret("abc", sub="1")
+        add_secret("bcdef", sub="2")
+        add_secret("t1", sub="3")
+        add_secret("t1t2", sub="4")
+        add_secret("xyz", sub="5")
+        add_secret("xyz", sub="6")
+        secret._matcher._is_automaton_dirty = True
+        secret._matcher._compile()
+        automaton = secret._matcher._automaton
+
+        for text in ["abcdef abc", "t1t2 t1 test3", "bcdefabc xyz", "no secret"]:
+            self.assertEqual(
+                secret._matcher.mask_by_scan(text),
+                secret._matcher.mask_by_automaton(text, automaton),
+            )
+        self.assertEqual("a2 1 6", mask("abcdef abc xyz"))
@@ -0,0 +1,58 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import time
+from typing import Any, List
+from unittest import TestCase
+
+from lisa.util import shell
+
+
+class _FakeChannel:
+    def __init__(self) -> None:
+        # it's False, when a request like exec_command waits for the reply.
+        self.event_ready = False
+        self.closed = False
+
+    def settimeout(self, timeout: Any) -> None:
+        pass
+
+    def close(self) -> None:
+        self.closed = True
+
+
+class _FakeTransport:
+    def __init__(self) -> None:
+        self.channels: List[_FakeChannel] = []
+
+    def open_session(self) -> _FakeChannel:
+        channel = _FakeChannel()
+        self.channels.append(channel)
+        return channel
+
+
+class SshChannelPoolTestCase(TestCase):
+    def setUp(self) -> None:
+        self._spawn_timeout = shell._SPAWN_TIMEOUT
+        shell._SPAWN_TIMEOUT = 0.1  # type: ignore
+
+    def tearDown(self) -> None:
+        shell._SPAWN_TIMEOUT = self._spawn_timeout
+
+    def test_close_hanging_spawn(self) -> None:
+        transport: Any = _FakeTransport()
+        pool = shell.SshChannelPool(transport, size=0, name="test")
+        self.addCleanup(pool.close)
+
+        # exec_command hangs, so the channel is closed.
+        hanging = pool.open_session()
+        time.sleep(0.5)
+        self.assertTrue(hanging.closed)
+        self.assertTrue(pool.end_spawn())
+
+        # the command is started, so it can run longer than the timeout.
+        started = pool.open_session()
+        started.event_ready = True
+        time.sleep(0.5)
+        self.assertFalse(started.closed)
+        self.assertFalse(pool.end_spawn())
@@ -0,0 +1,49 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+from unittest import TestCase
+
+from lisa.util import BaseClassMixin, subclasses
+
+_LAZY_MODULE_NAME = "lisa_selftest_lazy_mixin"
+_LAZY_MODULE = """
+from selftests.test_subclasses import LazyBase
+
+
+class LazyMixin(LazyBase):
+    @classmethod
+    def type_name(cls) -> str:
+        return "lazy_mixin"
+"""
+
+
+class LazyBase(BaseClassMixin):
+    pass
+
+
+class SubclassesTestCase(TestCase):
+    def test_lazy_modules(self) -> None:
+        imported_all: List[bool] = []
+        factory = subclasses.Factory[LazyBase](LazyBase)
+        factory.initialize()
+        with tempfile.TemporaryDirectory() as module_path:
+            (Path(module_path) / f"{_LAZY_MODULE_NAME}.py").write_text(_LAZY_MODULE)
+            sys.path.insert(0, module_path)
+            try:
+                subclasses.set_lazy_modules(
+                    {"lazy_mixin": [_LAZY_MODULE_NAME]},
+                    lambda: imported_all.append(True),
+                )
+                self.assertNotIn(_LAZY_MODULE_NAME, sys.modules)
+                sub_type = factory._get_sub_type("lazy_mixin")
+            finally:
+                sys.path.remove(module_path)
+                subclasses.set_lazy_modules({}, lambda: None)
+
+        self.assertEqual("LazyMixin", sub_type.__name__)
+        self.assertEqual(_LAZY_MODULE_NAME, sub_type.__module__)
+        self.assertEqual([], imported_all)
@@ -0,0 +1,82 @@
+# Copyright (c) Microsoft Corporation.
+# Licensed under the MIT license.
+
+import sys
+import tempfile
+from pathlib import Path
+from unittest import TestCase
+
+from lisa import schema, testsuite_index
+from lisa.util import constants
+
+_SUITE_TEMPLATE = """
+from lisa import TestCaseMetadata, TestSuite, TestSuiteMetadata
+
+
+@TestSuiteMetadata(area="{area}", category="functional", description="")
+class {name}(TestSuite):
+    @TestCaseMetadata(description="", priority={priority})
+    def {name}_case(self) -> None:
+        pass
+"""
+
+
+class TestSuiteIndexTestCase(TestCase):
+    def test_parse_source(self) -> None:
+        source = _SUITE_TEMPLATE.format(area="network", name="Suite", priority=1)
+        source += "\n@TestSuiteMetadata(AREA, 'demo', '', tags=['t1'])\n"
+        source += "class Other(TestSuite):\n"
+        source += "    @TestCaseMetadata('', 3)\n"
+        source += "    def other_case(self) -> None:\n        pass\n"
+        is_plugin, cases = testsuite_index._parse_source(source.encode())
+
+        self.assertFalse(is_plugin)
+        self.assertEqual(
+            [
+                testsuite_index._IndexedCase(
+                    name="Suite_case",
+                    area="network",
+                    category="functional",
+                    priority=1,
+                    tags=[],
+                ),
+                testsuite_index._IndexedCase(
+                    name="other_case",
+                    area=None,
+                    category="demo",
+                    priority=3,
+                    tags=["t1"],
+                ),
+            ],
+            cases,
+        )
+
+    def test_import_selected_modules(self) -> None:
+        package_name = "lisa_selftest_index"
+        with tempfile.TemporaryDirectory() as temp_path:
+            package_path = Path(temp_path) / "package"
+            package_path.mkdir()
+            for name, area in [("IndexNetwork", "network"), ("IndexStorage", "disk")]:
+                (package_path / f"{name.lower()}.py").write_text(
+                    _SUITE_TEMPLATE.format(area=area, name=name, priority=2)
+                )
+            original_cache_path = getattr(constants, "CACHE_PATH", None)
+            constants.CACHE_PATH = Path(temp_path)
+            try:
+                testsuite_index.add_package(package_path, package_name)
+                filters = [
+                    schema.TestCase(criteria=schema.Criteria(area="net.*")),
+                    schema.TestCase(
+                        criteria=schema.Criteria(area="disk"),
+                        select_action=constants.TESTCASE_SELECT_ACTION_EXCLUDE,
+                    ),
+                ]
+                testsuite_index.import_cases(filters)
+            finally:
+                constants.CACHE_PATH = original_cache_path  # type: ignore
+                testsuite_index._packages.clear()
+            index_path = Path(temp_path) / "lisa_testsuite_index.json"
+            self.assertTrue(index_path.exists())
+
+        self.assertIn(f"{package_name}.indexnetwork", sys.modules)
+        self.assertNotIn(f"{package_name}.indexstorage", sys.modules)